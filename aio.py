@@ -0,0 +1,22 @@
+# asyncio support shared by pixelstrip and i2cp.
+# MicroPython calls the module uasyncio on older firmware and adds
+# sleep_ms(); CPython has neither, so fall back to plain asyncio.sleep().
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+
+def _sleep_ms(ms):
+    return asyncio.sleep(ms / 1000)
+
+
+sleep_ms = getattr(asyncio, "sleep_ms", _sleep_ms)
+
+
+def sleep_us(us):
+    """
+    Sleep for about the given number of microseconds, rounded up to whole milliseconds.
+    """
+    return sleep_ms((us + 999) // 1000)
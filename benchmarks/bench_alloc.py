@@ -0,0 +1,115 @@
+"""
+Host-side check that drawing frames makes no heap allocations.
+
+Each bundled animation runs under a Scheduler, on a plain backend, a
+double-buffered backend, and with gamma, dithering and frame stats turned
+on.  After a warm-up, heapcheck.count() counts what the next 100 frames
+would allocate on MicroPython; every allocation feeds the garbage
+collector, whose pauses show as stutter.  The script fails if any
+animation allocates, except those listed in STILL_ALLOCATES.
+
+On the Pico itself, the same can be measured with gc.mem_alloc():
+
+    gc.collect(); before = gc.mem_alloc()
+    for _ in range(100): strip.draw()
+    print((gc.mem_alloc() - before) / 100, "bytes per frame")
+
+    python benchmarks/bench_alloc.py
+"""
+import hostenv
+import heapcheck
+import simulator
+import utime
+from animation_fire import FireAnimation
+from animation_ladder import LadderAnimation
+from animation_pulse import PulseAnimation
+from animation_ripple import RippleAnimation
+from animation_shifting import ShiftingAnimation, ShiftingMatrixAnimation
+from animation_spinning import SpinningAnimation
+from colors import *
+from compositor import ADD, Compositor
+from profiler import FrameStats
+from scheduler import Scheduler
+
+STILL_ALLOCATES = set()
+
+
+class DoubleBufferedBackend(simulator.SimBackend):
+    asynchronous = True
+
+
+def layers():
+    compositor = Compositor()
+    compositor.add(PulseAnimation())
+    compositor.add(SpinningAnimation(LIGHTBLUE), ADD, 192, 8, 56)
+    return compositor
+
+
+def animations():
+    return [
+        ("pulse", PulseAnimation, {}),
+        ("ladder", LadderAnimation, {}),
+        ("spinning", lambda: SpinningAnimation(LIGHTBLUE), {}),
+        ("fire", FireAnimation, {}),
+        ("fire 8x8", FireAnimation, {"width": 8, "height": 8}),
+        ("shifting", ShiftingAnimation, {}),
+        ("shifting 8x8", ShiftingMatrixAnimation, {"width": 8, "height": 8}),
+        ("ripple", lambda: RippleAnimation(x_span=64), {}),
+        ("shifting idx", lambda: ShiftingAnimation(indexed=True), {}),
+        ("pulse idx", lambda: PulseAnimation(indexed=True), {}),
+        ("fire idx", lambda: FireAnimation(indexed=True), {}),
+        ("layers", layers, {}),
+    ]
+
+
+def setups():
+    return [
+        ("plain", {}),
+        ("double-buffered", {"backend": DoubleBufferedBackend()}),
+        ("gamma+dither+stats", {"gamma": 2.2, "dither": True}),
+    ]
+
+
+def frames(scheduler, count):
+    # Each frame starts 0 to 2 ms late, as on the Pico, so delta_time varies.
+    for i in range(count):
+        utime.advance_us(scheduler.step() + (i % 3) * 1000)
+
+
+def allocations(make, kwargs, warmup=150, count=100):
+    utime.reset()
+    if "width" not in kwargs:
+        kwargs = dict(kwargs, n=64)
+    strip = simulator.make_strip(**kwargs)
+    if "dither" in kwargs:
+        strip.stats = FrameStats()
+    strip.animation = make()
+    strip.reset()
+    scheduler = Scheduler([strip])
+    frames(scheduler, warmup)
+    return heapcheck.count(frames, scheduler, count)
+
+
+def main():
+    failed = []
+    print("{:14s} {:>6s} {:>16s} {:>19s}".format("animation", "plain", "double-buffered", "gamma+dither+stats"))
+    for name, make, size in animations():
+        totals = []
+        where = ""
+        for setup, kwargs in setups():
+            found = allocations(make, dict(kwargs, **size))
+            totals.append(found.total)
+            if found.total and not where:
+                where = str(found)
+        print("{:14s} {:6d} {:16d} {:19d}".format(name, *totals))
+        if any(totals):
+            print("    " + where)
+            if name not in STILL_ALLOCATES:
+                failed.append(name)
+    if failed:
+        raise SystemExit("allocations while drawing: " + ", ".join(failed))
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
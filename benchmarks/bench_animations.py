@@ -0,0 +1,163 @@
+"""
+Benchmark every bundled animation across strip and matrix sizes.
+
+Each animation is reset and then drawn for a fixed number of frames on a
+simulated strip of 8, 64, 144, 256 and 1024 pixels, and on 8x8, 16x16
+and 32x32 matrices.  The virtual clock moves one 50 fps frame between
+draws, so animations that only change on a timeout (ladder, spinning)
+cost what they would at 50 fps.  Only the time spent inside reset() and
+draw(), which includes show(), is measured, on this PC.
+
+The table goes to stdout.  With --json, one JSON object per result goes
+to stdout instead, for comparing runs:
+
+    python benchmarks/bench_animations.py
+    python benchmarks/bench_animations.py --json > before.jsonl
+    python benchmarks/bench_animations.py --only fire,ripple --frames 20
+
+With --compare, each result is shown next to the same one from an earlier
+--json run, as after/before, so a ratio above 1 is a slowdown:
+
+    python benchmarks/bench_animations.py --compare before.jsonl
+"""
+import argparse
+import json
+import random
+import time
+
+import hostenv
+import simulator
+import utime
+from animation_fire import FireAnimation
+from animation_ladder import LadderAnimation
+from animation_pulse import PulseAnimation
+from animation_ripple import RippleAnimation
+from animation_shifting import ShiftingAnimation, ShiftingMatrixAnimation
+from animation_spinning import SpinningAnimation
+from colors import *
+from compositor import ADD, Compositor
+
+STRIPS = (8, 64, 144, 256, 1024)
+MATRICES = ((8, 8), (16, 16), (32, 32))
+FRAME_US = 20_000
+
+# name: (make animation for a strip of n pixels, runs on plain strips)
+ANIMATIONS = {
+    "pulse": (lambda n: PulseAnimation(), True),
+    "ladder": (lambda n: LadderAnimation(), True),
+    "spinning": (lambda n: SpinningAnimation(LIGHTBLUE), True),
+    "fire": (lambda n: FireAnimation(), True),
+    "ripple": (lambda n: RippleAnimation(x_span=n), True),
+    "shifting": (lambda n: ShiftingAnimation(), True),
+    "shifting_matrix": (lambda n: ShiftingMatrixAnimation(), False),
+    "layers": (lambda n: layers(), True),
+}
+
+
+def layers():
+    """
+    A Compositor with a pulse background and a spinning indicator added on top.
+    """
+    compositor = Compositor()
+    compositor.add(PulseAnimation())
+    compositor.add(SpinningAnimation(LIGHTBLUE), ADD)
+    return compositor
+
+
+def layouts():
+    for n in STRIPS:
+        yield "strip", n, 1
+    for width, height in MATRICES:
+        yield "matrix", width, height
+
+
+def measure(name, layout, width, height, frames):
+    """
+    Returns a dict of results for one animation on one strip or matrix.
+    """
+    make = ANIMATIONS[name][0]
+    random.seed(1)
+    utime.reset()
+    if layout == "matrix":
+        strip = simulator.make_strip(width=width, height=height)
+    else:
+        strip = simulator.make_strip(width)
+    n = strip.n
+    start = time.perf_counter()
+    strip.animation = make(n)
+    strip.reset()
+    reset_s = time.perf_counter() - start
+    drawing = 0.0
+    for _ in range(frames):
+        utime.advance_us(FRAME_US)
+        start = time.perf_counter()
+        strip.draw()
+        drawing += time.perf_counter() - start
+    return {
+        "animation": name,
+        "layout": layout,
+        "width": width,
+        "height": height,
+        "pixels": n,
+        "frames": frames,
+        "reset_us": round(reset_s * 1e6, 1),
+        "us_per_frame": round(drawing / frames * 1e6, 1),
+        "pixels_per_s": round(n * frames / drawing) if drawing > 0 else None,
+    }
+
+
+def run(names, frames):
+    for name in names:
+        on_strips = ANIMATIONS[name][1]
+        for layout, width, height in layouts():
+            if layout == "strip" and not on_strips:
+                continue
+            yield measure(name, layout, width, height, frames)
+
+
+def load(path):
+    """
+    Returns the us_per_frame of each result in a --json file, by (animation, layout, width, height).
+    """
+    before = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                r = json.loads(line)
+                before[(r["animation"], r["layout"], r["width"], r["height"])] = r["us_per_frame"]
+    return before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bundled animations.")
+    parser.add_argument("--frames", type=int, default=50, help="frames drawn per measurement")
+    parser.add_argument("--only", help="comma-separated animation names")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per line")
+    parser.add_argument("--compare", metavar="FILE", help="compare with the output of an earlier --json run")
+    args = parser.parse_args()
+    before = load(args.compare) if args.compare else {}
+    names = args.only.split(",") if args.only else list(ANIMATIONS)
+    for name in names:
+        if name not in ANIMATIONS:
+            parser.error("unknown animation {}; choose from {}".format(name, ", ".join(ANIMATIONS)))
+    if not args.json:
+        print("{:16s} {:>7s} {:>7s} {:>10s} {:>12s} {:>14s}{}".format(
+            "animation", "layout", "pixels", "reset us", "us/frame", "pixels/s",
+            " {:>12s} {:>7s}".format("before", "ratio") if before else ""))
+    for result in run(names, args.frames):
+        if args.json:
+            print(json.dumps(result))
+        else:
+            size = str(result["pixels"]) if result["layout"] == "strip" else "{}x{}".format(
+                result["width"], result["height"])
+            line = "{:16s} {:>7s} {:>7s} {:10.1f} {:12.1f} {:14,d}".format(
+                result["animation"], result["layout"], size, result["reset_us"],
+                result["us_per_frame"], result["pixels_per_s"] or 0)
+            key = (result["animation"], result["layout"], result["width"], result["height"])
+            if key in before:
+                line += " {:12.1f} {:6.2f}x".format(before[key], result["us_per_frame"] / before[key])
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
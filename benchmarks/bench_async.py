@@ -0,0 +1,100 @@
+"""
+Host-side check of the asyncio support, on CPython's asyncio.
+
+Four strips run as PixelStrip.run() tasks next to an I2cPerf.listen()
+task, while a simulated controller sends a command every 100 ms.  One
+strip has an animation that takes 30 ms per frame.  The script reports
+the frames each strip drew, and how long commands waited before being
+handled and before the strip drew a frame with the new animation.
+Tasks only switch between frames, so the slow strip bounds the latency
+and costs the others some frames.
+
+Runs in real time, so it takes a few seconds.
+
+    python benchmarks/bench_async.py
+"""
+import hostenv
+import time
+import utime
+import pixelstrip
+import simulator
+from aio import asyncio
+from i2cp import I2cPerf
+
+
+class MarkAnimation(pixelstrip.Animation):
+    """
+    Fills the strip with one color and records when each frame is drawn.
+    Each frame busy-waits for cost_ms, like a slow animation would.
+    """
+    def __init__(self, color, cost_ms=0):
+        pixelstrip.Animation.__init__(self)
+        self.color = color
+        self.cost_ms = cost_ms
+        self.draws = []
+
+    def draw(self, strip, delta_time):
+        self.draws.append(time.perf_counter())
+        end = time.perf_counter() + self.cost_ms / 1000
+        while time.perf_counter() < end:
+            pass
+        strip.fill(self.color)
+        strip.show()
+
+
+def stats(samples_ms):
+    samples_ms = sorted(samples_ms)
+    return "avg {:.2f} ms, max {:.2f} ms".format(sum(samples_ms) / len(samples_ms), samples_ms[-1])
+
+
+async def main(seconds=3.0):
+    utime.set_realtime(True)
+    rates = (60, 50, 30, 20)
+    strips = [simulator.make_strip(64, fps=fps) for fps in rates]
+    animations = [MarkAnimation(0x000010 * (i + 1), cost_ms=30 if i == 3 else 0) for i in range(len(rates))]
+    for s, a in zip(strips, animations):
+        s.animation = a
+
+    i2c = I2cPerf(1, sda=6, scl=7)
+    controller = simulator.I2cController(i2c)
+    sent = []
+    handled = []
+    applied = []
+
+    def receive(b):
+        handled.append(time.perf_counter())
+        s = strips[(b >> 4) % len(strips)]
+        a = MarkAnimation(b)
+        a.command = sent[len(handled) - 1]
+        applied.append(a)
+        s.animation = a
+
+    tasks = [asyncio.create_task(s.run()) for s in strips]
+    tasks.append(asyncio.create_task(i2c.listen(receive)))
+    start = time.perf_counter()
+    n = 0
+    while time.perf_counter() - start < seconds:
+        await asyncio.sleep(0.1)
+        # Give the first strip a new animation; the command's low bits pick its color.
+        sent.append(time.perf_counter())
+        controller.send(n & 0x0F)
+        n += 1
+    await asyncio.sleep(0.1)
+    for t in tasks:
+        t.cancel()
+    utime.set_realtime(False)
+
+    elapsed = time.perf_counter() - start
+    print("{:>5s} {:>8s} {:>8s}".format("fps", "frames", "expected"))
+    for s, a in zip(strips, animations):
+        frames = len(a.draws)
+        if s is strips[0]:
+            frames += sum(len(x.draws) for x in applied)
+        print("{:5d} {:8d} {:8.0f}".format(s.fps, frames, elapsed * s.fps))
+    print("commands sent: {}, handled: {}".format(len(sent), len(handled)))
+    print("send to handled:  " + stats([(h - t) * 1000 for t, h in zip(sent, handled)]))
+    print("send to drawn:    " + stats([(a.draws[0] - a.command) * 1000 for a in applied if a.draws]))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,56 @@
+"""
+Host-side benchmark for the bulk pixel write API.
+
+Compares writing a full 16x16 frame one pixel at a time against
+slice assignment, set_pixels(), write_bytes() and blit_rect().
+
+    python benchmarks/bench_bulk.py
+"""
+import time
+
+import hostenv
+import simulator
+
+
+def time_frames(fn, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        fn()
+    return (time.perf_counter() - start) / frames * 1e6
+
+
+def main(width=16, height=16, frames=200):
+    strip = simulator.make_strip(width=width, height=height)
+    n = strip.n
+    colors = [((p * 7) & 0xFF, (p * 13) & 0xFF, (p * 29) & 0xFF) for p in range(n)]
+    data = bytearray()
+    for c in colors:
+        data += bytes(c)
+
+    def per_pixel():
+        for p in range(n):
+            strip[p] = colors[p]
+
+    def per_xy():
+        for y in range(height):
+            for x in range(width):
+                strip[x, y] = colors[x + y * width]
+
+    def by_slice():
+        strip[:] = colors
+
+    results = [
+        ("strip[p] = c", time_frames(per_pixel, frames)),
+        ("strip[x, y] = c", time_frames(per_xy, frames)),
+        ("strip[:] = colors", time_frames(by_slice, frames)),
+        ("set_pixels", time_frames(lambda: strip.set_pixels(0, colors), frames)),
+        ("write_bytes", time_frames(lambda: strip.write_bytes(0, data), frames)),
+        ("blit_rect", time_frames(lambda: strip.blit_rect(0, 0, width, height, colors), frames)),
+    ]
+    print("{}x{} matrix, {} pixels".format(width, height, n))
+    for name, us in results:
+        print("{:20s} {:8.1f} us/frame".format(name, us))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Host-side benchmark for the integer color math in colormath.py.
+
+Each row compares a float helper the animations used before against
+the integer version they use now.  A PC has floating point hardware, so
+the gap here is far smaller than on the RP2040, which emulates floats in
+software and allocates every float result on the heap.
+
+    python benchmarks/bench_colormath.py
+"""
+import time
+from math import floor
+
+import hostenv
+import colormath
+
+
+def fade_color_float(color, brightness):
+    return (
+        floor(color[0] * brightness),
+        floor(color[1] * brightness),
+        floor(color[2] * brightness),
+    )
+
+
+def average_color_float(color1, color2, n, m):
+    r = int(color2[0]*n/m + color1[0]*(m-n)/m)
+    g = int(color2[1]*n/m + color1[1]*(m-n)/m)
+    b = int(color2[2]*n/m + color1[2]*(m-n)/m)
+    return (r, g, b)
+
+
+def scale8_float(i, sc):
+    return floor((i * sc) / 256)
+
+
+def time_calls(fn, count):
+    start = time.perf_counter()
+    for i in range(count):
+        fn(i & 0xFF)
+    return (time.perf_counter() - start) / count * 1e9
+
+
+def main(count=200_000):
+    color = (0xF0, 0x80, 0x20)
+    packed = colormath.to_packed(color)
+    other = (0x10, 0x40, 0xC0)
+    other_packed = colormath.to_packed(other)
+    rows = [
+        ("fade color",
+         lambda i: fade_color_float(color, i / 255),
+         lambda i: colormath.scale_color(packed, i)),
+        ("blend colors",
+         lambda i: average_color_float(color, other, i, 256),
+         lambda i: colormath.lerp(packed, other_packed, i)),
+        ("scale8",
+         lambda i: scale8_float(i, 192),
+         lambda i: colormath.scale8(i, 191)),
+    ]
+    print("{:14s} {:>12s} {:>12s}".format("", "float ns", "integer ns"))
+    for name, before, after in rows:
+        print("{:14s} {:12.1f} {:12.1f}".format(name, time_calls(before, count), time_calls(after, count)))
+
+
+if __name__ == "__main__":
+    main()
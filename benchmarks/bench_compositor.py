@@ -0,0 +1,189 @@
+"""
+Host-side check and benchmark of the Compositor.
+
+First, blend() is compared with the same blend done on (r, g, b) tuples,
+for every mode, several opacities and masked ranges, on random colors.
+Then a Compositor with a single OVER layer must send the same frames as
+the animation drawn alone, and a layer may use any PixelStrip method on
+its canvas, such as wait() or brightness.  Finally, the time to blend one layer is shown
+for each mode and strip size, along with whole frames of 1 to 4 layers.
+
+    python benchmarks/bench_compositor.py
+"""
+import random
+import time
+
+import hostenv
+import simulator
+import utime
+from array import array
+from animation_fire import FireAnimation
+from animation_ladder import LadderAnimation
+from animation_pulse import PulseAnimation
+from animation_spinning import SpinningAnimation
+from colors import *
+from compositor import ADD, MAX, MULTIPLY, OVER, Compositor, blend
+from pixelstrip import Animation
+
+MODES = {"over": OVER, "add": ADD, "multiply": MULTIPLY, "max": MAX}
+
+
+def reference(d, s, mode, opacity):
+    """
+    The blend of one pixel, worked out channel by channel on tuples.
+    """
+    d = ((d >> 16) & 0xFF, (d >> 8) & 0xFF, d & 0xFF)
+    s = ((s >> 16) & 0xFF, (s >> 8) & 0xFF, s & 0xFF)
+    k = opacity + 1
+    if mode == OVER:
+        if s == (0, 0, 0):
+            out = d
+        else:
+            out = tuple(dc + (((sc - dc) * k) >> 8) for dc, sc in zip(d, s))
+    elif mode == ADD:
+        out = tuple(min(dc + ((sc * k) >> 8), 255) for dc, sc in zip(d, s))
+    elif mode == MULTIPLY:
+        out = tuple(dc + ((((dc * (sc + 1)) >> 8) - dc) * k >> 8) for dc, sc in zip(d, s))
+    else:
+        out = tuple(dc + (((sc - dc) * k) >> 8) if sc > dc else dc for dc, sc in zip(d, s))
+    return (out[0] << 16) | (out[1] << 8) | out[2]
+
+
+def check_blend():
+    random.seed(5)
+    failed = []
+    n = 100
+    for name, mode in MODES.items():
+        for opacity in (0, 1, 100, 128, 254, 255):
+            for start, stop in ((0, None), (10, 60), (90, 200)):
+                # Some pixels are black or white, which OVER and MULTIPLY treat specially.
+                choices = [0, 0xFFFFFF] + [random.randrange(1 << 24) for _ in range(8)]
+                src = array("I", [random.choice(choices) if random.random() < 0.3 else random.randrange(1 << 24)
+                                  for _ in range(n)])
+                dst = array("I", [random.randrange(1 << 24) for _ in range(n)])
+                expected = array("I", dst)
+                hi = n if stop is None else min(stop, n)
+                if opacity > 0:
+                    for i in range(start, hi):
+                        expected[i] = reference(dst[i], src[i], mode, opacity)
+                blend(dst, src, mode, opacity, start, stop)
+                if dst != expected:
+                    failed.append((name, opacity, start, stop))
+    return failed
+
+
+def check_single_layers():
+    failed = []
+    for name, make in (("pulse", PulseAnimation), ("spinning", lambda: SpinningAnimation(LIGHTBLUE)),
+                       ("ladder", LadderAnimation), ("fire", FireAnimation)):
+        frames = []
+        for layered in (False, True):
+            utime.reset()
+            strip = simulator.make_strip(64)
+            animation = make_seeded(make)
+            if layered:
+                compositor = Compositor()
+                compositor.add(animation)
+                animation = compositor
+            strip.animation = animation
+            sent = []
+            for _ in range(200):
+                utime.advance_us(20_000)
+                strip.draw()
+                sent.append(bytes(strip._backend.frame))
+            frames.append(sent)
+        if frames[0] != frames[1]:
+            failed.append(name)
+    return failed
+
+
+class StripCallsAnimation(Animation):
+    """
+    Calls the PixelStrip methods that do not draw, as an animation might.
+    """
+
+    def draw(self, strip, delta_time):
+        strip.wait()
+        strip.busy()
+        strip.brightness = 0.5
+        strip.gamma = 2.2
+        strip.dither = True
+        strip.dither = False
+        strip.fill(RED)
+        strip.show()
+
+
+def check_canvas():
+    failed = []
+    utime.reset()
+    strip = simulator.make_strip(16)
+    compositor = Compositor()
+    layer = compositor.add(StripCallsAnimation())
+    strip.animation = compositor
+    try:
+        for _ in range(3):
+            utime.advance_us(20_000)
+            strip.draw()
+        layer.canvas.deinit()
+    except AttributeError as e:
+        failed.append(str(e))
+    if list(strip) != [RED] * 16:
+        failed.append("layer was not drawn")
+    return failed
+
+
+def make_seeded(make):
+    # Both runs must make their animation at the same point in the random sequence.
+    random.seed(9)
+    return make()
+
+
+def blend_us(mode, opacity, n, repeat=200):
+    random.seed(1)
+    src = array("I", [random.randrange(1 << 24) for _ in range(n)])
+    dst = array("I", [random.randrange(1 << 24) for _ in range(n)])
+    start = time.perf_counter()
+    for _ in range(repeat):
+        blend(dst, src, mode, opacity)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def frame_us(layers, n=144, frames=100):
+    utime.reset()
+    strip = simulator.make_strip(n)
+    compositor = Compositor()
+    for i in range(layers):
+        compositor.add(PulseAnimation(cycle_time=1.0 + i), ADD if i else OVER, 128 if i else 255)
+    strip.animation = compositor
+    start = time.perf_counter()
+    for _ in range(frames):
+        utime.advance_us(20_000)
+        strip.draw()
+    return (time.perf_counter() - start) / frames * 1e6
+
+
+def main():
+    failed = check_blend()
+    print("blend() against per-channel math: {}".format("ok" if not failed else failed))
+    single = check_single_layers()
+    print("one OVER layer matches the animation alone: {}".format("ok" if not single else single))
+    canvas = check_canvas()
+    print("PixelStrip methods on a canvas: {}".format("ok" if not canvas else canvas))
+    print()
+    print("{:10s} {:>8s} {:>12s} {:>12s} {:>12s}".format("mode", "opacity", "64 px us", "144 px us", "1024 px us"))
+    for name, mode in MODES.items():
+        for opacity in (255, 128):
+            print("{:10s} {:8d} {:12.1f} {:12.1f} {:12.1f}".format(
+                name, opacity, blend_us(mode, opacity, 64), blend_us(mode, opacity, 144),
+                blend_us(mode, opacity, 1024)))
+    print()
+    print("{:>6s} {:>16s}".format("layers", "144 px frame us"))
+    for layers in range(1, 5):
+        print("{:6d} {:16.1f}".format(layers, frame_us(layers)))
+    if failed or single or canvas:
+        raise SystemExit("compositor output is wrong")
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Host-side check of dirty tracking in NeoPixel.show().
+
+First, random changes are made through every write path, and after each
+show() the frame the LEDs would display is compared with the pixels, on
+both a plain and a double-buffered backend.  Slice assignments of tuples
+and lists of colors are checked, including wrong lengths, which must
+raise ValueError without changing anything, and so are fill() ranges.
+Then each bundled animation runs for ten seconds at 50 fps, reporting
+how many frames were sent and skipped, and how many bytes went out
+compared with sending every pixel.
+
+    python benchmarks/bench_dirty.py
+"""
+import random
+
+import hostenv
+import simulator
+from animation_fire import FireAnimation
+from animation_ladder import LadderAnimation
+from animation_pulse import PulseAnimation
+from animation_spinning import SpinningAnimation
+from colors import *
+
+
+class DoubleBufferedBackend(simulator.SimBackend):
+    asynchronous = True
+
+
+class ByteCounter(simulator.SimBackend):
+    def __init__(self):
+        simulator.SimBackend.__init__(self)
+        self.bytes = 0
+
+    def write(self, buf):
+        simulator.SimBackend.write(self, buf)
+        self.bytes += len(buf)
+
+
+def expected(strip):
+    r, g, b = strip._dim_r, strip._dim_g, strip._dim_b
+    return [(r[(c >> 16) & 0xFF], g[(c >> 8) & 0xFF], b[c & 0xFF]) for c in strip]
+
+
+def check(backend, rounds=2000):
+    rng = random.Random(1)
+    strip = simulator.make_strip(width=8, height=8, backend=backend)
+    n = strip.n
+    for r in range(rounds):
+        op = rng.randrange(8)
+        c = rng.randrange(0x1000000)
+        p = rng.randrange(n)
+        if op == 0:
+            strip[p] = c
+        elif op == 1:
+            strip[p] = (c >> 16, (c >> 8) & 0xFF, c & 0xFF)
+        elif op == 2:
+            strip[p:p + rng.randrange(1, 5)] = c
+        elif op == 3:
+            strip[p::-rng.randrange(1, 4)] = c
+        elif op == 4:
+            strip.set_pixels(p, [c, c ^ 0xFFFFFF])
+        elif op == 5:
+            strip.blit_rect(p % 8 - 1, p // 8, 3, 2, [c] * 6)
+        elif op == 6:
+            strip.brightness = rng.choice((0.25, 0.5, 1.0))
+        elif op == 7 and rng.randrange(10) == 0:
+            strip.fill(c)
+        if rng.randrange(3) == 0:
+            strip.show()
+            if backend.pixels() != expected(strip):
+                return "mismatch after {} changes".format(r)
+    return "ok, {} shows, {} skipped".format(strip.pushed, strip.skipped)
+
+
+def check_slices():
+    """
+    Returns a list of the slice assignments that did not work as they should.
+    """
+    failed = []
+    strip = simulator.make_strip(8)
+    strip[0:3] = (RED, GREEN, BLUE)
+    if [strip[i] for i in range(3)] != [RED, GREEN, BLUE]:
+        failed.append("tuple of packed colors")
+    strip[0:2] = (0x10, 0x20)
+    if [strip[i] for i in range(2)] != [0x10, 0x20]:
+        failed.append("tuple of two small packed colors")
+    strip[4:7] = (0x10, 0x20, 0x30)
+    if [strip[i] for i in range(4, 7)] != [0x102030] * 3:
+        failed.append("(r, g, b) tuple")
+    strip[0:4] = (0, 128, 0, 0)
+    if [strip[i] for i in range(4)] != [0x008000] * 4:
+        failed.append("(r, g, b, w) tuple")
+    strip[6::-3] = [RED, GREEN, BLUE]
+    if [strip[i] for i in (6, 3, 0)] != [RED, GREEN, BLUE]:
+        failed.append("list with a negative step")
+    strip.show()
+    before = list(strip)
+    for index, colors in ((slice(0, 3), [RED, GREEN]), (slice(0, 2), (RED, GREEN, BLUE, WHITE)),
+                          (slice(7, None, -2), [RED])):
+        try:
+            strip[index] = colors
+            failed.append("{} colors for {} did not raise ValueError".format(len(colors), index))
+        except ValueError:
+            pass
+        if list(strip) != before or strip.dirty:
+            failed.append("{} colors for {} changed the strip".format(len(colors), index))
+    return failed
+
+
+def check_fill():
+    """
+    Returns a list of the fill() calls that did not set and mark the pixels they should.
+    """
+    failed = []
+    for args, expected in (((0, None, 1), range(8)), ((1, None, 3), range(1, 8, 3)),
+                           ((-3, None, 1), range(5, 8)), ((0, -2, 2), range(0, 6, 2)),
+                           ((-20, 3, 1), range(0, 3)), ((6, 20, 1), range(6, 8))):
+        strip = simulator.make_strip(8)
+        strip.show()
+        strip.fill(RED, *args)
+        changed = [i for i in range(8) if strip[i] == RED]
+        if changed != list(expected):
+            failed.append("fill{} set {}".format(args, changed))
+        elif changed and (strip.dirty_range[0] > changed[0] or strip.dirty_range[1] <= changed[-1]):
+            failed.append("fill{} marked {}".format(args, strip.dirty_range))
+    try:
+        simulator.make_strip(8).fill(RED, 7, 0, -1)
+        failed.append("fill with a negative step did not raise ValueError")
+    except ValueError:
+        pass
+    return failed
+
+
+def main(seconds=10, fps=50):
+    print("plain backend:           " + check(simulator.SimBackend()))
+    print("double-buffered backend: " + check(DoubleBufferedBackend()))
+    failed = check_slices()
+    print("slice assignment:        " + ("ok" if not failed else ", ".join(failed)))
+    if failed:
+        raise SystemExit("slice assignment is wrong")
+    failed = check_fill()
+    print("fill:                    " + ("ok" if not failed else ", ".join(failed)))
+    if failed:
+        raise SystemExit("fill() is wrong")
+    print()
+    print("{:10s} {:>7s} {:>7s} {:>8s} {:>8s}".format("animation", "pushed", "skipped", "bytes", "full"))
+    animations = [
+        ("ladder", LadderAnimation()),
+        ("spinning", SpinningAnimation(LIGHTBLUE)),
+        ("pulse", PulseAnimation()),
+        ("fire", FireAnimation()),
+    ]
+    for name, animation in animations:
+        backend = ByteCounter()
+        strip = simulator.make_strip(144, backend=backend)
+        strip.animation = animation
+        strip.reset()
+        simulator.run(strip, frames=seconds * fps, fps=fps)
+        calls = strip.pushed + strip.skipped
+        print("{:10s} {:7d} {:7d} {:8d} {:8d}".format(
+            name, strip.pushed, strip.skipped, backend.bytes, calls * 3 * strip.n))
+
+
+if __name__ == "__main__":
+    main()
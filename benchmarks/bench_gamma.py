@@ -0,0 +1,94 @@
+"""
+Host-side check and benchmark of the gamma and dithering output stage.
+
+At a low brightness, every input level 0-255 is held for 256 frames, and
+the average level each output stage sends is compared with the exact
+brightness * gamma curve.  Plain truncation loses the fraction of a level
+every frame; dithering carries it over, so its average comes out right.
+The cost of show() is timed for each stage, and tracemalloc checks that
+a dithered show() does not allocate.  Gamma given as a list must give
+the same output as the same tuple.
+
+    python benchmarks/bench_gamma.py
+"""
+import time
+import tracemalloc
+
+import hostenv
+import simulator
+
+
+def average_error(strip, gamma, frames=256):
+    """
+    Returns the mean and worst difference, in output levels, between the
+    average sent for each input level and the exact curve.
+    """
+    brightness = strip.brightness
+    total = 0.0
+    worst = 0.0
+    for v in range(256):
+        strip.fill((v, v, v))
+        sent = 0
+        for _ in range(frames):
+            strip.show()
+            sent += strip._backend.frame[0]
+        exact = 255 * brightness * (v / 255) ** gamma
+        err = abs(sent / frames - exact)
+        total += err
+        worst = max(worst, err)
+    return total / 256, worst
+
+
+def show_us(strip, frames=300):
+    n = strip.n
+    for p in range(n):
+        strip[p] = ((p * 7) & 0xFF, (p * 13) & 0xFF, (p * 29) & 0xFF)
+    start = time.perf_counter()
+    for _ in range(frames):
+        strip._mark_dirty(0, n)
+        strip.show()
+    return (time.perf_counter() - start) / frames * 1e6
+
+
+def allocated_bytes(strip, frames=50):
+    strip.show()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(frames):
+        strip.show()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "lineno")
+    return sum(s.size_diff for s in stats if "npxl.py" in s.traceback[0].filename)
+
+
+def main(brightness=0.2):
+    stages = [
+        ("linear", {}, 1.0),
+        ("linear+dither", {"dither": True}, 1.0),
+        ("gamma 2.2", {"gamma": 2.2}, 2.2),
+        ("gamma+dither", {"gamma": 2.2, "dither": True}, 2.2),
+    ]
+    print("brightness {}".format(brightness))
+    print("{:14s} {:>10s} {:>10s} {:>10s}".format("", "mean err", "worst err", "us/144px"))
+    for name, kwargs, gamma in stages:
+        mean, worst = average_error(simulator.make_strip(1, brightness=brightness, **kwargs), gamma)
+        us = show_us(simulator.make_strip(144, brightness=brightness, **kwargs))
+        print("{:14s} {:10.3f} {:10.3f} {:10.1f}".format(name, mean, worst, us))
+    strip = simulator.make_strip(144, brightness=brightness, gamma=(2.2, 2.8, 2.5), dither=True)
+    print()
+    print("bytes allocated by 50 dithered shows: {}".format(allocated_bytes(strip)))
+    sent = []
+    for gamma in ((2.2, 2.8, 2.5), [2.2, 2.8, 2.5], [2, 2, 2], 2):
+        strip = simulator.make_strip(4, brightness=brightness, gamma=gamma)
+        strip.fill((40, 120, 200))
+        strip.show()
+        sent.append(bytes(strip._backend.frame))
+    same = sent[0] == sent[1] and sent[2] == sent[3]
+    print("gamma as a list: {}".format("ok" if same else "differs from a tuple"))
+    if not same:
+        raise SystemExit("gamma as a list gives different output")
+
+
+if __name__ == "__main__":
+    main()
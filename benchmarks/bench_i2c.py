@@ -0,0 +1,181 @@
+"""
+Host-side check of the framed I2C command protocol in i2ccmd.py.
+
+A simulated controller sends each kind of message to an I2cPerf, and the
+script checks that the strips changed: animation and params, brightness,
+a block of pixels longer than the 16-byte receive FIFO, and a stats query
+answered through a read.  Broken messages (a bad check byte, one cut
+short by the next message) must be dropped without upsetting the next.
+Then tracemalloc checks that parsing allocates nothing, and the time
+spent per message byte on the PC is shown.
+
+Last, the command-to-pixel latency is measured on the virtual clock:
+four strips run under a Scheduler at 50 fps while the controller sends
+blocks of pixels at 400 kHz, and the time from the end of each message
+to the first frame showing its pixels is reported.  Polling the I2cPerf
+between frames only moves one FIFO's worth (16 bytes) per frame, while
+an I2cReceiver drains the FIFO in the background every millisecond.
+
+    python benchmarks/bench_i2c.py
+"""
+import time
+import tracemalloc
+
+import hostenv
+import i2ccmd
+import simulator
+import utime
+from animation_pulse import PulseAnimation
+from i2cp import I2cPerf, I2cReceiver
+from profiler import FrameStats
+from scheduler import Scheduler
+
+# Time for one byte, with its acknowledge bit, at 400 kHz
+BYTE_US = 22
+
+
+class TimedBackend(simulator.SimBackend):
+    """
+    Records when each frame was sent, with the blue level of its first pixel.
+    """
+    def __init__(self):
+        simulator.SimBackend.__init__(self)
+        self.sent = []
+
+    def write(self, buf):
+        simulator.SimBackend.write(self, buf)
+        self.sent.append((utime.now_us(), self.frame[2]))
+
+
+def poll_all(parser, i2c, controller):
+    done = 0
+    while controller.pending() or controller.pending_reads():
+        done += parser.poll(i2c)
+    return done
+
+
+def check():
+    strips = [simulator.make_strip(12) for _ in range(4)]
+    animations = [PulseAnimation(), PulseAnimation([(0, 0, 136)])]
+    i2c = I2cPerf(1, sda=6, scl=7)
+    controller = simulator.I2cController(i2c)
+    parser = i2ccmd.CommandParser(i2ccmd.StripCommands(strips, animations))
+
+    controller.send(i2ccmd.frame(i2ccmd.SET_ANIMATION, [2, 1, 5, 10, 20, 30]))
+    poll_all(parser, i2c, controller)
+    assert strips[2].animation is animations[1]
+    assert animations[1].cycle_time == 0.5 and animations[1].color_list == [(10, 20, 30)]
+
+    controller.send(i2ccmd.frame(i2ccmd.SET_ANIMATION, [i2ccmd.ALL_STRIPS, 0]))
+    controller.send(i2ccmd.frame(i2ccmd.SET_BRIGHTNESS, [1, 51]))
+    poll_all(parser, i2c, controller)
+    assert all(s.animation is animations[0] for s in strips)
+    assert abs(strips[1].brightness - 0.2) < 1e-6
+
+    block = bytes(range(30))
+    controller.send(i2ccmd.frame(i2ccmd.SET_PIXELS, bytes([3, 2, 0]) + block))
+    poll_all(parser, i2c, controller)
+    assert strips[3].animation is None
+    assert [strips[3][2 + i] for i in range(10)] == [
+        (block[3 * i] << 16) | (block[3 * i + 1] << 8) | block[3 * i + 2] for i in range(10)]
+    assert strips[3]._backend.frame[6:9] == bytes([block[1], block[0], block[2]])
+
+    strips[0].stats = FrameStats()
+    strips[0].stats.frames = 0x01020304
+    controller.send(i2ccmd.frame(i2ccmd.QUERY_STATS, [0]))
+    poll_all(parser, i2c, controller)
+    controller.request(FrameStats.PACKED_SIZE)
+    poll_all(parser, i2c, controller)
+    assert bytes(controller.received[:4]) == bytes([4, 3, 2, 1]), controller.received
+
+    good = parser.messages
+    bad = bytearray(i2ccmd.frame(i2ccmd.SET_BRIGHTNESS, [0, 0]))
+    bad[-1] ^= 0xFF
+    controller.send(bad)
+    controller.send(i2ccmd.frame(i2ccmd.SET_PIXELS, bytes([0, 0, 0]) + block)[:10])
+    controller.send(i2ccmd.frame(i2ccmd.SET_BRIGHTNESS, [0, 255]))
+    poll_all(parser, i2c, controller)
+    assert parser.errors == 2 and parser.messages == good + 1
+    assert strips[0].brightness == 1.0
+    return "ok, {} messages, {} dropped".format(parser.messages, parser.errors)
+
+
+def allocated_bytes(messages=200):
+    i2c = I2cPerf(1, sda=6, scl=7)
+    controller = simulator.I2cController(i2c)
+    parser = i2ccmd.CommandParser(lambda command, payload, length, reply: 0)
+    msg = i2ccmd.frame(i2ccmd.SET_PIXELS, bytes(3 + 60))
+    controller.send(msg)
+    poll_all(parser, i2c, controller)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for b in msg * messages:
+        parser.feed(b)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "lineno")
+    return sum(s.size_diff for s in stats if "i2ccmd.py" in s.traceback[0].filename)
+
+
+def us_per_byte(messages=200):
+    i2c = I2cPerf(1, sda=6, scl=7)
+    controller = simulator.I2cController(i2c)
+    parser = i2ccmd.CommandParser(lambda command, payload, length, reply: 0)
+    msg = i2ccmd.frame(i2ccmd.SET_PIXELS, bytes(3 + 60))
+    for _ in range(messages):
+        controller.send(msg)
+    start = time.perf_counter()
+    done = poll_all(parser, i2c, controller)
+    elapsed = time.perf_counter() - start
+    assert done == messages
+    return elapsed / (messages * len(msg)) * 1e6
+
+
+def latency(background, pixels, messages=20, spacing_us=300_000):
+    """
+    Returns the mean and worst milliseconds from the end of each SET_PIXELS
+    message to the first frame showing it, and how many were shown.
+    """
+    utime.reset()
+    backend = TimedBackend()
+    strips = [simulator.make_strip(144, backend=backend)]
+    strips += [simulator.make_strip(144) for _ in range(3)]
+    animations = [PulseAnimation()]
+    for strip in strips[1:]:
+        strip.animation = animations[0]
+    i2c = I2cPerf(1, sda=6, scl=7)
+    controller = simulator.I2cController(i2c, byte_us=BYTE_US)
+    parser = i2ccmd.CommandParser(i2ccmd.StripCommands(strips, animations))
+    source = I2cReceiver(i2c) if background else i2c
+    ends = []
+    for k in range(messages):
+        payload = bytes([0, 0, 0]) + bytes([0, 0, k + 1]) * pixels
+        ends.append(controller.send(i2ccmd.frame(i2ccmd.SET_PIXELS, payload), at_us=(k + 1) * spacing_us))
+    Scheduler(strips).run(idle=lambda: parser.poll(source), seconds=(messages + 2) * spacing_us / 1e6)
+    waits = []
+    for k, end in enumerate(ends):
+        for t, blue in backend.sent:
+            if blue == k + 1:
+                waits.append((t - end) / 1000)
+                break
+    if background:
+        source.deinit()
+    return sum(waits) / max(len(waits), 1), max(waits, default=0), len(waits)
+
+
+def main():
+    print("protocol: " + check())
+    print("bytes allocated parsing 200 messages: {}".format(allocated_bytes()))
+    print("{:.2f} us per received byte on this PC, FIFO reads included".format(us_per_byte()))
+    print()
+    print("command-to-pixel latency, 4 strips at 50 fps")
+    print("{:>7s} {:>10s} {:>9s} {:>9s} {:>6s}".format("pixels", "receive", "mean ms", "worst ms", "shown"))
+    for pixels in (4, 48):
+        for background in (False, True):
+            mean, worst, shown = latency(background, pixels)
+            print("{:7d} {:>10s} {:9.1f} {:9.1f} {:6d}".format(
+                pixels, "timer" if background else "poll", mean, worst, shown))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Host-side check of palette mode in PixelStrip.
+
+Each animation that can run in palette mode is drawn twice from the same
+start, once writing colors and once with indexed=True, and every frame the
+LEDs would show must be the same.  Then the time per frame of both ways is
+shown.  In palette mode, show() does the per-pixel work, so that is
+included in both times.
+
+    python benchmarks/bench_indexed.py
+"""
+import random
+import time
+
+import hostenv
+import simulator
+import utime
+from animation_fire import FireAnimation
+from animation_pulse import PulseAnimation
+from animation_shifting import ShiftingAnimation, ShiftingMatrixAnimation
+
+FRAMES = 300
+
+# name: (make animation with indexed on or off, strip size)
+ANIMATIONS = {
+    "shifting": (lambda indexed: ShiftingAnimation(indexed=indexed), {"n": 144}),
+    "shifting 16x16": (lambda indexed: ShiftingMatrixAnimation(seed=7, indexed=indexed), {"width": 16, "height": 16}),
+    "pulse": (lambda indexed: PulseAnimation(indexed=indexed), {"n": 144}),
+    "pulse 3 colors": (lambda indexed: PulseAnimation([(255, 0, 0), (0, 255, 0), (0, 0, 255)], indexed=indexed), {"n": 144}),
+    "fire": (lambda indexed: FireAnimation(indexed=indexed), {"n": 144}),
+}
+
+
+def frames(make, size, indexed, count=FRAMES):
+    """
+    Returns the frames sent to the LEDs, and the seconds spent drawing them.
+    """
+    random.seed(3)
+    utime.reset()
+    strip = simulator.make_strip(**size)
+    strip.animation = make(indexed)
+    strip.reset()
+    sent = []
+    spent = 0.0
+    for _ in range(count):
+        utime.advance_us(20_000)
+        start = time.perf_counter()
+        strip.draw()
+        spent += time.perf_counter() - start
+        sent.append(bytes(strip._backend.frame))
+    return sent, spent
+
+
+def main():
+    failed = []
+    print("{:16s} {:>6s} {:>12s} {:>12s}".format("animation", "same", "colors us", "indexed us"))
+    for name, (make, size) in ANIMATIONS.items():
+        plain, plain_s = frames(make, size, False)
+        indexed, indexed_s = frames(make, size, True)
+        same = plain == indexed
+        print("{:16s} {:>6s} {:12.1f} {:12.1f}".format(
+            name, "yes" if same else "NO", plain_s / FRAMES * 1e6, indexed_s / FRAMES * 1e6))
+        if not same:
+            failed.append(name)
+    if failed:
+        raise SystemExit("palette mode shows different frames: " + ", ".join(failed))
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Host-side check and benchmark of npxl.ParallelOutput.
+
+The bits sent to the parallel state machine are split back out, one strip
+per pin, and compared with the frames the same animations send to
+separate strips.  Then the time to send one frame to 8 strips of 144
+pixels is compared on the virtual clock: 8 state machines one after the
+other, against one parallel state machine.  The transpose runs on the
+CPU, so its cost on the PC is shown too.
+
+    python benchmarks/bench_parallel.py
+"""
+import random
+import time
+
+import hostenv
+import utime
+import npxl
+import pixelstrip
+import simulator
+from animation_fire import FireAnimation
+from animation_pulse import PulseAnimation
+from animation_ripple import RippleAnimation
+
+
+def untranspose(words, count, nbytes):
+    """
+    Split the words put to the parallel state machine back into one byte string per pin.
+    """
+    bufs = [bytearray(nbytes) for _ in range(count)]
+    for j in range(nbytes):
+        for k in range(8):
+            v = (words[8 * j + k] >> 24) & 0xFF
+            for s in range(count):
+                if v & (1 << s):
+                    bufs[s][j] |= 0x80 >> k
+    return bufs
+
+
+def make_animations(count):
+    animations = []
+    for i in range(count):
+        if i % 3 == 0:
+            animations.append(FireAnimation())
+        elif i % 3 == 1:
+            animations.append(RippleAnimation(x_span=16))
+        else:
+            animations.append(PulseAnimation())
+    return animations
+
+
+def check(count=8, lengths=(144, 60, 144, 8, 100, 144, 5, 33), frames=20):
+    lengths = lengths[:count]
+    pixels = max(lengths)
+    random.seed(3)
+    singles = [simulator.make_strip(n, brightness=0.5) for n in lengths]
+    for strip, animation in zip(singles, make_animations(count)):
+        strip.animation = animation
+        strip.reset()
+    random.seed(3)
+    output = npxl.ParallelOutput(20, count, pixels)
+    strips = [pixelstrip.PixelStrip(20 + i, n, brightness=0.5, backend=output.channel(i))
+              for i, n in enumerate(lengths)]
+    for strip, animation in zip(strips, make_animations(count)):
+        strip.animation = animation
+        strip.reset()
+    utime.reset()
+    try:
+        for frame in range(frames):
+            random.seed(frame)
+            for strip in singles:
+                strip.draw()
+            random.seed(frame)
+            for strip in strips:
+                strip.draw()
+            output.show()
+            words = output._sm.last_put
+            if not words:
+                continue
+            sent = untranspose(words, count, len(words) // 8)
+            for s in range(count):
+                expect = singles[s]._backend.frame
+                got = sent[s][:len(expect)]
+                if got != expect[:len(got)]:
+                    return "strip {} differs in frame {}".format(s, frame)
+            output._sm.last_put = []
+            utime.advance_ms(20)
+    finally:
+        output.deinit()
+    return "ok"
+
+
+def send_time(parallel, count=8, pixels=144):
+    utime.reset()
+    if parallel:
+        output = npxl.ParallelOutput(0, count, pixels)
+        strips = [pixelstrip.PixelStrip(i, pixels, backend=output.channel(i)) for i in range(count)]
+    else:
+        strips = [pixelstrip.PixelStrip(i, pixels) for i in range(count)]
+    for s, strip in enumerate(strips):
+        strip.fill(0x010203 * (s + 1))
+        strip.show()
+    if parallel:
+        start = time.perf_counter()
+        output.show()
+        cpu = (time.perf_counter() - start) * 1e6
+        output.wait()
+    else:
+        cpu = 0
+        for strip in strips:
+            strip.wait()
+    us = utime.now_us()
+    if parallel:
+        output.deinit()
+    else:
+        for strip in strips:
+            strip.deinit()
+    return us, cpu
+
+
+def main():
+    print("transpose matches per-strip output: " + check())
+    print("with fewer strips:                  " + check(count=3))
+    serial, _ = send_time(False)
+    parallel, cpu = send_time(True)
+    print()
+    print("8 strips x 144 pixels, one frame")
+    print("8 state machines: {:8d} us on the wire".format(serial))
+    print("parallel:         {:8d} us on the wire, transpose {:.0f} us on this PC".format(parallel, cpu))
+
+
+if __name__ == "__main__":
+    main()
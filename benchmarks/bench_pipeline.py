@@ -0,0 +1,97 @@
+"""
+Host-side check of pipeline.Pipeline, using CPython threads.
+
+First, the frames sent with the pipeline are compared with the frames
+sent without it.  Then the frame rate is measured with a backend that
+holds the thread for as long as the real PIO transfer would take, the
+way StateMachine.put() holds the core on the Pico.  A PC draws far faster
+than the Pico, so the animation also sleeps to stand in for the Pico's
+drawing time, here the same as the transfer time.  Without the pipeline
+each frame costs the drawing time plus the transfer time; with it, the
+two overlap.  CPython threads share one core, so only sleeping overlaps.
+
+    python benchmarks/bench_pipeline.py
+"""
+import random
+import time
+
+import hostenv
+import npxl
+import utime
+import simulator
+from animation_fire import FireAnimation
+from animation_ripple import RippleAnimation
+from pipeline import Pipeline
+
+
+class WireBackend(simulator.SimBackend):
+    """
+    Blocks in write() for as long as the bytes take to shift out at 800 kHz.
+    """
+    def write(self, buf):
+        simulator.SimBackend.write(self, buf)
+        time.sleep(len(buf) * npxl.BYTE_US / 1_000_000)
+
+
+class PicoPaced(RippleAnimation):
+    """
+    RippleAnimation that also sleeps for draw_ms, as if drawing took that long.
+    """
+    def __init__(self, draw_ms, **kwargs):
+        RippleAnimation.__init__(self, **kwargs)
+        self.draw_ms = draw_ms
+
+    def draw(self, strip, delta_time):
+        time.sleep(self.draw_ms / 1000)
+        RippleAnimation.draw(self, strip, delta_time)
+
+
+def frames_sent(use_pipeline, frames=200):
+    random.seed(7)
+    strip = simulator.make_strip(144, backend=simulator.SimBackend(history=True))
+    strip.animation = FireAnimation()
+    pipe = None
+    if use_pipeline:
+        pipe = Pipeline([strip])
+        pipe.start()
+    strip.reset()
+    simulator.run(strip, frames=frames)
+    if pipe is not None:
+        pipe.stop()
+    return strip._backend.history
+
+
+def frame_rate(use_pipeline, n, frames=100):
+    utime.set_realtime(True)
+    strip = simulator.make_strip(n, backend=WireBackend())
+    strip.animation = PicoPaced(3 * n * npxl.BYTE_US / 1000, x_span=n)
+    pipe = None
+    if use_pipeline:
+        pipe = Pipeline([strip])
+        pipe.start()
+    strip.reset()
+    start = time.perf_counter()
+    for _ in range(frames):
+        strip.draw()
+    strip.wait()
+    elapsed = time.perf_counter() - start
+    if pipe is not None:
+        pipe.stop()
+    utime.set_realtime(False)
+    return frames / elapsed
+
+
+def main():
+    same = frames_sent(False) == frames_sent(True)
+    print("frames match: {}".format(same))
+    if not same:
+        raise SystemExit("pipelined frames differ")
+    print("{:>6s} {:>12s} {:>12s} {:>8s}".format("pixels", "serial fps", "pipeline fps", "gain"))
+    for n in (144, 300, 600):
+        serial = frame_rate(False, n)
+        piped = frame_rate(True, n)
+        print("{:6d} {:12.1f} {:12.1f} {:7.2f}x".format(n, serial, piped, piped / serial))
+
+
+if __name__ == "__main__":
+    main()
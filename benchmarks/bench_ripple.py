@@ -0,0 +1,108 @@
+"""
+Host-side check that the table-driven RippleAnimation matches the float curves it replaced.
+
+RippleAnimation used to compute two sin() calls per pixel per curve.  It
+now looks values up in an integer sine table, so its output is checked
+here against that float math.  The strip is drawn at many times on several
+strip sizes, and the palette index of every pixel is compared.  The script
+fails if any pixel differs by more than TOLERANCE palette steps, out of 255.
+Then the time per frame of both versions is shown.
+
+    python benchmarks/bench_ripple.py
+"""
+import time
+from math import sin
+
+import hostenv
+import simulator
+import utime
+from animation_ripple import RippleAnimation
+
+TOLERANCE = 3
+SIZES = (8, 64, 144, 256)
+FRAMES = 400
+
+
+def reference_index(anim, p, m):
+    """
+    The palette index that the float version of RippleAnimation gave pixel p at m milliseconds.
+    """
+    c = 0.0
+    for w, a, d in anim.curve_list:
+        s = d * anim.cycle_time
+        t0 = ((m % (s * 2)) - s) / s
+        t = 6.28 * sin(6.28 * t0)
+        c = c + sin(t + 6.28 * p / (w * 2 * anim.x_span)) * a
+    c = c / len(anim.curve_list)
+    if c <= 0.0:
+        return 0
+    if c >= 1.0:
+        return 255
+    return int(c * 254) + 1
+
+
+def compare(anim, n):
+    """
+    Returns the largest and the mean difference in palette index over FRAMES frames.
+    """
+    utime.reset()
+    strip = simulator.make_strip(n)
+    strip.animation = anim
+    # Make each palette entry its own index, so the strip holds indexes instead of colors.
+    anim._palette = list(range(256))
+    worst = 0
+    total = 0
+    for _ in range(FRAMES):
+        utime.advance_us(7_000)
+        strip.draw()
+        m = utime.ticks_ms()
+        for p in range(n):
+            diff = abs(strip._ar[p] - reference_index(anim, p, m))
+            worst = max(worst, diff)
+            total += diff
+    return worst, total / (FRAMES * n)
+
+
+def reference_draw(anim, strip):
+    m = utime.ticks_ms()
+    palette = anim._palette
+    for p in range(strip.n):
+        strip[p] = palette[reference_index(anim, p, m)]
+    strip.show()
+
+
+def frame_us(draw, n, frames=50):
+    utime.reset()
+    strip = simulator.make_strip(n)
+    anim = RippleAnimation(x_span=n)
+    strip.animation = anim
+    start = time.perf_counter()
+    for _ in range(frames):
+        utime.advance_us(20_000)
+        draw(anim, strip)
+    return (time.perf_counter() - start) / frames * 1e6
+
+
+def main():
+    failed = []
+    print("{:>6s} {:>10s} {:>10s} {:>11s} {:>11s}".format("pixels", "max diff", "mean diff", "float us", "table us"))
+    for n in SIZES:
+        worst, mean = compare(RippleAnimation(x_span=n), n)
+        before = frame_us(reference_draw, n)
+        after = frame_us(lambda anim, strip: strip.draw(), n)
+        print("{:6d} {:10d} {:10.3f} {:11.1f} {:11.1f}".format(n, worst, mean, before, after))
+        if worst > TOLERANCE:
+            failed.append(n)
+    # Other settings, including a cycle that is not a whole number of milliseconds.
+    for kwargs in ({"cycle_time": 333.3, "x_span": 30}, {"curve_list": [(0.5, 1.0, 2.0)], "x_span": 10}):
+        worst, mean = compare(RippleAnimation(**kwargs), 64)
+        print("{:>6s} {:10d} {:10.3f}   {}".format("64", worst, mean, kwargs))
+        if worst > TOLERANCE:
+            failed.append(kwargs)
+    if failed:
+        raise SystemExit("table output differs from the float curves: {}".format(failed))
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
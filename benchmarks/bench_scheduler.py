@@ -0,0 +1,107 @@
+"""
+Host-side check of the Scheduler's frame pacing.
+
+Runs strips at different frame rates from one Scheduler on the virtual
+clock, and reports how many frames each drew and the shortest and
+longest time between frame starts.  A second run uses an animation that
+sometimes takes longer than a frame, to show that late frames are
+skipped rather than bunched up.  Last, a fast strip shares the loop with
+one that takes 12 ms to draw, and no frame of either may start later
+than it had to: a frame that is late must have waited only for other
+draws, never for a sleep.
+
+    python benchmarks/bench_scheduler.py
+"""
+import hostenv
+import utime
+import pixelstrip
+import simulator
+from scheduler import Scheduler
+
+
+class TimedAnimation(pixelstrip.Animation):
+    """
+    Records when each frame starts, and takes cost_us of virtual time to draw.
+    Every slow_every frames, it takes slow_us instead.
+    """
+    def __init__(self, cost_us=500, slow_every=0, slow_us=0):
+        pixelstrip.Animation.__init__(self)
+        self.cost_us = cost_us
+        self.slow_every = slow_every
+        self.slow_us = slow_us
+        self.starts = []
+        self.ends = []
+
+    def draw(self, strip, delta_time):
+        self.starts.append(utime.now_us())
+        slow = self.slow_every and len(self.starts) % self.slow_every == 0
+        utime.advance_us(self.slow_us if slow else self.cost_us)
+        strip.show()
+        self.ends.append(utime.now_us())
+
+
+def report(title, strips, seconds):
+    print(title)
+    print("{:>5s} {:>8s} {:>8s} {:>10s} {:>10s} {:>10s}".format(
+        "fps", "frames", "expected", "period us", "min gap us", "max gap us"))
+    for strip in strips:
+        starts = strip.animation.starts
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        print("{:5d} {:8d} {:8d} {:10d} {:10d} {:10d}".format(
+            strip.fps, len(starts), seconds * strip.fps, 1_000_000 // strip.fps, min(gaps), max(gaps)))
+    print()
+
+
+def run(animations, rates, seconds):
+    utime.reset()
+    strips = []
+    for animation, fps in zip(animations, rates):
+        strip = simulator.make_strip(64, fps=fps)
+        strip.animation = animation
+        strips.append(strip)
+    Scheduler(strips).run(seconds=seconds)
+    return strips
+
+
+def late_frames(strips):
+    """
+    Returns (fps, frame, due us, start us) for each frame that started after it
+    was due while no strip was drawing.  Every frame here is due on its strip's
+    period from time 0, since none of them fall a whole frame behind.
+    """
+    draws = []
+    for strip in strips:
+        draws.extend(zip(strip.animation.starts, strip.animation.ends))
+    draws.sort()
+    late = []
+    for strip in strips:
+        period = 1_000_000 // strip.fps
+        for k, start in enumerate(strip.animation.starts):
+            due = k * period
+            busy_until = due
+            for a, b in draws:
+                if a <= busy_until < b:
+                    busy_until = b
+            if start > busy_until:
+                late.append((strip.fps, k, due, start))
+    return late
+
+
+def main(seconds=10):
+    rates = (60, 50, 20)
+    strips = run([TimedAnimation() for _ in rates], rates, seconds)
+    report("Three strips, each frame takes 500 us", strips, seconds)
+
+    strips = run([TimedAnimation(slow_every=10, slow_us=45_000)], (30,), seconds)
+    report("One strip, every tenth frame takes 45 ms", strips, seconds)
+
+    strips = run([TimedAnimation(), TimedAnimation(cost_us=12_000)], (50, 30), seconds)
+    report("A fast strip, then one whose frames take 12 ms", strips, seconds)
+    late = late_frames(strips)
+    if late:
+        raise SystemExit("frames started later than needed (fps, frame, due us, start us): {}".format(late[:5]))
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Host-side benchmark for NeoPixel.show().
+
+Compares the original per-pixel float brightness scaling against the
+lookup-table implementation in npxl.py.  Run with CPython:
+
+    python benchmarks/bench_show.py
+"""
+import array
+import time
+
+import hostenv
+import npxl
+import simulator
+
+
+def show_before(strip):
+    """
+    The show() brightness pass as it was before the lookup table.
+    """
+    dimmer_ar = array.array("I", [0 for _ in range(strip._num_pixels)])
+    for i, c in enumerate(strip._ar):
+        r = int(((c >> 16) & 0xFF) * strip._brightness)
+        g = int(((c >> 8) & 0xFF) * strip._brightness)
+        b = int((c & 0xFF) * strip._brightness)
+        dimmer_ar[i] = (g << 16) + (r << 8) + b
+    strip._backend.write(dimmer_ar.tobytes())
+    return dimmer_ar
+
+
+def grb_bytes(words):
+    out = bytearray()
+    for c in words:
+        out += bytes(((c >> 16) & 0xFF, (c >> 8) & 0xFF, c & 0xFF))
+    return out
+
+
+def time_frames(fn, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        fn()
+    return (time.perf_counter() - start) / frames * 1e6
+
+
+def main(num_pixels=144, frames=500, brightness=0.5):
+    strip = npxl.NeoPixel(4, num_pixels, brightness=brightness, auto_write=False, backend=simulator.SimBackend())
+    for p in range(num_pixels):
+        strip[p] = ((p * 7) & 0xFF, (p * 13) & 0xFF, (p * 29) & 0xFF)
+
+    expected = show_before(strip)
+    strip.show()
+    if strip._out != grb_bytes(expected):
+        raise SystemExit("lookup table output differs from float scaling")
+
+    def show_after():
+        # Every pixel counts as changed, so each show() sends a full frame.
+        strip._mark_dirty(0, num_pixels)
+        strip.show()
+
+    before = time_frames(lambda: show_before(strip), frames)
+    after = time_frames(show_after, frames)
+    print("pixels={} brightness={}".format(num_pixels, brightness))
+    print("before: {:8.1f} us/frame".format(before))
+    print("after:  {:8.1f} us/frame".format(after))
+    print("speedup: {:.2f}x".format(before / after))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Host-side check of the PIO state machine allocator in npxl.py.
+
+Creates strips on all eight state machines, checks that a ninth strip is
+refused instead of taking over a running one, that each PIO block holds
+the WS2812 program once, and that deinit() frees state machines for
+reuse.
+
+    python benchmarks/bench_state_machines.py
+"""
+import hostenv
+import rp2
+import npxl
+import pixelstrip
+
+
+def loaded():
+    return [len(rp2.PIO(block).programs()) for block in (0, 1)]
+
+
+def main():
+    pool = npxl.state_machines
+    strips = [pixelstrip.PixelStrip(pin, 8) for pin in range(8)]
+    print(pool)
+    print("programs loaded per block: {}".format(loaded()))
+    assert pool.available() == 0 and loaded() == [1, 1]
+
+    try:
+        pixelstrip.PixelStrip(8, 8)
+    except RuntimeError as e:
+        print("ninth strip refused: {}".format(e))
+    else:
+        raise SystemExit("ninth strip was given a state machine in use")
+
+    for strip in strips[4:]:
+        strip.deinit()
+    print("after freeing block 1: in use {}, programs loaded {}".format(pool.in_use(), loaded()))
+    assert pool.in_use() == [0, 1, 2, 3] and loaded() == [1, 0]
+
+    strips[1].deinit()
+    strip = pixelstrip.PixelStrip(9, 8)
+    print("new strip took sm{}".format(strip._backend._sm_id))
+    assert strip._backend._sm_id == 1
+
+    strip = pixelstrip.PixelStrip(10, 8, dma=True)
+    print("DMA strip took sm{}".format(strip._backend._sm_id))
+    strip.deinit()
+    assert pool.available() == 4
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
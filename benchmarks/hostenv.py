@@ -0,0 +1,15 @@
+"""
+Set up sys.path so the benchmarks run on a PC.
+
+The host stand-ins for the Pico modules (machine, rp2, utime) come first,
+then the library modules in the repository root, then the examples.
+Import this module before anything from the repository.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for _path in (os.path.join(ROOT, "examples"), ROOT, os.path.join(ROOT, "host")):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
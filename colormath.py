@@ -0,0 +1,80 @@
+from math import sin
+from colors import pack, unpack, to_packed
+
+# Integer color math for animations.
+# The RP2040 has no floating point hardware, so these helpers stick to
+# small integers.  Channel values and scale factors are 0-255, and a packed
+# color is a single int 0xRRGGBB, like the constants in colors.py.  Tuples
+# can be packed with to_packed() once, outside of any per-pixel loop.
+
+
+def scale8(i, scale):
+    """
+    Scale the value i by scale/256, where scale 255 leaves i unchanged.
+    """
+    return (i * (scale + 1)) >> 8
+
+
+def scale8_video(i, scale):
+    """
+    Like scale8, but never scales a nonzero value all the way to zero.
+    """
+    if i == 0 or scale == 0:
+        return 0
+    return ((i * scale) >> 8) + 1
+
+
+def blend8(a, b, amount):
+    """
+    Blend from value a (amount 0) toward value b (amount 255).
+    """
+    return a + (((b - a) * (amount + 1)) >> 8)
+
+
+def scale_color(c, scale):
+    """
+    Scale each channel of a packed color by scale/256.
+    """
+    s = scale + 1
+    return (((((c >> 16) & 0xFF) * s) >> 8) << 16) | (((((c >> 8) & 0xFF) * s) >> 8) << 8) | (((c & 0xFF) * s) >> 8)
+
+
+def lerp(c1, c2, amount):
+    """
+    Blend from packed color c1 (amount 0) toward packed color c2 (amount 255).
+    """
+    a = amount + 1
+    r1 = (c1 >> 16) & 0xFF
+    g1 = (c1 >> 8) & 0xFF
+    b1 = c1 & 0xFF
+    r = r1 + (((((c2 >> 16) & 0xFF) - r1) * a) >> 8)
+    g = g1 + (((((c2 >> 8) & 0xFF) - g1) * a) >> 8)
+    b = b1 + ((((c2 & 0xFF) - b1) * a) >> 8)
+    return (r << 16) | (g << 8) | b
+
+
+def gamma_table(gamma=2.2):
+    """
+    Build a 256-entry table mapping linear channel values to gamma-corrected values.
+    """
+    table = bytearray(256)
+    for v in range(256):
+        table[v] = int(255 * (v / 255) ** gamma + 0.5)
+    return table
+
+
+def _sine_table():
+    table = bytearray(256)
+    for i in range(256):
+        table[i] = int(127.5 + 127.5 * sin(i * 6.283185307 / 256))
+    return table
+
+
+SIN8 = _sine_table()
+
+
+def sin8(theta):
+    """
+    Integer sine.  A full circle is theta 0-255, and the result runs from 0 to 255 around 128.
+    """
+    return SIN8[theta & 0xFF]
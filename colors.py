@@ -1,148 +1,173 @@
-ALICEBLUE = (0xF0, 0xF8, 0xFF)
-AMETHYST = (0x99, 0x66, 0xCC)
-ANTIQUEWHITE = (0xFA, 0xEB, 0xD7)
-AQUA = (0x00, 0xFF, 0xFF)
-AQUAMARINE = (0x7F, 0xFF, 0xD4)
-AZURE = (0xF0, 0xFF, 0xFF)
-BEIGE = (0xF5, 0xF5, 0xDC)
-BISQUE = (0xFF, 0xE4, 0xC4)
-BLACK = (0x00, 0x00, 0x00)
-BLANCHEDALMOND = (0xFF, 0xEB, 0xCD)
-BLUE = (0x00, 0x00, 0xFF)
-BLUEVIOLET = (0x8A, 0x2B, 0xE2)
-BROWN = (0xA5, 0x2A, 0x2A)
-BURLYWOOD = (0xDE, 0xB8, 0x87)
-CADETBLUE = (0x5F, 0x9E, 0xA0)
-CHARTREUSE = (0x7F, 0xFF, 0x00)
-CHOCOLATE = (0xD2, 0x69, 0x1E)
-CORAL = (0xFF, 0x7F, 0x50)
-CORNFLOWERBLUE = (0x64, 0x95, 0xED)
-CORNSILK = (0xFF, 0xF8, 0xDC)
-CRIMSON = (0xDC, 0x14, 0x3C)
-CYAN = (0x00, 0xFF, 0xFF)
-DARKBLUE = (0x00, 0x00, 0x8B)
-DARKCYAN = (0x00, 0x8B, 0x8B)
-DARKGOLDENROD = (0xB8, 0x86, 0x0B)
-DARKGRAY = (0xA9, 0xA9, 0xA9)
-DARKGREY = (0xA9, 0xA9, 0xA9)
-DARKGREEN = (0x00, 0x64, 0x00)
-DARKKHAKI = (0xBD, 0xB7, 0x6B)
-DARKMAGENTA = (0x8B, 0x00, 0x8B)
-DARKOLIVEGREEN = (0x55, 0x6B, 0x2F)
-DARKORANGE = (0xFF, 0x8C, 0x00)
-DARKORCHID = (0x99, 0x32, 0xCC)
-DARKRED = (0x8B, 0x00, 0x00)
-DARKSALMON = (0xE9, 0x96, 0x7A)
-DARKSEAGREEN = (0x8F, 0xBC, 0x8F)
-DARKSLATEBLUE = (0x48, 0x3D, 0x8B)
-DARKSLATEGRAY = (0x2F, 0x4F, 0x4F)
-DARKSLATEGREY = (0x2F, 0x4F, 0x4F)
-DARKTURQUOISE = (0x00, 0xCE, 0xD1)
-DARKVIOLET = (0x94, 0x00, 0xD3)
-DEEPPINK = (0xFF, 0x14, 0x93)
-DEEPSKYBLUE = (0x00, 0xBF, 0xFF)
-DIMGRAY = (0x69, 0x69, 0x69)
-DIMGREY = (0x69, 0x69, 0x69)
-DODGERBLUE = (0x1E, 0x90, 0xFF)
-FIREBRICK = (0xB2, 0x22, 0x22)
-FLORALWHITE = (0xFF, 0xFA, 0xF0)
-FORESTGREEN = (0x22, 0x8B, 0x22)
-FUCHSIA = (0xFF, 0x00, 0xFF)
-GAINSBORO = (0xDC, 0xDC, 0xDC)
-GHOSTWHITE = (0xF8, 0xF8, 0xFF)
-GOLD = (0xFF, 0xD7, 0x00)
-GOLDENROD = (0xDA, 0xA5, 0x20)
-GRAY = (0x80, 0x80, 0x80)
-GREY = (0x80, 0x80, 0x80)
-GREEN = (0x00, 0x80, 0x00)
-GREENYELLOW = (0xAD, 0xFF, 0x2F)
-HONEYDEW = (0xF0, 0xFF, 0xF0)
-HOTPINK = (0xFF, 0x69, 0xB4)
-INDIANRED = (0xCD, 0x5C, 0x5C)
-INDIGO = (0x4B, 0x00, 0x82)
-IVORY = (0xFF, 0xFF, 0xF0)
-KHAKI = (0xF0, 0xE6, 0x8C)
-LAVENDER = (0xE6, 0xE6, 0xFA)
-LAVENDERBLUSH = (0xFF, 0xF0, 0xF5)
-LAWNGREEN = (0x7C, 0xFC, 0x00)
-LEMONCHIFFON = (0xFF, 0xFA, 0xCD)
-LIGHTBLUE = (0xAD, 0xD8, 0xE6)
-LIGHTCORAL = (0xF0, 0x80, 0x80)
-LIGHTCYAN = (0xE0, 0xFF, 0xFF)
-LIGHTGOLDENRODYELLOW = (0xFA, 0xFA, 0xD2)
-LIGHTGREEN = (0x90, 0xEE, 0x90)
-LIGHTGREY = (0xD3, 0xD3, 0xD3)
-LIGHTPINK = (0xFF, 0xB6, 0xC1)
-LIGHTSALMON = (0xFF, 0xA0, 0x7A)
-LIGHTSEAGREEN = (0x20, 0xB2, 0xAA)
-LIGHTSKYBLUE = (0x87, 0xCE, 0xFA)
-LIGHTSLATEGRAY = (0x77, 0x88, 0x99)
-LIGHTSLATEGREY = (0x77, 0x88, 0x99)
-LIGHTSTEELBLUE = (0xB0, 0xC4, 0xDE)
-LIGHTYELLOW = (0xFF, 0xFF, 0xE0)
-LIME = (0x00, 0xFF, 0x00)
-LIMEGREEN = (0x32, 0xCD, 0x32)
-LINEN = (0xFA, 0xF0, 0xE6)
-MAGENTA = (0xFF, 0x00, 0xFF)
-MAROON = (0x80, 0x00, 0x00)
-MEDIUMAQUAMARINE = (0x66, 0xCD, 0xAA)
-MEDIUMBLUE = (0x00, 0x00, 0xCD)
-MEDIUMORCHID = (0xBA, 0x55, 0xD3)
-MEDIUMPURPLE = (0x93, 0x70, 0xDB)
-MEDIUMSEAGREEN = (0x3C, 0xB3, 0x71)
-MEDIUMSLATEBLUE = (0x7B, 0x68, 0xEE)
-MEDIUMSPRINGGREEN = (0x00, 0xFA, 0x9A)
-MEDIUMTURQUOISE = (0x48, 0xD1, 0xCC)
-MEDIUMVIOLETRED = (0xC7, 0x15, 0x85)
-MIDNIGHTBLUE = (0x19, 0x19, 0x70)
-MINTCREAM = (0xF5, 0xFF, 0xFA)
-MISTYROSE = (0xFF, 0xE4, 0xE1)
-MOCCASIN = (0xFF, 0xE4, 0xB5)
-NAVAJOWHITE = (0xFF, 0xDE, 0xAD)
-NAVY = (0x00, 0x00, 0x80)
-OLDLACE = (0xFD, 0xF5, 0xE6)
-OLIVE = (0x80, 0x80, 0x00)
-OLIVEDRAB = (0x6B, 0x8E, 0x23)
-ORANGE = (0xFF, 0xA5, 0x00)
-ORANGERED = (0xFF, 0x45, 0x00)
-ORCHID = (0xDA, 0x70, 0xD6)
-PALEGOLDENROD = (0xEE, 0xE8, 0xAA)
-PALEGREEN = (0x98, 0xFB, 0x98)
-PALETURQUOISE = (0xAF, 0xEE, 0xEE)
-PALEVIOLETRED = (0xDB, 0x70, 0x93)
-PAPAYAWHIP = (0xFF, 0xEF, 0xD5)
-PEACHPUFF = (0xFF, 0xDA, 0xB9)
-PERU = (0xCD, 0x85, 0x3F)
-PINK = (0xFF, 0xC0, 0xCB)
-PLAID = (0xCC, 0x55, 0x33)
-PLUM = (0xDD, 0xA0, 0xDD)
-POWDERBLUE = (0xB0, 0xE0, 0xE6)
-PURPLE = (0x80, 0x00, 0x80)
-RED = (0xFF, 0x00, 0x00)
-ROSYBROWN = (0xBC, 0x8F, 0x8F)
-ROYALBLUE = (0x41, 0x69, 0xE1)
-SADDLEBROWN = (0x8B, 0x45, 0x13)
-SALMON = (0xFA, 0x80, 0x72)
-SANDYBROWN = (0xF4, 0xA4, 0x60)
-SEAGREEN = (0x2E, 0x8B, 0x57)
-SEASHELL = (0xFF, 0xF5, 0xEE)
-SIENNA = (0xA0, 0x52, 0x2D)
-SILVER = (0xC0, 0xC0, 0xC0)
-SKYBLUE = (0x87, 0xCE, 0xEB)
-SLATEBLUE = (0x6A, 0x5A, 0xCD)
-SLATEGRAY = (0x70, 0x80, 0x90)
-SLATEGREY = (0x70, 0x80, 0x90)
-SNOW = (0xFF, 0xFA, 0xFA)
-SPRINGGREEN = (0x00, 0xFF, 0x7F)
-STEELBLUE = (0x46, 0x82, 0xB4)
-TAN = (0xD2, 0xB4, 0x8C)
-TEAL = (0x00, 0x80, 0x80)
-THISTLE = (0xD8, 0xBF, 0xD8)
-TOMATO = (0xFF, 0x63, 0x47)
-TURQUOISE = (0x40, 0xE0, 0xD0)
-VIOLET = (0xEE, 0x82, 0xEE)
-WHEAT = (0xF5, 0xDE, 0xB3)
-WHITE = (0xFF, 0xFF, 0xFF)
-WHITESMOKE = (0xF5, 0xF5, 0xF5)
-YELLOW = (0xFF, 0xFF, 0x00)
-YELLOWGREEN = (0x9A, 0xCD, 0x32)
+# Colors are packed ints 0xRRGGBB.  Use unpack() to get an (r, g, b) tuple.
+
+ALICEBLUE = 0xF0F8FF
+AMETHYST = 0x9966CC
+ANTIQUEWHITE = 0xFAEBD7
+AQUA = 0x00FFFF
+AQUAMARINE = 0x7FFFD4
+AZURE = 0xF0FFFF
+BEIGE = 0xF5F5DC
+BISQUE = 0xFFE4C4
+BLACK = 0x000000
+BLANCHEDALMOND = 0xFFEBCD
+BLUE = 0x0000FF
+BLUEVIOLET = 0x8A2BE2
+BROWN = 0xA52A2A
+BURLYWOOD = 0xDEB887
+CADETBLUE = 0x5F9EA0
+CHARTREUSE = 0x7FFF00
+CHOCOLATE = 0xD2691E
+CORAL = 0xFF7F50
+CORNFLOWERBLUE = 0x6495ED
+CORNSILK = 0xFFF8DC
+CRIMSON = 0xDC143C
+CYAN = 0x00FFFF
+DARKBLUE = 0x00008B
+DARKCYAN = 0x008B8B
+DARKGOLDENROD = 0xB8860B
+DARKGRAY = 0xA9A9A9
+DARKGREY = 0xA9A9A9
+DARKGREEN = 0x006400
+DARKKHAKI = 0xBDB76B
+DARKMAGENTA = 0x8B008B
+DARKOLIVEGREEN = 0x556B2F
+DARKORANGE = 0xFF8C00
+DARKORCHID = 0x9932CC
+DARKRED = 0x8B0000
+DARKSALMON = 0xE9967A
+DARKSEAGREEN = 0x8FBC8F
+DARKSLATEBLUE = 0x483D8B
+DARKSLATEGRAY = 0x2F4F4F
+DARKSLATEGREY = 0x2F4F4F
+DARKTURQUOISE = 0x00CED1
+DARKVIOLET = 0x9400D3
+DEEPPINK = 0xFF1493
+DEEPSKYBLUE = 0x00BFFF
+DIMGRAY = 0x696969
+DIMGREY = 0x696969
+DODGERBLUE = 0x1E90FF
+FIREBRICK = 0xB22222
+FLORALWHITE = 0xFFFAF0
+FORESTGREEN = 0x228B22
+FUCHSIA = 0xFF00FF
+GAINSBORO = 0xDCDCDC
+GHOSTWHITE = 0xF8F8FF
+GOLD = 0xFFD700
+GOLDENROD = 0xDAA520
+GRAY = 0x808080
+GREY = 0x808080
+GREEN = 0x008000
+GREENYELLOW = 0xADFF2F
+HONEYDEW = 0xF0FFF0
+HOTPINK = 0xFF69B4
+INDIANRED = 0xCD5C5C
+INDIGO = 0x4B0082
+IVORY = 0xFFFFF0
+KHAKI = 0xF0E68C
+LAVENDER = 0xE6E6FA
+LAVENDERBLUSH = 0xFFF0F5
+LAWNGREEN = 0x7CFC00
+LEMONCHIFFON = 0xFFFACD
+LIGHTBLUE = 0xADD8E6
+LIGHTCORAL = 0xF08080
+LIGHTCYAN = 0xE0FFFF
+LIGHTGOLDENRODYELLOW = 0xFAFAD2
+LIGHTGREEN = 0x90EE90
+LIGHTGREY = 0xD3D3D3
+LIGHTPINK = 0xFFB6C1
+LIGHTSALMON = 0xFFA07A
+LIGHTSEAGREEN = 0x20B2AA
+LIGHTSKYBLUE = 0x87CEFA
+LIGHTSLATEGRAY = 0x778899
+LIGHTSLATEGREY = 0x778899
+LIGHTSTEELBLUE = 0xB0C4DE
+LIGHTYELLOW = 0xFFFFE0
+LIME = 0x00FF00
+LIMEGREEN = 0x32CD32
+LINEN = 0xFAF0E6
+MAGENTA = 0xFF00FF
+MAROON = 0x800000
+MEDIUMAQUAMARINE = 0x66CDAA
+MEDIUMBLUE = 0x0000CD
+MEDIUMORCHID = 0xBA55D3
+MEDIUMPURPLE = 0x9370DB
+MEDIUMSEAGREEN = 0x3CB371
+MEDIUMSLATEBLUE = 0x7B68EE
+MEDIUMSPRINGGREEN = 0x00FA9A
+MEDIUMTURQUOISE = 0x48D1CC
+MEDIUMVIOLETRED = 0xC71585
+MIDNIGHTBLUE = 0x191970
+MINTCREAM = 0xF5FFFA
+MISTYROSE = 0xFFE4E1
+MOCCASIN = 0xFFE4B5
+NAVAJOWHITE = 0xFFDEAD
+NAVY = 0x000080
+OLDLACE = 0xFDF5E6
+OLIVE = 0x808000
+OLIVEDRAB = 0x6B8E23
+ORANGE = 0xFFA500
+ORANGERED = 0xFF4500
+ORCHID = 0xDA70D6
+PALEGOLDENROD = 0xEEE8AA
+PALEGREEN = 0x98FB98
+PALETURQUOISE = 0xAFEEEE
+PALEVIOLETRED = 0xDB7093
+PAPAYAWHIP = 0xFFEFD5
+PEACHPUFF = 0xFFDAB9
+PERU = 0xCD853F
+PINK = 0xFFC0CB
+PLAID = 0xCC5533
+PLUM = 0xDDA0DD
+POWDERBLUE = 0xB0E0E6
+PURPLE = 0x800080
+RED = 0xFF0000
+ROSYBROWN = 0xBC8F8F
+ROYALBLUE = 0x4169E1
+SADDLEBROWN = 0x8B4513
+SALMON = 0xFA8072
+SANDYBROWN = 0xF4A460
+SEAGREEN = 0x2E8B57
+SEASHELL = 0xFFF5EE
+SIENNA = 0xA0522D
+SILVER = 0xC0C0C0
+SKYBLUE = 0x87CEEB
+SLATEBLUE = 0x6A5ACD
+SLATEGRAY = 0x708090
+SLATEGREY = 0x708090
+SNOW = 0xFFFAFA
+SPRINGGREEN = 0x00FF7F
+STEELBLUE = 0x4682B4
+TAN = 0xD2B48C
+TEAL = 0x008080
+THISTLE = 0xD8BFD8
+TOMATO = 0xFF6347
+TURQUOISE = 0x40E0D0
+VIOLET = 0xEE82EE
+WHEAT = 0xF5DEB3
+WHITE = 0xFFFFFF
+WHITESMOKE = 0xF5F5F5
+YELLOW = 0xFFFF00
+YELLOWGREEN = 0x9ACD32
+
+
+def pack(r, g, b):
+    """
+    Pack red, green and blue values (0-255) into one int 0xRRGGBB.
+    """
+    return (r << 16) | (g << 8) | b
+
+
+def unpack(c):
+    """
+    Split a packed color into a (red, green, blue) tuple.
+    """
+    return (c >> 16) & 0xFF, (c >> 8) & 0xFF, c & 0xFF
+
+
+def to_packed(color):
+    """
+    Return color as a packed int, whether given as an int or an (r, g, b) or (r, g, b, w) tuple.
+    """
+    if type(color) is int:
+        return color
+    return (color[0] << 16) | (color[1] << 8) | color[2]
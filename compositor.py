@@ -0,0 +1,252 @@
+import array
+import npxl
+import pixelstrip
+
+OVER = 0        # Layer pixels replace the pixels below, except where the layer is off (black)
+ADD = 1         # Layer colors are added to the colors below, up to full brightness
+MULTIPLY = 2    # Colors below are scaled by the layer colors, so black hides them and white keeps them
+MAX = 3         # Each channel is the brighter of the layer and the colors below
+
+
+def blend(dst, src, mode=OVER, opacity=255, start=0, stop=None):
+    """
+    Blend packed colors from src into dst, for pixels start up to (not including) stop.
+    opacity runs from 0 (no change) to 255 (the full effect of the blend mode).
+    """
+    n = min(len(dst), len(src))
+    if stop is None or stop > n:
+        stop = n
+    if start < 0:
+        start = 0
+    if opacity <= 0 or start >= stop:
+        return
+    if opacity > 255:
+        opacity = 255
+    if mode == OVER:
+        _over(dst, src, opacity, start, stop)
+    elif mode == ADD:
+        _add(dst, src, opacity, start, stop)
+    elif mode == MULTIPLY:
+        _multiply(dst, src, opacity, start, stop)
+    elif mode == MAX:
+        _max(dst, src, opacity, start, stop)
+    else:
+        raise ValueError("unknown blend mode {}".format(mode))
+
+
+def _over(dst, src, opacity, lo, hi):
+    if opacity == 255:
+        for i in range(lo, hi):
+            s = src[i]
+            if s:
+                dst[i] = s
+        return
+    k = opacity + 1
+    for i in range(lo, hi):
+        s = src[i]
+        if s:
+            d = dst[i]
+            r = (d >> 16) & 0xFF
+            g = (d >> 8) & 0xFF
+            b = d & 0xFF
+            r += ((((s >> 16) & 0xFF) - r) * k) >> 8
+            g += ((((s >> 8) & 0xFF) - g) * k) >> 8
+            b += (((s & 0xFF) - b) * k) >> 8
+            dst[i] = (r << 16) | (g << 8) | b
+
+
+def _add(dst, src, opacity, lo, hi):
+    k = opacity + 1
+    for i in range(lo, hi):
+        s = src[i]
+        if s:
+            d = dst[i]
+            r = ((d >> 16) & 0xFF) + ((((s >> 16) & 0xFF) * k) >> 8)
+            g = ((d >> 8) & 0xFF) + ((((s >> 8) & 0xFF) * k) >> 8)
+            b = (d & 0xFF) + (((s & 0xFF) * k) >> 8)
+            if r > 255:
+                r = 255
+            if g > 255:
+                g = 255
+            if b > 255:
+                b = 255
+            dst[i] = (r << 16) | (g << 8) | b
+
+
+def _multiply(dst, src, opacity, lo, hi):
+    k = opacity + 1
+    for i in range(lo, hi):
+        s = src[i]
+        if s != 0xFFFFFF:
+            d = dst[i]
+            r = (d >> 16) & 0xFF
+            g = (d >> 8) & 0xFF
+            b = d & 0xFF
+            # A channel times (s + 1) / 256 leaves it unchanged where s is 255.
+            mr = (r * (((s >> 16) & 0xFF) + 1)) >> 8
+            mg = (g * (((s >> 8) & 0xFF) + 1)) >> 8
+            mb = (b * ((s & 0xFF) + 1)) >> 8
+            r += ((mr - r) * k) >> 8
+            g += ((mg - g) * k) >> 8
+            b += ((mb - b) * k) >> 8
+            dst[i] = (r << 16) | (g << 8) | b
+
+
+def _max(dst, src, opacity, lo, hi):
+    k = opacity + 1
+    for i in range(lo, hi):
+        s = src[i]
+        if s:
+            d = dst[i]
+            r = (d >> 16) & 0xFF
+            g = (d >> 8) & 0xFF
+            b = d & 0xFF
+            sr = (s >> 16) & 0xFF
+            sg = (s >> 8) & 0xFF
+            sb = s & 0xFF
+            if sr > r:
+                r += ((sr - r) * k) >> 8
+            if sg > g:
+                g += ((sg - g) * k) >> 8
+            if sb > b:
+                b += ((sb - b) * k) >> 8
+            dst[i] = (r << 16) | (g << 8) | b
+
+
+class Canvas(pixelstrip.PixelStrip):
+    """
+    The pixels of one Compositor layer.  It is drawn on like a PixelStrip the
+    same size as the real one, and shares that strip's matrix layout, but it
+    is only a buffer of packed colors: it has no output buffers, and its
+    show() sends nothing.  Its brightness, gamma and dither can be set, but
+    only those of the real strip change what the LEDs show.
+    """
+
+    def __init__(self, strip):
+        # NeoPixel.__init__ is not called, so it has no output buffers or state machine.
+        n = strip.n
+        self._num_pixels = n
+        self._bpp = strip.bpp
+        self._ar = array.array("I", [0 for _ in range(n)])
+        self._dirty_lo = 0
+        self._dirty_hi = n
+        self.auto_write = False
+        self.stats = None
+        self.pushed = 0
+        self.skipped = 0
+        self._brightness = 1.0
+        self._gamma = None
+        self._residual = None
+        # A Backend that sends nothing, so wait(), busy() and deinit() return at once.
+        self._backend = npxl.Backend()
+        self._pipeline = None
+        self._pending = False
+        self._width = strip.width
+        self._height = strip.height
+        self._options = strip.options
+        self._index_map = strip._index_map
+        self._init_drawing(strip.fps)
+
+    def show(self):
+        if self._palette is not None:
+            self._resolve()
+        self._dirty_lo = self._num_pixels
+        self._dirty_hi = 0
+
+    def _update_dimmer(self):
+        # There are no output tables to rebuild.
+        pass
+
+    def fits(self, strip):
+        """
+        Returns True if this canvas has the same size and layout as strip.
+        """
+        return self.n == strip.n and self._index_map is strip._index_map
+
+
+class Layer:
+    """
+    One animation in a Compositor, and how it is blended onto the layers below.
+    Only pixels start up to (not including) stop are blended; the rest are masked off.
+    mode, opacity, start and stop can be changed between frames, to fade or move a layer.
+    """
+
+    def __init__(self, animation, mode=OVER, opacity=255, start=0, stop=None):
+        self.animation = animation
+        self.mode = mode
+        self.opacity = opacity
+        self.start = start
+        self.stop = stop
+        self.canvas = None
+
+
+class Compositor(pixelstrip.Animation):
+    """
+    An Animation made of other animations, drawn as layers.  Each layer's
+    animation draws on its own Canvas, and then the canvases are blended in
+    order, from the first layer at the bottom to the last at the top, onto
+    the background color.  The strip is shown once per frame.
+    """
+
+    def __init__(self, layers=None, background=0, name=None):
+        pixelstrip.Animation.__init__(self, name)
+        self.layers = [] if layers is None else list(layers)
+        self.background = background
+        self._frame = None
+
+    def add(self, animation, mode=OVER, opacity=255, start=0, stop=None):
+        """
+        Add an animation as a new top layer, and return its Layer.
+        """
+        layer = Layer(animation, mode, opacity, start, stop)
+        self.layers.append(layer)
+        return layer
+
+    def reset(self, strip):
+        # The layers are blended here, and then only changed pixels are copied to the strip.
+        self._frame = array.array("I", [0 for _ in range(strip.n)])
+        for layer in self.layers:
+            self._attach(layer, strip)
+        strip.clear()
+
+    def _attach(self, layer, strip):
+        """
+        Give the layer a canvas that fits the strip, and reset its animation on it.
+        """
+        if layer.canvas is None or not layer.canvas.fits(strip):
+            layer.canvas = Canvas(strip)
+        layer.canvas.animation = layer.animation
+
+    def draw(self, strip, delta_time):
+        frame = self._frame
+        n = strip.n
+        if frame is None or len(frame) != n:
+            frame = self._frame = array.array("I", [0 for _ in range(n)])
+        background = self.background
+        if type(background) is not int:
+            background = (background[0] << 16) | (background[1] << 8) | background[2]
+        for i in range(n):
+            frame[i] = background
+        for layer in self.layers:
+            canvas = layer.canvas
+            if canvas is None or canvas.animation is not layer.animation or not canvas.fits(strip):
+                # Added or changed since the last reset
+                self._attach(layer, strip)
+                canvas = layer.canvas
+            canvas.draw()
+            blend(frame, canvas._ar, layer.mode, layer.opacity, layer.start, layer.stop)
+        # Copy the frame, marking only the pixels that changed, so show() can
+        # skip or shorten frames as it does for any other animation.
+        ar = strip._ar
+        lo = n
+        hi = 0
+        for i in range(n):
+            c = frame[i]
+            if ar[i] != c:
+                ar[i] = c
+                if i < lo:
+                    lo = i
+                hi = i + 1
+        if lo < hi:
+            strip._mark_dirty(lo, hi)
+        strip.show()
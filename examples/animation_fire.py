@@ -1,7 +1,8 @@
 from utime import sleep
+from array import array
 from random import randint
-from math import sin, floor
 from machine import Pin
+from colormath import scale8
 import pixelstrip
 
 PIN = 4
@@ -17,57 +18,105 @@ blendTotal = (blendSelf + blendNeighbor1 + blendNeighbor2 + blendNeighbor3)
 class FireAnimation(pixelstrip.Animation):
     """
     See https://github.com/davepl/DavesGarageLEDSeries/blob/master/LED%20Episode%2010/include/fire.h
+    On a matrix, each column is its own flame, rising from the bottom row.
+    With indexed=True, a strip (but not a matrix) runs in palette mode and
+    shows the heat buffer directly through HEAT_COLORS.
     """
-    def __init__(self, cooling=60, sparking=50, sparks=3, sparkHeight=4):
+    def __init__(self, cooling=60, sparking=50, sparks=3, sparkHeight=4, indexed=False):
         pixelstrip.Animation.__init__(self)
         self.cooling = cooling
         self.sparking = sparking
         self.sparks = sparks
         self.sparkHeight = sparkHeight
+        self.indexed = indexed
+        self._seed = randint(1, 0xFFFF)
 
     def reset(self, strip):
-        self.heat = [0] * strip.n
         strip.clear()
+        if strip.height > 1:
+            self._columns = strip.width
+            self._size = strip.height
+            # Colors for one column, top to bottom, for blit_column()
+            self._column = array("I", bytes(4 * strip.height))
+        else:
+            self._columns = 1
+            self._size = strip.n
+        # Heat of each cell, 0-255, column by column from the bottom of each flame up
+        self.heat = bytearray(self._columns * self._size)
+        if self.indexed and self._columns == 1:
+            strip.palette = HEAT_COLORS
+            strip.indexes = self.heat
 
     def draw(self, strip, delta_time):
-        size = strip.n
-        
+        heat = self.heat
+        size = self._size
+        # Random numbers come from a 16-bit xorshift, kept in x
+        x = self._seed
+
         # First cool each cell by a little bit
-        coolRange = floor(((self.cooling * 10) / size) + 2)
-        for p in range(size):
-            self.heat[p] = max(0, floor(self.heat[p] - randint(0, coolRange)))
-            
-        # Next drift heat up and diffuse it a little bit
-        for p in range(3, size):
-            self.heat[p] = floor((self.heat[p] * blendSelf + 
-                       self.heat[(p - 1) % strip.n] * blendNeighbor1 + 
-                       self.heat[(p - 2) % strip.n] * blendNeighbor2 + 
-                       self.heat[(p - 3) % strip.n] * blendNeighbor3) / blendTotal) % 256
-
-        # Randomly ignite new sparks down in the flame kernel
-        for _ in range(self.sparks):
-            if randint(0, 255) < self.sparking:
-                p = randint(0, self.sparkHeight)
-                self.heat[p] = (self.heat[p] + randint(160, 255)) % 256
-
-        for p in range(size):
-            strip[p] = heatColor(self.heat[p])
+        coolRange = (self.cooling * 10) // size + 2
+        coolSpan = coolRange + 1
+        for p in range(len(heat)):
+            x ^= (x << 7) & 0xFFFF
+            x ^= x >> 9
+            x ^= (x << 8) & 0xFFFF
+            cool = (x * coolSpan) >> 16
+            h = heat[p]
+            heat[p] = h - cool if h > cool else 0
+
+        sparkRange = min(self.sparkHeight, size - 1) + 1
+        # A while loop, since range() with a step that is not a constant makes an object.
+        base = 0
+        end = len(heat)
+        while base < end:
+            # Next drift heat up and diffuse it a little bit
+            for p in range(base + 3, base + size):
+                heat[p] = (heat[p] * blendSelf +
+                           heat[p - 1] * blendNeighbor1 +
+                           heat[p - 2] * blendNeighbor2 +
+                           heat[p - 3] * blendNeighbor3) // blendTotal
+
+            # Randomly ignite new sparks down in the flame kernel
+            for _ in range(self.sparks):
+                x ^= (x << 7) & 0xFFFF
+                x ^= x >> 9
+                x ^= (x << 8) & 0xFFFF
+                if (x >> 8) < self.sparking:
+                    x ^= (x << 7) & 0xFFFF
+                    x ^= x >> 9
+                    x ^= (x << 8) & 0xFFFF
+                    p = base + ((x * sparkRange) >> 16)
+                    heat[p] = (heat[p] + 160 + (((x & 0xFF) * 96) >> 8)) & 0xFF
+            base += size
+        self._seed = x
+
+        if self._columns == 1:
+            if strip.indexes is not heat:
+                strip.write_indexed(0, heat, HEAT_COLORS)
+        else:
+            column = self._column
+            for xx in range(self._columns):
+                p = xx * size + size - 1
+                for y in range(size):
+                    column[y] = HEAT_COLORS[heat[p - y]]
+                strip.blit_column(xx, column)
 
         strip.show()
-        
+
 def heatColor(temperature):
     """Translate a temperature number (0-255) into a color representing its heat"""
-    t192 = scale8_video(temperature, 192)
+    t192 = scale8(temperature, 191)
     heatramp = (t192 & 0x3F) << 2
     if t192 & 0x80:
-        return (0xFF, 0xFF, heatramp, 0x00)
+        return 0xFFFF00 | heatramp
     elif t192 & 0x40:
-        return (0xFF, heatramp, 0x00, 0x00)
+        return 0xFF0000 | (heatramp << 8)
     else:
-        return (heatramp, 0x00, 0x00, 0x00)
-    
-def scale8_video(i, sc):
-    return floor((i * sc) / 256)
+        return heatramp << 16
+
+
+# The packed color of every temperature
+HEAT_COLORS = array("I", [heatColor(t) for t in range(256)])
 
 def blink(n, strip=None):
     """Blink lights to show that the program has loaded successfully"""
@@ -86,13 +135,13 @@ def blink(n, strip=None):
             strip.show()
         sleep(0.3)
 
+# import scheduler
+#
 # def main():
 #     strip1 = pixelstrip.PixelStrip(PIN, NUM_PIXELS)
 #     strip1.animation = FireAnimation(cooling=70, sparking=30)
 #     blink(3, strip=strip1)
-#     while True:
-#         strip1.draw()
-#         sleep(0.02)
+#     scheduler.Scheduler([strip1]).run()
         
 # main()
 
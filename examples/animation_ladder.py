@@ -1,5 +1,5 @@
-from utime import sleep
 from colors import *
+from colormath import to_packed
 import pixelstrip
 
 class LadderAnimation(pixelstrip.Animation):
@@ -14,24 +14,27 @@ class LadderAnimation(pixelstrip.Animation):
 
     def reset(self, strip):
         self.pixel_state = 0
-        self.timeout = self.cycle_time
+        self._cycle_ms = int(self.cycle_time * 1000)
+        self._color = to_packed(self.color)
+        self.timeout_ms = self._cycle_ms
         strip.clear()
 
     def draw(self, strip, delta_time):
         if self.is_timed_out():
-            self.timeout = self.cycle_time
+            self.timeout_ms = self._cycle_ms
             self.pixel_state = (self.pixel_state + 1) % 3
-            for p in range(strip.n):
-                color = self.color if ((p + self.pixel_state) % 3) == 0 else (0, 0, 0, 0)
-                strip[p] = color
+            first = (3 - self.pixel_state) % 3
+            n = strip.n
+            strip.fill(BLACK)
+            strip.fill(self._color, first, n, 3)
             strip.show()
 
 
+# import scheduler
+#
 # def main():
 #     strip = pixelstrip.PixelStrip(4, 8)
 #     strip.animation = LadderAnimation()
-#     while True:
-#         strip.draw()
-#         sleep(0.02)
+#     scheduler.Scheduler([strip]).run()
 #
 # main()
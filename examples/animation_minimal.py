@@ -1,4 +1,3 @@
-from utime import sleep
 import pixelstrip
 
 # This is a minimal example of an Animation.
@@ -23,11 +22,11 @@ class MyAnimation(pixelstrip.Animation):
         strip.show()
 
 
+# import scheduler
+#
 # def main():
 #     strip = pixelstrip.PixelStrip(4, 8)
 #     strip.animation = MyAnimation()
-#     while True:
-#         strip.draw()
-#         sleep(0.002)
+#     scheduler.Scheduler([strip]).run()
 #
 # main()
@@ -1,6 +1,6 @@
-from utime import sleep
-from math import sin, floor
+from utime import ticks_ms
 from colors import *
+from colormath import to_packed, scale_color, sin8
 import pixelstrip
 
 class PulseAnimation(pixelstrip.Animation):
@@ -8,44 +8,78 @@ class PulseAnimation(pixelstrip.Animation):
     Pixels are colored alternately based on a color_list.
     Then, the different colors are pulsed bright to dark, each color
     slightly out of sequence.
+    With indexed=True, the strip runs in palette mode, and each frame only
+    changes one palette color for each color in color_list.
     """
-    def __init__(self, color_list=[GREEN, YELLOW], cycle_time=2.0, name=None):
+    def __init__(self, color_list=[GREEN, YELLOW], cycle_time=2.0, name=None, indexed=False):
         pixelstrip.Animation.__init__(self, name)
         self.color_list = color_list
         self.cycle_time = cycle_time
+        self.indexed = indexed
+        self._count = 0
+
+    @property
+    def cycle_time(self):
+        return self._cycle_ms / 1000
+
+    @cycle_time.setter
+    def cycle_time(self, t):
+        # Kept in milliseconds, so draw() does no float math
+        self._cycle_ms = max(int(t * 1000), 1)
 
     def reset(self, strip):
         strip.clear()
+        if self.indexed:
+            self._use_palette(strip)
         strip.show()
 
-    def draw(self, strip, delta_time):
-        t = pixelstrip.current_time() % self.cycle_time
+    def _use_palette(self, strip):
+        """
+        Give the strip one palette color for each color in color_list, used by every count-th pixel.
+        """
+        count = len(self.color_list)
+        strip.palette = [0] * count
+        indexes = strip.indexes
         for p in range(strip.n):
-            color_num = p % len(self.color_list)
-            time_shift = color_num * (self.cycle_time / len(self.color_list))
-            brightness = self.fade((t + time_shift) % self.cycle_time)
-            color1 = self.color_list[color_num]
-            color2 = self.fade_color(color1, brightness)
-            strip[p] = color2
+            indexes[p] = p % count
+        self._count = count
+
+    def draw(self, strip, delta_time):
+        # Every pixel of one color shares a brightness, so fade each color once
+        # and then write it into every pixel of that color.
+        cycle_ms = self._cycle_ms
+        t = ticks_ms() % cycle_ms
+        count = len(self.color_list)
+        n = strip.n
+        indexed = self.indexed
+        if indexed and count != self._count:
+            # set_params() changed the number of colors
+            self._use_palette(strip)
+        for color_num in range(count):
+            phase = ((t * 256) // cycle_ms + (color_num * 256) // count) & 0xFF
+            color = scale_color(to_packed(self.color_list[color_num]), sin8(phase))
+            if indexed:
+                strip.set_palette_color(color_num, color)
+            else:
+                strip.fill(color, color_num, n, count)
         strip.show()
-    
-    def fade(self, t):
-        theta = 3.14159 * 2 * t / self.cycle_time
-        return (sin(theta) + 1.0) / 2.0
-    
-    @staticmethod
-    def fade_color(color, brightness):
-        return (
-            floor(color[0] * brightness),
-            floor(color[1] * brightness),
-            floor(color[2] * brightness),
-        )
 
+    def set_params(self, data, start, count):
+        """
+        The first byte is the cycle time in tenths of a second, and any
+        bytes after it are (r, g, b) colors for a new color_list.
+        """
+        if count >= 1 and data[start] > 0:
+            self.cycle_time = data[start] / 10
+        if count >= 4:
+            self.color_list = [(data[i], data[i + 1], data[i + 2])
+                               for i in range(start + 1, start + count - 2, 3)]
+
+# import scheduler
+#
 # def main():
 #     strip = pixelstrip.PixelStrip(4, 8)
 #     strip.animation = PulseAnimation()
-#     while True:
-#         strip.draw()
-#         sleep(0.02)
+#     scheduler.Scheduler([strip]).run()
 #
 # main()
@@ -1,7 +1,43 @@
-from utime import sleep
-from math import sin, floor, ceil
+from utime import ticks_ms
+from math import sin, pi
+from array import array
+from colormath import to_packed, lerp
 import pixelstrip
 
+SINE_BITS = 10
+SINE_SIZE = 1 << SINE_BITS          # entries in a full circle of the sine table
+SINE_MASK = SINE_SIZE - 1
+SINE_ONE = 4096                     # table value for sin() == 1.0
+AMP_ONE = 1024                      # curve amplitude 1.0
+SUM_SHIFT = 22                      # a pixel sum of 1 << SUM_SHIFT is a curve value of 1.0
+TICKS = 64                          # curve periods are kept in 1/TICKS of a millisecond
+
+# The curves have always used 6.28 for 2 pi, so angles are scaled by TURN to keep the same look.
+TURN = 6.28 / (2 * pi)
+_INNER_OFFSET = round(TURN * 65536)           # 6.28 radians, in 1/65536 of a circle
+_OUTER_SCALE = round(TURN * SINE_SIZE * 16)   # 6.28 * sin(), in 1/SINE_SIZE of a circle, times 65536 / SINE_ONE
+
+
+def _sine_table():
+    table = array("h", bytes(2 * SINE_SIZE))
+    for i in range(SINE_SIZE):
+        table[i] = round(SINE_ONE * sin(2 * pi * i / SINE_SIZE))
+    return table
+
+
+SINE = _sine_table()
+
+
+def _sine_fine(angle):
+    """
+    Returns SINE_ONE * sin() of angle, in 1/65536 of a circle, between neighboring table entries.
+    """
+    angle &= 0xFFFF
+    i = angle >> (16 - SINE_BITS)
+    frac = angle & ((1 << (16 - SINE_BITS)) - 1)
+    s0 = SINE[i]
+    return s0 + (((SINE[(i + 1) & SINE_MASK] - s0) * frac) >> (16 - SINE_BITS))
+
 
 class RippleAnimation(pixelstrip.Animation):
     """
@@ -22,48 +58,86 @@ class RippleAnimation(pixelstrip.Animation):
         self.curve_list = curve_list
 
     def reset(self, strip):
+        """
+        Build the palette and the tables for each curve.  Changes to
+        color_list, curve_list, cycle_time and x_span take effect here.
+        """
+        self._palette = self.create_palette()
+        self._curves = [self.create_curve(strip.n, w, a, d) for w, a, d in self.curve_list]
+        self._sum = array("i", bytes(4 * strip.n))
         strip.clear()
         strip.show()
 
+    def create_curve(self, n, w, a, d):
+        """
+        Precompute the integer form of curve (w, a, d) for n pixels:
+        its period in 1/TICKS ms, the step from time to angle, its share
+        of the sum, and the phase of each pixel in 1/SINE_SIZE of a circle.
+        """
+        period = max(round(2 * d * self.cycle_time * TICKS), 1)
+        rate = round(2 * TURN * 65536 * 4096 / period)
+        amp = round(a * AMP_ONE / len(self.curve_list))
+        phase = array("H", bytes(2 * n))
+        for p in range(n):
+            phase[p] = round(TURN * SINE_SIZE * p / (w * 2 * self.x_span)) & SINE_MASK
+        return [period, rate, amp, phase]
+
     def draw(self, strip, delta_time):
-        m = pixelstrip.current_time() * 1000.0
-        for p in range(strip.n):
-            c = 0.0
-            for curve in self.curve_list:
-                c = c + self.g(p, m, curve[0], curve[1], curve[2])
-            c = c / len(self.curve_list)
-            c = min(max(c, 0.0), 1.0)
-            strip[p] = self.shift_color(c)
+        now = ticks_ms()
+        total = self._sum
+        n = len(total)
+        first = True
+        for period, rate, amp, phase in self._curves:
+            # The curve's time term, 6.28 * sin(6.28 * t0), once per frame.
+            # now * TICKS % period, without letting now * TICKS grow past a small int
+            r = ((now % period) * TICKS) % period
+            inner = ((r * rate) >> 12) - _INNER_OFFSET
+            t = (_sine_fine(inner) * _OUTER_SCALE + 32768) >> 16
+            if first:
+                for p in range(n):
+                    total[p] = SINE[(t + phase[p]) & SINE_MASK] * amp
+                first = False
+            else:
+                for p in range(n):
+                    total[p] += SINE[(t + phase[p]) & SINE_MASK] * amp
+        palette = self._palette
+        top = 1 << SUM_SHIFT
+        low = palette[0]
+        high = palette[255]
+        for p in range(n):
+            c = total[p]
+            if c <= 0:
+                strip[p] = low
+            elif c >= top:
+                strip[p] = high
+            else:
+                strip[p] = palette[((c * 254) >> SUM_SHIFT) + 1]
         strip.show()
 
-    def f(self, x, t, w):
-        return sin(t + 6.28 * x / (w * 2 * self.x_span))
-
-    def g(self, x, m, w, a, d):
-        s = d * self.cycle_time
-        t0 = ((m % (s * 2)) - s) / s
-        t = 6.28 * sin(6.28 * t0)
-        return self.f(x, t, w) * a
-
-    def shift_color(self, c):
-        color_list_size = len(self.color_list) - 1
-        color_num_0 = floor(c * color_list_size)
-        color_num_1 = ceil(c * color_list_size)
-        c0 = (c - color_num_0 / color_list_size) * color_list_size
-        c1 = 1.0 - c0
-        return (
-            floor(c0 * self.color_list[color_num_0][0] + c1 * self.color_list[color_num_1][0]),
-            floor(c0 * self.color_list[color_num_0][1] + c1 * self.color_list[color_num_1][1]),
-            floor(c0 * self.color_list[color_num_0][2] + c1 * self.color_list[color_num_1][2]),
-            floor(c0 * self.color_list[color_num_0][3] + c1 * self.color_list[color_num_1][3])
-        )
+    def create_palette(self):
+        """
+        Create the 256 colors that a curve value from 0.0 to 1.0 maps onto,
+        blending between neighboring colors in color_list.
+        Within each pair of colors the blend runs from the later color
+        toward the earlier one.
+        Entry 0 is for exactly 0.0, entry 255 for exactly 1.0, and entries
+        1 to 254 cover the values in between.
+        """
+        colors = [to_packed(c) for c in self.color_list]
+        size = len(colors) - 1
+        palette = [colors[0]]
+        for i in range(254):
+            n0, frac = divmod(i * size, 254)
+            palette.append(lerp(colors[n0 + 1], colors[n0], frac * 255 // 254))
+        palette.append(colors[size])
+        return palette
 
 
+# import scheduler
+#
 # def main():
 #     strip = pixelstrip.PixelStrip(4, 8)
 #     strip.animation = RippleAnimation(x_span=8)
-#     while True:
-#         strip.draw()
-#         sleep(0.02)
+#     scheduler.Scheduler([strip]).run()
 #
 # main()
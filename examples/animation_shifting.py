@@ -1,7 +1,9 @@
-from utime import sleep
+from utime import ticks_ms
 from math import sin, floor
-from random import random
+from random import randint
+from array import array
 from colors import *
+from colormath import to_packed, lerp
 import pixelstrip
 
 PALETTE_SIZE = 64
@@ -14,31 +16,47 @@ class ShiftingAnimation(pixelstrip.Animation):
     The color palette is then smoothly shifted over time, giving
     the impression of motion.
     See:  https://en.wikipedia.org/wiki/Color_cycling
+    With indexed=True, the strip runs in palette mode, and each frame only
+    moves the strip's palette_offset.
     """
 
-    def __init__(self, stride=8):
+    def __init__(self, stride=8, indexed=False):
         pixelstrip.Animation.__init__(self)
         self.color_set = [BLUE, YELLOW]
         self._palette = []
-        self._depth = []
         self.cycle_time = 2.0
         self.stride = stride
+        self.indexed = indexed
 
     def reset(self, strip):
         strip.clear()
         self._palette = self.create_palette(self.color_set)
-        self._depth = self.create_depth_map(strip)
+        # Palette offset of each pixel, and the cycle in milliseconds, so draw() does no float math
+        self._offset = self.create_offset_map(strip)
+        self._cycle_ms = max(int(self.cycle_time * 1000), 1)
+        if self.indexed:
+            strip.palette = self._palette
+            strip.indexes = self._offset
         strip.show()
 
     def draw(self, strip, delta_time):
-        t = pixelstrip.current_time() % self.cycle_time
-        color_shift = floor(PALETTE_SIZE * t / self.cycle_time)
-        for p in range(strip.n):
-            d = floor(PALETTE_SIZE * self._depth[p])
-            color = self._palette[(d + color_shift) % PALETTE_SIZE]
-            strip[p] = color
+        t = ticks_ms() % self._cycle_ms
+        color_shift = PALETTE_SIZE * t // self._cycle_ms
+        if self.indexed:
+            strip.palette_offset = color_shift
+        else:
+            palette = self._palette
+            offset = self._offset
+            for p in range(strip.n):
+                strip[p] = palette[(offset[p] + color_shift) % PALETTE_SIZE]
         strip.show()
 
+    def create_offset_map(self, strip):
+        """
+        Create a bytearray with the palette offset, 0 to PALETTE_SIZE - 1, of each pixel.
+        """
+        return bytearray(floor(PALETTE_SIZE * d) % PALETTE_SIZE for d in self.create_depth_map(strip))
+
     def create_depth_map(self, strip):
         """
         Create an array the same length as a PixelStrip.  Each element 
@@ -54,143 +72,202 @@ class ShiftingAnimation(pixelstrip.Animation):
 
     def create_palette(self, color_set):
         """
-        Create a list of color tuples, where the colors blend
+        Create a list of packed colors, where the colors blend
         smoothly into each other.
         """
         palette = []
-        for _ in range(PALETTE_SIZE):
-            palette.append(BLACK)
-        m = PALETTE_SIZE / len(color_set)
+        count = len(color_set)
         for i in range(PALETTE_SIZE):
-            j = int(i / m)
+            j = (i * count) // PALETTE_SIZE
             color1 = color_set[j]
-            color2 = color_set[(j+1) % len(color_set)]
-            n = int(i % m)
-            palette[i] = self.average_color(color1, color2, n, m)
+            color2 = color_set[(j+1) % count]
+            # Position between color1 and color2, scaled to 0-255
+            amount = ((i * count) % PALETTE_SIZE) * 256 // PALETTE_SIZE
+            palette.append(self.average_color(color1, color2, amount))
         return palette
 
-    def average_color(self, color1, color2, n, m):
-        r = int(color2[0]*n/m + color1[0]*(m-n)/m)
-        g = int(color2[1]*n/m + color1[1]*(m-n)/m)
-        b = int(color2[2]*n/m + color1[2]*(m-n)/m)
-        return (r, g, b)
-
-
-class Matrix:
-    def __init__(self, width, height):
-        self.width = width
-        self.height = height
-        self.shape = (width, height)
-        self.val = []
-        for _ in range(self.width * self.height):
-            self.val.append(0.0)
-
-    def __setitem__(self, index, value):
-        nn = index[0] + index[1]*self.width if type(index) is tuple else index
-        self.val[nn] = value
-
-    def __getitem__(self, index):
-        nn = index[0] + index[1]*self.width if type(index) is tuple else index
-        return self.val[nn]
-
-    def min(self):
-        mn = self.val[0]
-        for v in self.val:
-            mn = min(mn, v)
-        return mn
-
-    def max(self):
-        mx = self.val[0]
-        for v in self.val:
-            mx = max(mx, v)
-        return mx
-
-    def valid(self, index):
-        return index[0] >= 0 and index[0] < self.width and index[1] >= 0 and index[1] < self.height
-
-    def average(self, *args):
-        count = 0
-        sum = 0.0
-        for index in args:
-            if self.valid(index):
-                count += 1
-                sum += self[index]
-        return sum / count if count > 0 else 0.0
-
-    def square_average(self, index, n):
-        return self.average((index[0], index[1]),
-                            (index[0]+n, index[1]),
-                            (index[0], index[1]+n),
-                            (index[0]+n, index[1]+n))
-
-    def diamond_average(self, index, n):
-        return self.average((index[0], index[1]),
-                            (index[0]+n, index[1]-n),
-                            (index[0]+n*2, index[1]),
-                            (index[0]+n, index[1]+n))
-
-    def depth_map(self):
-        mn = self.min()
-        mx = self.max()
-        d = []
-        for v in self.val:
-            value = (v - mn) / (mx - mn) if mx > mn else 0.0
-            d.append(value)
-        return d
+    def average_color(self, color1, color2, amount):
+        """
+        Blend from color1 toward color2, where amount runs from 0 to 255.
+        """
+        return lerp(to_packed(color1), to_packed(color2), amount)
 
 
-class ShiftingMatrixAnimation(ShiftingAnimation):
+class HeightField:
     """
-    Create a smoothly varying depth across a matrix of pixels.
+    A random landscape of whole-number heights, one for each cell of a width by height grid,
+    made with the diamond-square algorithm.  See:  https://en.wikipedia.org/wiki/Diamond-square_algorithm
+    Any width and height work.  The same seed always gives the same landscape.
+    The work can be done all at once with build(), or a little at a time with begin() and step().
     """
+    ONE = 1024      # height of the tallest starting corner
 
-    def __init__(self, stride=8):
-        ShiftingAnimation.__init__(self, stride)
+    def __init__(self, width, height, stride=8, seed=None):
+        self.width = width
+        self.height = height
+        # The corners are stride cells apart, which must be a power of two.
+        s = 1
+        while s < stride:
+            s <<= 1
+        self.stride = s
+        self.values = array("H", bytes(2 * width * height))
+        self._seed = randint(1, 0xFFFF) if seed is None else (seed & 0xFFFF) or 1
+        self._work = None
+
+    def build(self, out=None, levels=256):
+        """
+        Make the whole landscape now.  See begin() for out and levels.
+        """
+        self.begin(out, levels)
+        while not self.step(1024):
+            pass
 
-    def _rand(self, s=8):
-        return random() * s / self.stride
+    def begin(self, out=None, levels=256):
+        """
+        Start making the landscape.  When it is done, the heights are also scaled to
+        0 to levels - 1 and stored in the bytearray out, if one is given.
+        """
+        self._work = self._generate(out, levels)
 
-    def create_depth_map(self, strip):
+    def step(self, cells=64):
+        """
+        Do at least cells more cells of work, a whole row at a time.
+        Returns True once the landscape is done.
         """
-        Create an array the same size and shape as a PixelStrip matrix.  
-        Each array element is a floating point number between 0.0 and 1.0.
-        See:  https://en.wikipedia.org/wiki/Diamond-square_algorithm
+        work = self._work
+        if work is not None:
+            count = 0
+            for done in work:
+                count += done
+                if count >= cells:
+                    return False
+            self._work = None
+        return True
+
+    def _random(self, scale):
         """
-        m = Matrix(width=strip.width, height=strip.height)
-        s = self.stride
+        Returns a random whole number from 0 to scale - 1, from a 16-bit xorshift.
+        """
+        x = self._seed
+        x ^= (x << 7) & 0xFFFF
+        x ^= x >> 9
+        x ^= (x << 8) & 0xFFFF
+        self._seed = x
+        return (x * scale) >> 16
+
+    def _generate(self, out, levels):
+        w = self.width
+        h = self.height
+        values = self.values
+        stride = self.stride
+        s = stride
 
         # Initialize corner values
-        for yy in range(0, m.height, s):
-            for xx in range(0, m.width, s):
-                m[xx, yy] = self._rand(s=s)
-
-        # Initial diamond step
-        for yy in range(0, m.height, s):
-            for xx in range(0, m.width, s):
-                s2 = floor(s/2)
-                m[xx+s2, yy +
-                    s2] = m.diamond_average((xx, yy), s2) + self._rand(s=s2)
-
-        # Loop until everything is filled
+        for yy in range(0, h, s):
+            for xx in range(0, w, s):
+                values[xx + yy * w] = self._random(self.ONE)
+            yield (w + s - 1) // s
+
         while s > 1:
-            s2 = floor(s/2)
-            # Perform square step
-            for yy in range(0, m.height, s):
-                for xx in range(0, m.width, s):
-                    m[xx+s2,
-                        yy] = m.square_average((xx, yy), s2) + self._rand(s=s2)
+            half = s >> 1
+            amount = self.ONE * half // stride
+
+            # Diamond step: the middle of each square is the average of its corners
+            for yy in range(half, h, s):
+                top = (yy - half) * w
+                bottom = (yy + half) * w if yy + half < h else -1
+                for xx in range(half, w, s):
+                    left = xx - half
+                    right = xx + half if xx + half < w else -1
+                    total = values[top + left]
+                    count = 1
+                    if right >= 0:
+                        total += values[top + right]
+                        count += 1
+                    if bottom >= 0:
+                        total += values[bottom + left]
+                        count += 1
+                        if right >= 0:
+                            total += values[bottom + right]
+                            count += 1
+                    values[xx + yy * w] = total // count + self._random(amount)
+                yield (w + half - 1) // s
+
+            # Square step: the middle of each edge is the average of its four neighbors
+            for yy in range(0, h, half):
+                row = yy * w
+                first = half if (yy // half) % 2 == 0 else 0
+                for xx in range(first, w, s):
+                    total = 0
+                    count = 0
+                    if xx >= half:
+                        total += values[row + xx - half]
+                        count += 1
+                    if xx + half < w:
+                        total += values[row + xx + half]
+                        count += 1
+                    if yy >= half:
+                        total += values[row - half * w + xx]
+                        count += 1
+                    if yy + half < h:
+                        total += values[row + half * w + xx]
+                        count += 1
+                    values[row + xx] = total // count + self._random(amount)
+                yield (w - first + s - 1) // s
+
+            s = half
+
+        if out is not None:
+            lo = values[0]
+            hi = values[0]
+            for v in values:
+                if v < lo:
+                    lo = v
+                if v > hi:
+                    hi = v
+            yield len(values) // 2
+            span = hi - lo
+            for row in range(0, len(values), w):
+                for i in range(row, row + w):
+                    out[i] = (values[i] - lo) * levels // span % levels if span > 0 else 0
+                yield w
 
-            # Perform diamond step
-            for yy in range(0, m.height, s):
-                for xx in range(0, m.width, s):
-                    m[xx+s2, yy +
-                        s2] = m.diamond_average((xx, yy), s2) + self._rand(s=s2)
 
-            s = floor(s/2)
+class ShiftingMatrixAnimation(ShiftingAnimation):
+    """
+    Create a smoothly varying depth across a matrix of pixels.
+    Give a seed to get the same landscape every time.  On large matrices, the
+    landscape can be made over several frames by giving cells_per_frame; the
+    colors shift evenly until it is ready.
+    """
 
-        return m.depth_map()
+    def __init__(self, stride=8, seed=None, cells_per_frame=None, indexed=False):
+        ShiftingAnimation.__init__(self, stride, indexed)
+        self.seed = seed
+        self.cells_per_frame = cells_per_frame
+        self._field = None
+
+    def create_offset_map(self, strip):
+        """
+        Create the palette offset of each pixel from a HeightField the size of the matrix.
+        """
+        offset = bytearray(strip.n)
+        self._field = HeightField(strip.width, strip.height, self.stride, self.seed)
+        if self.cells_per_frame is None:
+            self._field.build(offset, PALETTE_SIZE)
+            self._field = None
+        else:
+            self._field.begin(offset, PALETTE_SIZE)
+        return offset
+
+    def draw(self, strip, delta_time):
+        if self._field is not None and self._field.step(self.cells_per_frame):
+            self._field = None
+        ShiftingAnimation.draw(self, strip, delta_time)
 
 
+# import scheduler
+#
 # def main():
 #     shifting_animation = ShiftingAnimation()
 #     shifting_animation.color_set=[RED, ORANGE, YELLOW, BLACK]
@@ -199,7 +276,6 @@ class ShiftingMatrixAnimation(ShiftingAnimation):
 #     strip = pixelstrip.PixelStrip(4, 64, brightness=BRIGHTNESS, auto_write=False)
 #     strip.animation = shifting_animation
 
-#     while True:
-#         strip.draw()
+#     scheduler.Scheduler([strip]).run()
 
 # main()
@@ -1,5 +1,5 @@
-from utime import sleep
 from colors import *
+from colormath import to_packed
 import pixelstrip
 
 class SpinningAnimation(pixelstrip.Animation):
@@ -16,23 +16,26 @@ class SpinningAnimation(pixelstrip.Animation):
     def reset(self, strip):
         self.current_pixel = 0
         self.wait_time = self.cycle_time / strip.n
-        self.timeout = self.wait_time
+        self._wait_ms = int(self.wait_time * 1000)
+        self._color = to_packed(self.color)
+        self.timeout_ms = self._wait_ms
+        strip.fill(BLACK)
 
     def draw(self, strip, delta_time):
         if self.is_timed_out():
-            self.timeout = self.wait_time
+            self.timeout_ms = self._wait_ms
+            strip[self.current_pixel] = BLACK
             self.current_pixel = (self.current_pixel + 1) % strip.n
-            strip.clear()
-            strip[self.current_pixel] = self.color
+            strip[self.current_pixel] = self._color
             strip.show()
 
 
+# import scheduler
+#
 # def main():
 #     strip = pixelstrip.PixelStrip(4, 8)
 #     strip.animation = SpinningAnimation(LIGHTBLUE)
-#     while True:
-#         strip.draw()
-#         sleep(0.02)
+#     scheduler.Scheduler([strip]).run()
 
 # main()
 
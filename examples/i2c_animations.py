@@ -3,6 +3,7 @@ from machine import Pin
 from i2cp import I2cPerf
 from pixelstrip import PixelStrip, current_time
 from animation_pulse import PulseAnimation
+from scheduler import Scheduler
 
 I2C_ADDRESS = 0x41
 BRIGHTNESS = 0.5
@@ -19,7 +20,7 @@ strip = [
     PixelStrip(4, 12, brightness=BRIGHTNESS),
     PixelStrip(5, 8, brightness=BRIGHTNESS),
     PixelStrip(8, 12, brightness=BRIGHTNESS),
-    PixelStrsip(9, 12, brightness=BRIGHTNESS)
+    PixelStrip(9, 12, brightness=BRIGHTNESS)
 ]
 
 # The built-in LED will turn on for half a second after every message
@@ -27,6 +28,7 @@ led = Pin(25, Pin.OUT)
 led.value(False)
 
 i2c = I2cPerf(1,sda=6,scl=7,address=I2C_ADDRESS)
+last_msg_time = 0.0
 
 def receive_message():
     """
@@ -68,25 +70,24 @@ def blink(i):
             s.show()
         time.sleep(0.2)
 
+def poll():
+    """
+    Check for a message between frames, and keep the LED lit for half a second after one arrives.
+    """
+    global last_msg_time
+    message = receive_message()
+    if message:
+        strip_num = message[0]
+        anim_num = message[1]
+        set_animation(strip_num, anim_num)
+        last_msg_time = current_time()
+    led.value(current_time() < last_msg_time + 0.5)
+
 def main():
     global strip, led
     for s in strip:
         s.reset()
     blink(3)
-    last_msg_time = 0.0
-    while True:
-        for s in strip:
-            s.draw()
-        message = receive_message()
-        if message:
-            strip_num = message[0]
-            anim_num = message[1]
-            set_animation(strip_num, anim_num)
-            last_msg_time = current_time()
-        led.value(current_time() < last_msg_time + 0.5)
+    Scheduler(strip).run(idle=poll)
 
 main()
-
-
-
-
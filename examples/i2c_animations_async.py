@@ -0,0 +1,83 @@
+from machine import Pin
+from aio import asyncio
+from i2cp import I2cPerf
+from pixelstrip import PixelStrip, current_time
+from animation_pulse import PulseAnimation
+
+# The same program as i2c_animations.py, written with asyncio.
+# Each strip and the I2C listener run as separate tasks, so a slow
+# strip never holds up messages from the robot.
+
+I2C_ADDRESS = 0x41
+BRIGHTNESS = 0.5
+
+# List of Animations
+animation = [
+    PulseAnimation(),
+    PulseAnimation([(0, 136, 0), (64, 64, 0)]),
+    PulseAnimation([(0, 0, 136), (0, 64, 64)]),
+]
+
+# List of PixelStrips
+strip = [
+    PixelStrip(4, 12, brightness=BRIGHTNESS),
+    PixelStrip(5, 8, brightness=BRIGHTNESS),
+    PixelStrip(8, 12, brightness=BRIGHTNESS),
+    PixelStrip(9, 12, brightness=BRIGHTNESS)
+]
+
+# The built-in LED will turn on for half a second after every message
+led = Pin(25, Pin.OUT)
+led.value(False)
+
+i2c = I2cPerf(1,sda=6,scl=7,address=I2C_ADDRESS)
+last_msg_time = 0.0
+
+def receive_message(b):
+    """
+    Translate one byte from the I2C bus to a strip and animation number, and set the animation.
+    """
+    global last_msg_time
+    strip_num = (b & 0xF0) >> 4
+    anim_num = b & 0x0F
+    if strip_num < len(strip):
+        if anim_num < len(animation):
+            strip[strip_num].animation = animation[anim_num]
+        else:
+            strip[strip_num].animation = None
+    last_msg_time = current_time()
+
+async def blink_led():
+    """
+    Keep the LED lit for half a second after each message.
+    """
+    while True:
+        led.value(current_time() < last_msg_time + 0.5)
+        await asyncio.sleep(0.05)
+
+async def blink(i):
+    """
+    Blink onboard LED and also each PixelStrip.
+    This demonstrates that the program is active and all strips are connected.
+    """
+    for _ in range(i):
+        led.toggle()
+        for s in strip:
+            s[0] = (128, 0, 0)
+            await s.show_async()
+        await asyncio.sleep(0.2)
+        led.toggle()
+        for s in strip:
+            s.clear()
+        await asyncio.sleep(0.2)
+
+async def main():
+    for s in strip:
+        s.reset()
+    await blink(3)
+    for s in strip:
+        asyncio.create_task(s.run())
+    asyncio.create_task(blink_led())
+    await i2c.listen(receive_message)
+
+asyncio.run(main())
@@ -0,0 +1,55 @@
+from machine import Pin
+from i2cp import I2cPerf, I2cReceiver
+from i2ccmd import CommandParser, StripCommands
+from pixelstrip import PixelStrip, current_time
+from animation_pulse import PulseAnimation
+from scheduler import Scheduler
+
+# The same strips as i2c_animations.py, controlled with the framed command
+# protocol in i2ccmd.py instead of single bytes.  The robot can also set
+# animation params and brightness, send blocks of pixels, and read back
+# each strip's frame statistics.
+
+I2C_ADDRESS = 0x41
+BRIGHTNESS = 0.5
+
+# List of Animations
+animation = [
+    PulseAnimation(),
+    PulseAnimation([(0, 136, 0), (64, 64, 0)]),
+    PulseAnimation([(0, 0, 136), (0, 64, 64)]),
+]
+
+# List of PixelStrips
+strip = [
+    PixelStrip(4, 12, brightness=BRIGHTNESS),
+    PixelStrip(5, 8, brightness=BRIGHTNESS),
+    PixelStrip(8, 12, brightness=BRIGHTNESS),
+    PixelStrip(9, 12, brightness=BRIGHTNESS)
+]
+
+# The built-in LED will turn on for half a second after every message
+led = Pin(25, Pin.OUT)
+led.value(False)
+
+i2c = I2cPerf(1,sda=6,scl=7,address=I2C_ADDRESS)
+# Collect messages in the background while the strips draw
+receiver = I2cReceiver(i2c)
+parser = CommandParser(StripCommands(strip, animation))
+last_msg_time = 0.0
+
+def poll():
+    """
+    Handle messages between frames, and keep the LED lit for half a second after one arrives.
+    """
+    global last_msg_time
+    if parser.poll(receiver):
+        last_msg_time = current_time()
+    led.value(current_time() < last_msg_time + 0.5)
+
+def main():
+    for s in strip:
+        s.reset()
+    Scheduler(strip).run(idle=poll)
+
+main()
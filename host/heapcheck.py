@@ -0,0 +1,169 @@
+"""
+Count the heap allocations that code would make under MicroPython.
+
+CPython cannot measure this directly.  Its ints above 256 are heap
+objects, where MicroPython's ints up to 2**30 are not, and its free lists
+reuse tuples and floats without calling the allocator, so tracemalloc
+both over- and under-counts.  Instead, count(fn) traces the repository's
+own code while fn runs, and counts the operations that allocate on the
+MicroPython heap:
+
+* building a tuple, list, dict, set, slice or string, or a closure
+* the / operator, which always makes a float
+* a new float or big int (2**30 or more) appearing in a local variable
+* calling super(), memoryview(), bytearray() or sorted()
+* calling range() with a step that is not a constant, or anywhere but
+  at the head of a for loop (only for i in range(a, b, 2) is compiled
+  to a plain counter)
+
+Code in the host stand-ins and the benchmarks is not traced, since on the
+Pico it is built in C or not there at all.  The count is a model: a float
+that is made and used within one expression, without / and without being
+stored, is not seen.
+"""
+import dis
+import os
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SKIP = (os.path.join(_ROOT, "host"), os.path.join(_ROOT, "benchmarks"))
+
+_BUILD = {
+    "BUILD_TUPLE": "tuple",
+    "BUILD_LIST": "list",
+    "BUILD_MAP": "dict",
+    "BUILD_CONST_KEY_MAP": "dict",
+    "BUILD_SET": "set",
+    "BUILD_SLICE": "slice",
+    "BUILD_STRING": "str",
+    "FORMAT_VALUE": "str",
+    "MAKE_FUNCTION": "function",
+    "LIST_APPEND": "list",
+    "SET_ADD": "set",
+    "MAP_ADD": "dict",
+}
+_CALLS = {"super", "memoryview", "bytearray", "sorted"}
+_BIG = 1 << 30
+_CONSTS = {"LOAD_CONST", "LOAD_SMALL_INT"}
+
+
+class Allocations:
+    """
+    The allocations seen by count(), by kind and by file and line.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.sites = {}
+
+    def add(self, code, line, kind):
+        self.total += 1
+        key = (os.path.relpath(code.co_filename, _ROOT), line, kind)
+        self.sites[key] = self.sites.get(key, 0) + 1
+
+    def __str__(self):
+        worst = sorted(self.sites.items(), key=lambda item: -item[1])
+        return ", ".join("{}:{} {} x{}".format(f, line, kind, n) for (f, line, kind), n in worst[:4])
+
+
+def _range_calls(code):
+    """
+    Returns the offsets of the calls to range() in code that make a range object on MicroPython.
+    """
+    ops = list(dis.get_instructions(code))
+    # Python 3.11 calls with PRECALL then CALL; later versions only with CALL.
+    first = "PRECALL" if "PRECALL" in dis.opmap else "CALL"
+    found = set()
+    for i, op in enumerate(ops):
+        if op.opname not in ("LOAD_GLOBAL", "LOAD_NAME") or op.argval != "range":
+            continue
+        # Follow the stack until range's arguments are all there and it is called.
+        depth = 0
+        for j in range(i + 1, len(ops)):
+            call = ops[j]
+            if call.opname == first and call.arg == depth:
+                after = ops[j + 1] if first == "CALL" else ops[j + 2]
+                constant_step = call.arg < 3 or ops[j - 1].opname in _CONSTS
+                if not constant_step or after.opname != "GET_ITER":
+                    found.add(call.offset)
+                break
+            depth += dis.stack_effect(call.opcode, call.arg if call.opcode >= dis.HAVE_ARGUMENT else None, jump=False)
+    return found
+
+
+class _Tracer:
+    def __init__(self):
+        self.found = Allocations()
+        self._instructions = {}
+        self._ranges = {}
+        self._seen = {}
+
+    def _traced(self, code):
+        name = code.co_filename
+        return name.startswith(_ROOT) and not name.startswith(_SKIP)
+
+    def _ops(self, code):
+        ops = self._instructions.get(code)
+        if ops is None:
+            ops = {i.offset: i for i in dis.get_instructions(code)}
+            self._instructions[code] = ops
+            self._ranges[code] = _range_calls(code)
+        return ops
+
+    def _new_values(self, frame, record):
+        """
+        Note floats and big ints held in locals that were not there at the last check.
+        """
+        seen = self._seen.setdefault(id(frame), {})
+        consts = frame.f_code.co_consts
+        for name, value in frame.f_locals.items():
+            t = type(value)
+            if t is float or (t is int and not -_BIG <= value < _BIG):
+                if seen.get(name) != id(value):
+                    seen[name] = id(value)
+                    if record and not any(value is c for c in consts):
+                        self.found.add(frame.f_code, frame.f_lineno, "float" if t is float else "big int")
+
+    def global_trace(self, frame, event, arg):
+        if not self._traced(frame.f_code):
+            return None
+        frame.f_trace_opcodes = True
+        # Arguments were made by the caller, so they are not counted here.
+        self._new_values(frame, False)
+        return self.local_trace
+
+    def local_trace(self, frame, event, arg):
+        if event == "opcode":
+            op = self._ops(frame.f_code).get(frame.f_lasti)
+            if op is None:
+                return self.local_trace
+            kind = _BUILD.get(op.opname)
+            if kind is None:
+                if op.opname == "BINARY_OP" and op.argrepr in ("/", "/="):
+                    kind = "float"
+                elif op.opname in ("LOAD_GLOBAL", "LOAD_NAME") and op.argval in _CALLS:
+                    kind = op.argval
+                elif op.offset in self._ranges[frame.f_code]:
+                    kind = "range"
+            if kind is not None:
+                self.found.add(frame.f_code, frame.f_lineno, kind)
+        elif event == "line":
+            self._new_values(frame, True)
+        elif event == "return":
+            self._new_values(frame, True)
+            self._seen.pop(id(frame), None)
+        return self.local_trace
+
+
+def count(fn, *args):
+    """
+    Call fn(*args) and return the Allocations it would make on MicroPython.
+    """
+    tracer = _Tracer()
+    old = sys.gettrace()
+    sys.settrace(tracer.global_trace)
+    try:
+        fn(*args)
+    finally:
+        sys.settrace(old)
+    return tracer.found
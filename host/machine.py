@@ -0,0 +1,125 @@
+"""
+Host stand-in for the parts of MicroPython's machine module used by PixelStrip.
+"""
+import utime
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.mode = mode
+        self._value = 0 if value is None else int(bool(value))
+
+    def __repr__(self):
+        return "Pin({})".format(self.id)
+
+    def init(self, mode=-1, pull=-1, value=None):
+        self.mode = mode
+        if value is not None:
+            self._value = int(bool(value))
+
+    def value(self, v=None):
+        if v is None:
+            return self._value
+        self._value = int(bool(v))
+
+    def on(self):
+        self._value = 1
+
+    def off(self):
+        self._value = 0
+
+    def toggle(self):
+        self._value ^= 1
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        self._irq = handler
+
+
+class Timer:
+    """
+    Timer that runs its callback on the virtual clock in utime.
+    """
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id=-1, mode=PERIODIC, period=-1, freq=-1, callback=None):
+        self._callback = None
+        if callback is not None:
+            self.init(mode=mode, period=period, freq=freq, callback=callback)
+
+    def init(self, mode=PERIODIC, period=-1, freq=-1, callback=None):
+        if freq > 0:
+            self._period_us = 1_000_000 // freq
+        else:
+            self._period_us = int(period * 1000)
+        self._mode = mode
+        self._callback = callback
+        self._due_us = utime.now_us() + self._period_us
+        utime.add_timer(self)
+
+    def deinit(self):
+        utime.remove_timer(self)
+
+    def _fire(self):
+        if self._mode == self.PERIODIC:
+            self._due_us += self._period_us
+        else:
+            utime.remove_timer(self)
+        self._callback(self)
+
+
+class _Mem32:
+    """
+    Sparse 32-bit register file standing in for machine.mem32.
+    Unwritten registers read as zero.  A simulated peripheral can hook a
+    register address, so reading or writing it calls a function instead.
+    """
+
+    def __init__(self):
+        self._regs = {}
+        self._hooks = {}
+
+    def __getitem__(self, address):
+        hook = self._hooks.get(address)
+        if hook is not None and hook[0] is not None:
+            return hook[0]() & 0xFFFFFFFF
+        return self._regs.get(address, 0)
+
+    def __setitem__(self, address, value):
+        hook = self._hooks.get(address)
+        if hook is not None and hook[1] is not None:
+            hook[1](value & 0xFFFFFFFF)
+            return
+        self._regs[address] = value & 0xFFFFFFFF
+
+    def hook(self, address, read=None, write=None):
+        """
+        Call read() when the register is read and write(value) when it is written.
+        """
+        self._hooks[address] = (read, write)
+
+    def unhook(self, address):
+        self._hooks.pop(address, None)
+
+    def clear(self):
+        self._regs.clear()
+        self._hooks.clear()
+
+
+mem32 = _Mem32()
+
+
+def freq(hz=None):
+    return 125_000_000
+
+
+def idle():
+    pass
@@ -0,0 +1,182 @@
+"""
+Host stand-in for MicroPython's rp2 module.
+
+PIO programs are not assembled.  A StateMachine records the words pushed
+into it and holds the virtual clock for as long as a real TX FIFO would
+block put() while the words shift out.  A DMA channel writing to a state
+machine's TX FIFO returns at once and stays active until the FIFO could
+have taken the last word.
+"""
+import utime
+
+PIO0_BASE = 0x50200000
+PIO1_BASE = 0x50300000
+PIO_TXF0 = 0x10
+
+# State machines by the address of their TX FIFO, for DMA writes.
+_tx_fifos = {}
+
+
+class PIO:
+    IN_LOW = 0
+    IN_HIGH = 1
+    OUT_LOW = 2
+    OUT_HIGH = 3
+    SHIFT_LEFT = 0
+    SHIFT_RIGHT = 1
+    JOIN_NONE = 0
+    JOIN_TX = 1
+    JOIN_RX = 2
+
+    # Programs loaded into each block's instruction memory.
+    _loaded = ([], [])
+
+    def __init__(self, id):
+        self.id = id
+
+    def add_program(self, program):
+        if program not in self._loaded[self.id]:
+            self._loaded[self.id].append(program)
+
+    def remove_program(self, program=None):
+        if program is None:
+            del self._loaded[self.id][:]
+        elif program in self._loaded[self.id]:
+            self._loaded[self.id].remove(program)
+
+    def programs(self):
+        """
+        Host only: the programs loaded into this block.
+        """
+        return list(self._loaded[self.id])
+
+
+class PIOProgram:
+    """
+    Placeholder for an assembled program, keeping the asm_pio settings.
+    """
+
+    def __init__(self, fn, settings):
+        self.name = fn.__name__
+        self.settings = settings
+
+    def __repr__(self):
+        return "PIOProgram({})".format(self.name)
+
+
+def asm_pio(**settings):
+    def decorator(fn):
+        return PIOProgram(fn, settings)
+    return decorator
+
+
+class StateMachine:
+    FIFO_DEPTH = 4
+    CYCLES_PER_BIT = 10
+
+    def __init__(self, id, program=None, freq=125_000_000, **kwargs):
+        self.id = id
+        self.program = program
+        self.freq = freq
+        self.kwargs = kwargs
+        self.words = 0
+        self.last_put = []
+        self._active = 0
+        self._busy_until_us = 0
+        if program is not None:
+            base = PIO0_BASE if id < 4 else PIO1_BASE
+            _tx_fifos[base + PIO_TXF0 + 4 * (id % 4)] = self
+
+    def active(self, value=None):
+        if value is None:
+            return self._active
+        self._active = int(bool(value))
+
+    def _bits_per_word(self):
+        """
+        Bit times per FIFO word.  A program with side-set output sends one bit
+        of each word per bit time, like the WS2812 program.  A program with
+        out pins sends each word to all of its pins in one bit time, like the
+        parallel WS2812 program.
+        """
+        if self.program is None:
+            return 32
+        settings = self.program.settings
+        if "out_init" in settings:
+            return 1
+        return settings.get("pull_thresh", 32)
+
+    def word_time_us(self):
+        """
+        Time for one FIFO word to shift out of the state machine.
+        """
+        return self._bits_per_word() * self.CYCLES_PER_BIT * 1_000_000 / self.freq
+
+    def _queue(self, words):
+        """
+        Queue words behind any still shifting out.  Returns the time at which
+        the last word has entered the FIFO.
+        """
+        self.words += len(words)
+        self.last_put = words
+        word_us = self.word_time_us()
+        start = max(utime.now_us(), self._busy_until_us)
+        self._busy_until_us = start + len(words) * word_us
+        return self._busy_until_us - self.FIFO_DEPTH * word_us
+
+    def put(self, value, shift=0):
+        if isinstance(value, int):
+            value = (value,)
+        # put() returns once the final words fit in the FIFO.
+        blocked_until = self._queue([(v << shift) & 0xFFFFFFFF for v in value])
+        utime.advance_us(blocked_until - utime.now_us())
+
+    def tx_fifo(self):
+        word_us = self.word_time_us()
+        pending = (self._busy_until_us - utime.now_us()) / word_us
+        return max(0, min(self.FIFO_DEPTH, int(pending + 0.999)))
+
+
+class DMA:
+    """
+    DMA channel that can feed a StateMachine TX FIFO.
+    Byte and half-word writes are replicated across the 32-bit word, as on the RP2040.
+    """
+
+    def __init__(self):
+        self._done_us = 0
+        self.read = None
+        self.write = None
+        self.count = 0
+
+    def pack_ctrl(self, default=None, **kwargs):
+        ctrl = {"size": 2, "inc_read": True, "inc_write": True, "treq_sel": 0x3F}
+        ctrl.update(kwargs)
+        return ctrl
+
+    def config(self, read=None, write=None, count=None, ctrl=None, trigger=False):
+        self.read = read
+        self.write = write
+        self.count = count
+        self.ctrl = ctrl
+        if trigger:
+            self.active(1)
+
+    def active(self, value=None):
+        if value is None:
+            return utime.now_us() < self._done_us
+        if value:
+            self._start()
+
+    def _start(self):
+        sm = _tx_fifos.get(self.write)
+        if sm is None:
+            self._done_us = utime.now_us()
+            return
+        size = self.ctrl.get("size", 2) if self.ctrl else 2
+        replicate = {0: 0x01010101, 1: 0x00010001, 2: 1}[size]
+        words = [(v * replicate) & 0xFFFFFFFF for v in list(self.read)[:self.count]]
+        self._done_us = sm._queue(words)
+
+    def close(self):
+        self._done_us = 0
@@ -0,0 +1,185 @@
+"""
+Headless simulator for running PixelStrip animations on a PC.
+
+The host directory holds stand-ins for the Pico-only modules (machine,
+rp2, utime).  Put it on sys.path ahead of the repository and the
+examples, then build strips with a SimBackend:
+
+    import simulator
+    strip = simulator.make_strip(144)
+    strip.animation = PulseAnimation()
+    simulator.run(strip, frames=100, fps=50)
+    print(strip._backend.pixel(0))
+"""
+import utime
+import npxl
+
+
+class SimBackend(npxl.Backend):
+    """
+    Output backend that keeps the frames written by NeoPixel.show() in memory.
+    The latest frame is in `frame` as GRB bytes; `frames` counts every write.
+    With history=True every frame is also appended to `history`.
+    """
+
+    def __init__(self, history=False):
+        self.frames = 0
+        self.frame = bytearray()
+        self.history = [] if history else None
+
+    def write(self, buf):
+        self.frames += 1
+        if len(buf) >= len(self.frame):
+            self.frame = bytearray(buf)
+        else:
+            # A short frame only updates the first pixels; the rest keep their colors.
+            frame = bytearray(self.frame)
+            frame[:len(buf)] = buf
+            self.frame = frame
+        if self.history is not None:
+            self.history.append(self.frame)
+
+    def pixel(self, index):
+        """
+        Return the (r, g, b) color that pixel index last received.
+        """
+        f = self.frame
+        return f[3 * index + 1], f[3 * index], f[3 * index + 2]
+
+    def pixels(self):
+        return [self.pixel(i) for i in range(len(self.frame) // 3)]
+
+
+class I2cController:
+    """
+    Simulated I2C controller talking to an i2cp.I2cPerf.
+    Each send() is one write transaction: its bytes land in the peripheral's
+    receive FIFO, the first one marked with FIRST_DATA_BYTE, where
+    I2cPerf.available(), read() and read_data() find them, as if written by
+    the robot.  request(n) starts a read of n bytes, which the peripheral
+    answers with I2cPerf.write(); the bytes collect in received.
+    The FIFO holds 16 bytes, and the controller waits while it is full,
+    like a controller whose clock is being stretched.
+
+    With byte_us set, bytes take that long each to cross the bus (22 us
+    at 400 kHz), measured on the virtual clock; otherwise they arrive at once.
+    """
+
+    IC_STATUS_TFNF = 0x02
+    IC_STATUS_TFE = 0x04
+    IC_STATUS_RFNE = 0x08
+    RD_REQ = 0x20
+    FIFO_DEPTH = 16
+
+    def __init__(self, perf, byte_us=0):
+        from machine import mem32
+        # [entry, virtual time it reaches the FIFO]
+        self._rx = []
+        self.byte_us = byte_us
+        self._bus_free_us = 0
+        self._reads = 0
+        self.received = bytearray()
+        base = perf.i2c_base
+        self._first = perf.FIRST_DATA_BYTE
+        mem32.hook(base | perf.IC_STATUS, read=self._status)
+        mem32.hook(base | perf.IC_DATA_CMD, read=self._data, write=self._write)
+        mem32.hook(base | perf.IC_RXFLR, read=self._level)
+        mem32.hook(base | perf.IC_RAW_INTR_STAT, read=self._raw_intr)
+
+    def send(self, data, at_us=None):
+        """
+        Write one byte (an int) or a sequence of bytes to the peripheral, as one transaction.
+        The transaction starts at virtual time at_us, or now, once the bus is free.
+        Returns the time its last byte reaches the peripheral, if nothing holds it up.
+        """
+        if type(data) is int:
+            data = (data,)
+        t = max(utime.now_us() if at_us is None else at_us, self._bus_free_us)
+        first = self._first
+        for b in data:
+            t += self.byte_us
+            self._rx.append([(b & 0xFF) | first, t])
+            first = 0
+        self._bus_free_us = t
+        return t
+
+    def request(self, n):
+        """
+        Start reading n bytes from the peripheral.
+        """
+        self._reads += n
+
+    def pending(self):
+        """
+        Returns the number of bytes the peripheral has not read yet.
+        """
+        return len(self._rx)
+
+    def pending_reads(self):
+        """
+        Returns the number of requested bytes the peripheral has not sent yet.
+        """
+        return self._reads
+
+    def _status(self):
+        status = self.IC_STATUS_TFNF | self.IC_STATUS_TFE
+        if self._level():
+            status |= self.IC_STATUS_RFNE
+        return status
+
+    def _level(self):
+        now = utime.now_us()
+        n = 0
+        for entry in self._rx[:self.FIFO_DEPTH]:
+            if entry[1] > now:
+                break
+            n += 1
+        return n
+
+    def _data(self):
+        if not self._level():
+            return 0
+        value = self._rx.pop(0)[0]
+        rx = self._rx
+        if len(rx) >= self.FIFO_DEPTH:
+            # the byte that was held back by a full FIFO can now be sent, and those after it
+            t = utime.now_us()
+            for i in range(self.FIFO_DEPTH - 1, len(rx)):
+                t += self.byte_us
+                if rx[i][1] >= t:
+                    break
+                rx[i][1] = t
+                self._bus_free_us = max(self._bus_free_us, t)
+        return value
+
+    def _raw_intr(self):
+        return self.RD_REQ if self._reads else 0
+
+    def _write(self, value):
+        if self._reads:
+            self._reads -= 1
+            self.received.append(value & 0xFF)
+
+
+def make_strip(n=8, width=None, height=None, **kwargs):
+    """
+    Create a PixelStrip whose frames go to a new SimBackend.
+    """
+    import pixelstrip
+    kwargs.setdefault("backend", SimBackend())
+    return pixelstrip.PixelStrip(0, n, width=width, height=height, **kwargs)
+
+
+def run(strips, frames=1, fps=50):
+    """
+    Draw one or more strips for the given number of frames, moving the
+    virtual clock forward one frame period after each round of draws.
+    """
+    if not isinstance(strips, (list, tuple)):
+        strips = [strips]
+    period_us = 1_000_000 // fps
+    for _ in range(frames):
+        start = utime.now_us()
+        for strip in strips:
+            strip.draw()
+        utime.advance_us(period_us - (utime.now_us() - start))
@@ -0,0 +1,138 @@
+"""
+Host stand-in for MicroPython's utime module.
+
+Time is virtual: it only moves forward when the program sleeps or when
+advance_us() is called.  Animations therefore run at full CPU speed on a
+PC, and every run is repeatable.  For profiling, set_realtime(True) makes
+the clock also count the real time that passes, so ticks measure how
+long code takes to run.
+
+machine.Timer callbacks fire as the virtual clock moves past them, so
+they run while the program sleeps, the way soft interrupts on the Pico
+run while the main program waits.
+"""
+import time as _time
+
+TICKS_PERIOD = 1 << 30
+TICKS_MAX = TICKS_PERIOD - 1
+TICKS_HALFPERIOD = TICKS_PERIOD // 2
+
+_now_us = 0
+_realtime_origin = None
+_timers = []
+_firing = False
+
+
+def advance_us(us):
+    """
+    Move the virtual clock forward by the given number of microseconds.
+    """
+    global _now_us
+    if us > 0:
+        target = _now_us + int(us)
+        if _timers and not _firing:
+            _fire_timers(target)
+        _now_us = target
+
+
+def _fire_timers(target):
+    """
+    Call the timers that fall due up to the target time, each at its due time.
+    """
+    global _now_us, _firing
+    _firing = True
+    try:
+        while _timers:
+            timer = min(_timers, key=lambda t: t._due_us)
+            if timer._due_us > target:
+                break
+            _now_us = max(_now_us, timer._due_us)
+            timer._fire()
+    finally:
+        _firing = False
+
+
+def add_timer(timer):
+    """
+    Start calling timer._fire() when the clock reaches timer._due_us.
+    Used by the stand-in machine.Timer.
+    """
+    if timer not in _timers:
+        _timers.append(timer)
+
+
+def remove_timer(timer):
+    if timer in _timers:
+        _timers.remove(timer)
+
+
+def advance_ms(ms):
+    advance_us(ms * 1000)
+
+
+def reset():
+    """
+    Set the virtual clock back to zero, and stop all timers.
+    """
+    global _now_us, _realtime_origin
+    _now_us = 0
+    _timers.clear()
+    if _realtime_origin is not None:
+        _realtime_origin = _time.perf_counter()
+
+
+def set_realtime(enabled):
+    """
+    When enabled, the clock also moves forward with real elapsed time.
+    """
+    global _now_us, _realtime_origin
+    if enabled and _realtime_origin is None:
+        _realtime_origin = _time.perf_counter()
+    elif not enabled and _realtime_origin is not None:
+        _now_us = now_us()
+        _realtime_origin = None
+
+
+def now_us():
+    """
+    Return the virtual time in microseconds, without wrapping.
+    """
+    if _realtime_origin is None:
+        return _now_us
+    return _now_us + int((_time.perf_counter() - _realtime_origin) * 1_000_000)
+
+
+def ticks_us():
+    return now_us() & TICKS_MAX
+
+
+def ticks_ms():
+    return (now_us() // 1000) & TICKS_MAX
+
+
+def ticks_cpu():
+    return ticks_us()
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) & TICKS_MAX
+
+
+def ticks_diff(ticks1, ticks2):
+    return ((ticks1 - ticks2 + TICKS_HALFPERIOD) & TICKS_MAX) - TICKS_HALFPERIOD
+
+
+def time():
+    return now_us() // 1_000_000
+
+
+def sleep(seconds):
+    advance_us(seconds * 1_000_000)
+
+
+def sleep_ms(ms):
+    advance_us(ms * 1000)
+
+
+def sleep_us(us):
+    advance_us(us)
@@ -1,6 +1,7 @@
 package frc.robot;
 
 import edu.wpi.first.wpilibj.TimedRobot;
+import edu.wpi.first.wpilibj.Timer;
 import edu.wpi.first.wpilibj.XboxController;
 import edu.wpi.first.wpilibj.I2C;
 import edu.wpi.first.wpilibj.I2C.Port;
@@ -8,6 +9,8 @@ import edu.wpi.first.wpilibj.I2C.Port;
 /**
  * This robot program tests that animations on a Raspberry Pi Pico can be
  * controlled by the RoboRIO through I2C communications.
+ * Messages use the framed command protocol of i2ccmd.py, so the Pico
+ * should run i2c_commands.py.
  */
 public class Robot extends TimedRobot {
 
@@ -15,11 +18,20 @@ public class Robot extends TimedRobot {
   public static final int MAX_ANIMATIONS = 3;
   public static final int MAX_STRIPS = 4;
 
+  // Commands from i2ccmd.py
+  public static final byte SET_ANIMATION = 0x01;
+  public static final byte SET_BRIGHTNESS = 0x02;
+  public static final byte SET_PIXELS = 0x03;
+  public static final byte QUERY_STATS = 0x04;
+  public static final int STATS_SIZE = 32;
+
   private byte[] currentAnimation = new byte[MAX_STRIPS];
   private byte[] nextAnimation = new byte[MAX_STRIPS];
   private int myStrip = 0;
   private int myAnim = 0;
-  private byte[] dataOut = new byte[1];
+  private int myBrightness = 255;
+  private byte[] dataOut = new byte[258];
+  private byte[] dataIn = new byte[STATS_SIZE];
 
   private XboxController xbox = null;
   private I2C i2c = null;
@@ -35,6 +47,8 @@ public class Robot extends TimedRobot {
    * Pressing the Left bumper button will change the animation on one of the strips.
    * Pressing any of the A, B, X, or Y buttons selects which strip will be changed.
    * Pressing the Right bumper button clears out all strip animations.
+   * Pressing up or down on the POV changes the brightness of the selected strip.
+   * Pressing the Start button prints the frame statistics of the selected strip.
    */
   @Override
   public void teleopPeriodic() {
@@ -51,6 +65,12 @@ public class Robot extends TimedRobot {
       myStrip = 2;
     } else if (xbox.getXButtonPressed()) {
       myStrip = 3;
+    } else if (xbox.getStartButtonPressed()) {
+      printStats(myStrip);
+    } else if (xbox.getPOV() == 0 || xbox.getPOV() == 180) {
+      int step = xbox.getPOV() == 0 ? 8 : -8;
+      myBrightness = Math.max(0, Math.min(255, myBrightness + step));
+      sendCommand(SET_BRIGHTNESS, new byte[] { (byte) myStrip, (byte) myBrightness });
     }
     sendAllAnimations();
   }
@@ -60,8 +80,7 @@ public class Robot extends TimedRobot {
    */
   private void clearAllAnimations() {
     for (int s = 0; s < MAX_STRIPS; s++) {
-      Integer b = Integer.valueOf(((s << 4) & 0xF0) | (MAX_ANIMATIONS & 0x0F));
-      nextAnimation[s] = b.byteValue();
+      nextAnimation[s] = (byte) MAX_ANIMATIONS;
       currentAnimation[s] = (byte) 0;
     }
     myStrip = 0;
@@ -72,8 +91,7 @@ public class Robot extends TimedRobot {
    * Set one strip to have the numbered animation.
    */
   private void setAnimation(int stripNumber, int animNumber) {
-    Integer b = Integer.valueOf(((stripNumber << 4) & 0xF0) | (animNumber & 0x0F));
-    nextAnimation[stripNumber] = b.byteValue();
+    nextAnimation[stripNumber] = (byte) animNumber;
   }
 
   /**
@@ -93,7 +111,45 @@ public class Robot extends TimedRobot {
   }
 
   private void sendOneAnimation(int stripNumber) {
-    dataOut[0] = nextAnimation[stripNumber];
-    i2c.writeBulk(dataOut, dataOut.length);
+    sendCommand(SET_ANIMATION, new byte[] { (byte) stripNumber, nextAnimation[stripNumber] });
+  }
+
+  /**
+   * Send one message: command, payload length, payload, and a check byte
+   * that is the XOR of all the bytes before it.
+   */
+  private void sendCommand(byte command, byte[] payload) {
+    dataOut[0] = command;
+    dataOut[1] = (byte) payload.length;
+    byte check = (byte) (command ^ payload.length);
+    for (int i = 0; i < payload.length; i++) {
+      dataOut[2 + i] = payload[i];
+      check ^= payload[i];
+    }
+    dataOut[2 + payload.length] = check;
+    i2c.writeBulk(dataOut, payload.length + 3);
+  }
+
+  /**
+   * Ask the Pico for one strip's frame statistics and print the counters.
+   * The Pico answers between frames, so wait a little before reading.
+   */
+  private void printStats(int stripNumber) {
+    sendCommand(QUERY_STATS, new byte[] { (byte) stripNumber });
+    Timer.delay(0.05);
+    if (i2c.readOnly(dataIn, STATS_SIZE)) {
+      System.out.println("Stats read failed");
+      return;
+    }
+    System.out.println("Strip " + stripNumber + ": frames=" + readInt(0) + " dropped=" + readInt(4)
+        + " shows=" + readInt(8) + " skipped=" + readInt(12));
+  }
+
+  private long readInt(int offset) {
+    long v = 0;
+    for (int k = 3; k >= 0; k--) {
+      v = (v << 8) | (dataIn[offset + k] & 0xFF);
+    }
+    return v;
   }
 }
\ No newline at end of file
@@ -0,0 +1,208 @@
+"""
+Framed command protocol for controlling PixelStrips over I2C.
+
+Each message from the Controller is one I2C write:
+
+    command, length, payload (length bytes), check
+
+where check is the XOR of every byte before it.  A message that arrives
+with the wrong check, or that is cut short by the next message, is dropped
+and counted in CommandParser.errors.
+
+    SET_ANIMATION   strip, animation, params...   params are optional
+    SET_BRIGHTNESS  strip, level                  level 0-255
+    SET_PIXELS      strip, first_lo, first_hi, r, g, b, r, g, b, ...
+    QUERY_STATS     strip                         reply: FrameStats.pack_into()
+
+Strip ALL_STRIPS (255) means every strip, for SET_ANIMATION and SET_BRIGHTNESS.
+After QUERY_STATS, the Controller reads the reply with an I2C read.
+"""
+from profiler import FrameStats
+
+SET_ANIMATION = 0x01
+SET_BRIGHTNESS = 0x02
+SET_PIXELS = 0x03
+QUERY_STATS = 0x04
+
+ALL_STRIPS = 0xFF
+MAX_PAYLOAD = 255
+
+# How many times to check for the Controller's next read request before giving up on a reply
+REPLY_SPINS = 200
+
+# Parser states
+_COMMAND = 0
+_LENGTH = 1
+_PAYLOAD = 2
+_CHECK = 3
+
+
+def frame(command, payload=b""):
+    """
+    Returns one message as bytes, ready to send to the peripheral.
+    This is the Controller's side of the protocol, for tests and tools.
+    """
+    msg = bytearray([command, len(payload)]) + bytes(payload)
+    check = 0
+    for b in msg:
+        check ^= b
+    msg.append(check)
+    return bytes(msg)
+
+
+class CommandParser:
+    """
+    Turns bytes from an i2cp.I2cPerf into messages, and calls
+    handler(command, payload, length, reply) for each one.  The payload
+    is a bytearray that is reused for every message, so handlers must not
+    keep it.  A handler that wants to answer writes into the reply
+    bytearray and returns the number of bytes, or returns 0.
+    Nothing is allocated per message.
+    """
+
+    def __init__(self, handler, reply_size=FrameStats.PACKED_SIZE):
+        self.handler = handler
+        self.payload = bytearray(MAX_PAYLOAD)
+        self.reply = bytearray(reply_size)
+        self.messages = 0
+        self.errors = 0
+        self._state = _COMMAND
+        self._command = 0
+        self._length = 0
+        self._count = 0
+        self._check = 0
+        self._reply_length = 0
+
+    def reset(self):
+        """
+        Drop any partly received message.
+        """
+        if self._state != _COMMAND:
+            self.errors += 1
+            self._state = _COMMAND
+
+    def feed(self, b):
+        """
+        Add one received byte.  Returns True if it completed a message.
+        """
+        state = self._state
+        if state == _COMMAND:
+            self._command = b
+            self._check = b
+            self._state = _LENGTH
+        elif state == _LENGTH:
+            self._length = b
+            self._count = 0
+            self._check ^= b
+            self._state = _PAYLOAD if b else _CHECK
+        elif state == _PAYLOAD:
+            self.payload[self._count] = b
+            self._count += 1
+            self._check ^= b
+            if self._count == self._length:
+                self._state = _CHECK
+        else:
+            self._state = _COMMAND
+            if b != self._check:
+                self.errors += 1
+                return False
+            self.messages += 1
+            self._reply_length = self.handler(self._command, self.payload, self._length, self.reply) or 0
+            return True
+        return False
+
+    def poll(self, perf):
+        """
+        Handle everything waiting on the I2cPerf: every received byte, and a
+        read from the Controller.  Returns the number of messages completed.
+        Call this between frames, for example as the Scheduler's idle function.
+        Pass an i2cp.I2cReceiver instead of the I2cPerf to take bytes that
+        were received in the background.
+        """
+        done = 0
+        first = perf.FIRST_DATA_BYTE
+        n = perf.any()
+        while n:
+            v = perf.read_data()
+            if v & first:
+                self.reset()
+            if self.feed(v & 0xff):
+                done += 1
+            n -= 1
+            if not n:
+                n = perf.any()
+        if perf.any_read():
+            self._send_reply(perf)
+        return done
+
+    def _send_reply(self, perf):
+        """
+        Answer the Controller's read with the last reply, one byte per read request.
+        Reads beyond the end of the reply get zeros.
+        """
+        reply = self.reply
+        n = self._reply_length
+        self._reply_length = 0
+        i = 0
+        spins = 0
+        while spins < REPLY_SPINS:
+            if perf.any_read():
+                perf.write(reply[i] if i < n else 0)
+                i += 1
+                spins = 0
+                if i >= n:
+                    return
+            else:
+                spins += 1
+
+
+class StripCommands:
+    """
+    Message handler for CommandParser that controls a list of PixelStrips.
+    SET_ANIMATION picks from a list of Animations; an animation number past
+    the end of the list stops the animation and clears the strip.  If the
+    message has params, they are passed to the Animation's set_params().
+    SET_PIXELS stops the animation, so the pixels stay until the next
+    SET_ANIMATION.
+    """
+
+    def __init__(self, strips, animations):
+        self.strips = strips
+        self.animations = animations
+
+    def __call__(self, command, payload, length, reply):
+        if length < 1:
+            return 0
+        s = payload[0]
+        strips = self.strips
+        if command == SET_ANIMATION and length >= 2:
+            a = payload[1]
+            animation = self.animations[a] if a < len(self.animations) else None
+            if animation is not None and length > 2:
+                animation.set_params(payload, 2, length - 2)
+            if s == ALL_STRIPS:
+                for strip in strips:
+                    strip.animation = animation
+            elif s < len(strips):
+                strips[s].animation = animation
+        elif command == SET_BRIGHTNESS and length >= 2:
+            level = payload[1] / 255
+            if s == ALL_STRIPS:
+                for strip in strips:
+                    strip.brightness = level
+            elif s < len(strips):
+                strips[s].brightness = level
+        elif command == SET_PIXELS and length >= 3 and s < len(strips):
+            strip = strips[s]
+            if strip.animation is not None:
+                strip.animation = None
+            strip.write_bytes(payload[1] | (payload[2] << 8), payload, 3, length - 3)
+            strip.show()
+        elif command == QUERY_STATS and s < len(strips):
+            stats = strips[s].stats
+            if stats is None:
+                for i in range(FrameStats.PACKED_SIZE):
+                    reply[i] = 0
+                return FrameStats.PACKED_SIZE
+            return stats.pack_into(reply)
+        return 0
@@ -1,13 +1,17 @@
 # Copyright (c) 2021, Keith Rieck
 # All rights reserved.
 
-from machine import mem32
+from array import array
+from machine import mem32, Timer
+import utime
+import aio
 
 class I2cPerf:
     """
     Simple I2C peripheral class for the Raspberry Pi Pico (RP2040).
     An I2cPerf object passively waits for messages from a Controller object.
-    This class only sends and receives a single byte.
+    Bytes are received one at a time with read(), or drained from the
+    receive FIFO in bulk with readinto() and read_data().
     """
     I2C0_BASE = 0x40044000
     I2C1_BASE = 0x40048000
@@ -30,6 +34,12 @@ class I2cPerf:
     IC_CLR_TX_ABRT = 0x54
     IC_ENABLE = 0x6c
     IC_STATUS = 0x70
+    IC_RXFLR = 0x78
+
+    # IC_CON bit: hold the bus instead of dropping bytes when the receive FIFO is full
+    RX_FIFO_FULL_HLD_CTRL = 0x200
+    # IC_DATA_CMD bit: this byte is the first of a transaction
+    FIRST_DATA_BYTE = 0x800
     
     def _write_reg(self, reg, data, method=0):
         mem32[ self.i2c_base | method | reg] = data
@@ -59,6 +69,8 @@ class I2cPerf:
         self._set_reg(self.IC_SAR, self.perfAddress &0x1ff)
         # 3 write IC_CON  7 bit, enable in slave-only
         self._clr_reg(self.IC_CON, 0b01001001)
+        # stretch the clock when the receive FIFO is full, so long messages are not lost
+        self._set_reg(self.IC_CON, self.RX_FIFO_FULL_HLD_CTRL)
         # set SDA PIN
         mem32[ self.IO_BANK0_BASE | self.mem_clr |  ( 4 + 8 * self.sda) ] = 0x1f
         mem32[ self.IO_BANK0_BASE | self.mem_set |  ( 4 + 8 * self.sda) ] = 3
@@ -67,25 +79,73 @@ class I2cPerf:
         mem32[ self.IO_BANK0_BASE | self.mem_set |  ( 4 + 8 * self.scl) ] = 3
         # 4 enable i2c 
         self._set_reg(self.IC_ENABLE, 1)
+        # register addresses used on every read
+        self._status_reg = self.i2c_base | self.IC_STATUS
+        self._data_reg = self.i2c_base | self.IC_DATA_CMD
 
     def available(self):
         """
         Returns True/False on whether there is a message available to be received.
         """
-        # get IC_STATUS
-        status = mem32[ self.i2c_base | self.IC_STATUS]
-        # check RFNE receive fifio not empty
-        if status &  8 :
-            return True
-        return False
+        # check RFNE receive fifo not empty in IC_STATUS
+        return (mem32[self._status_reg] & 8) != 0
     
     def read(self):
         """
         Returns one byte sent from the Controller.
         """
-        while not self.available():
+        status = self._status_reg
+        while not mem32[status] & 8:
             pass
-        return mem32[ self.i2c_base | self.IC_DATA_CMD] & 0xff
+        return mem32[self._data_reg] & 0xff
+
+    def any(self):
+        """
+        Returns the number of bytes waiting in the receive FIFO.
+        """
+        return mem32[ self.i2c_base | self.IC_RXFLR] & 0x1f
+
+    def read_data(self):
+        """
+        Returns the next entry in the receive FIFO without waiting, so check any() first.
+        The byte is in the low 8 bits, and FIRST_DATA_BYTE is set if it
+        starts a new message from the Controller.
+        """
+        return mem32[self._data_reg] & 0xfff
+
+    def readinto(self, buf, start=0):
+        """
+        Moves every byte waiting in the receive FIFO into buf, beginning at index start,
+        without waiting for more.  Returns the number of bytes moved.
+        """
+        addr = self._data_reg
+        i = start
+        end = len(buf)
+        n = self.any()
+        while n and i < end:
+            buf[i] = mem32[addr] & 0xff
+            i += 1
+            n -= 1
+            if not n:
+                n = self.any()
+        return i - start
+
+    async def read_async(self, poll_ms=1):
+        """
+        Returns one byte sent from the Controller.
+        While no byte has arrived, checks every poll_ms milliseconds and lets other tasks run.
+        """
+        while not self.available():
+            await aio.sleep_ms(poll_ms)
+        return mem32[self._data_reg] & 0xff
+
+    async def listen(self, handler, poll_ms=1):
+        """
+        Calls handler(byte) for every byte sent from the Controller, forever.
+        Start this as an asyncio task.
+        """
+        while True:
+            handler(await self.read_async(poll_ms))
 
     def write(self, data):
         """
@@ -96,8 +156,108 @@ class I2cPerf:
         status = mem32[ self.i2c_base | self.IC_CLR_RD_REQ]
         mem32[ self.i2c_base | self.IC_DATA_CMD] = data  & 0xff
 
+    def write_bytes(self, data, n=None):
+        """
+        Sends several bytes back to the Controller, one for each read request.
+        """
+        if n is None:
+            n = len(data)
+        for i in range(n):
+            while not self.any_read():
+                pass
+            self.write(data[i])
+
     def any_read(self):
         status = mem32[ self.i2c_base | self.IC_RAW_INTR_STAT] & 0x20
         if status :
             return True
         return False
+
+
+class I2cReceiver:
+    """
+    Receives bytes for an I2cPerf in the background.
+    A timer drains the receive FIFO into a ring buffer every period_ms
+    milliseconds, so whole messages arrive while strips draw and the
+    Controller is not held up waiting for the FIFO to empty.  The main loop
+    takes bytes out with the same methods as I2cPerf, so an I2cReceiver can
+    be passed to i2ccmd.CommandParser.poll() in place of the I2cPerf.
+    The timer callback is a soft interrupt, which MicroPython runs between
+    Python instructions, like a function passed to micropython.schedule().
+    """
+
+    def __init__(self, perf, size=256, period_ms=1, timer_id=-1):
+        if size & (size - 1):
+            raise ValueError("size must be a power of two")
+        self.perf = perf
+        self.FIRST_DATA_BYTE = perf.FIRST_DATA_BYTE
+        # FIFO entries, with the FIRST_DATA_BYTE flag kept
+        self._ring = array("H", bytes(2 * size))
+        self._mask = size - 1
+        self._head = 0
+        self._tail = 0
+        # when the latest byte was taken from the FIFO, in utime.ticks_us()
+        self.arrived_us = 0
+        self._level_reg = perf.i2c_base | perf.IC_RXFLR
+        self._data_reg = perf.i2c_base | perf.IC_DATA_CMD
+        self._timer = Timer(timer_id, mode=Timer.PERIODIC, period=period_ms, callback=self._drain)
+
+    def _drain(self, timer=None):
+        """
+        Move every byte waiting in the receive FIFO into the ring buffer.
+        When the ring is full, the rest stay in the FIFO and the bus is held.
+        """
+        n = mem32[self._level_reg] & 0x1f
+        if not n:
+            return
+        ring = self._ring
+        mask = self._mask
+        head = self._head
+        room = mask + 1 - ((head - self._tail) & 0xffff)
+        while n and room:
+            ring[head & mask] = mem32[self._data_reg] & 0xfff
+            head = (head + 1) & 0xffff
+            room -= 1
+            n -= 1
+            if not n:
+                n = mem32[self._level_reg] & 0x1f
+        self._head = head
+        self.arrived_us = utime.ticks_us()
+
+    def any(self):
+        """
+        Returns the number of received bytes waiting in the ring buffer.
+        """
+        return (self._head - self._tail) & 0xffff
+
+    def available(self):
+        return self._head != self._tail
+
+    def read_data(self):
+        """
+        Returns the next entry without waiting, so check any() first.
+        Like I2cPerf.read_data(), FIRST_DATA_BYTE marks the start of a message.
+        """
+        v = self._ring[self._tail & self._mask]
+        self._tail = (self._tail + 1) & 0xffff
+        return v
+
+    def read(self):
+        """
+        Returns one byte sent from the Controller, waiting for it if needed.
+        """
+        while self._head == self._tail:
+            pass
+        return self.read_data() & 0xff
+
+    def any_read(self):
+        return self.perf.any_read()
+
+    def write(self, data):
+        self.perf.write(data)
+
+    def deinit(self):
+        """
+        Stop receiving in the background.
+        """
+        self._timer.deinit()
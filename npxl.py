@@ -1,10 +1,11 @@
 import array
+import sys
 import utime
 from machine import Pin
 import rp2
 
-@rp2.asm_pio(sideset_init=rp2.PIO.OUT_LOW, out_shiftdir=rp2.PIO.SHIFT_LEFT, autopull=True, pull_thresh=24)
-def __pio_for_ws2812():
+@rp2.asm_pio(sideset_init=rp2.PIO.OUT_LOW, out_shiftdir=rp2.PIO.SHIFT_LEFT, autopull=True, pull_thresh=8)
+def _pio_for_ws2812():
     T1 = 2
     T2 = 5
     T3 = 3
@@ -17,26 +18,500 @@ def __pio_for_ws2812():
     nop()                   .side(0)    [T2 - 1]
     wrap()
 
-__sm_num__ = 0
+def _ws2812_parallel():
+    # Each FIFO byte holds the same bit for every strip, one strip per pin.
+    # All pins go high, then low for the strips whose bit is 0, then low for all.
+    T1 = 2
+    T2 = 5
+    T3 = 3
+    wrap_target()
+    out(x, 8)
+    mov(pins, invert(null))             [T1 - 1]
+    mov(pins, x)                        [T2 - 1]
+    mov(pins, null)                     [T3 - 2]
+    wrap()
+
+_parallel_programs = {}
+
+def _pio_for_ws2812_parallel(count):
+    """
+    Returns the parallel WS2812 program for count consecutive pins, assembling it once.
+    """
+    program = _parallel_programs.get(count)
+    if program is None:
+        program = rp2.asm_pio(
+            out_init=(rp2.PIO.OUT_LOW,) * count, out_shiftdir=rp2.PIO.SHIFT_LEFT,
+            autopull=True, pull_thresh=8)(_ws2812_parallel)
+        _parallel_programs[count] = program
+    return program
+
+BYTE_US = 10       # time to shift out one byte of pixel data at 800 kHz
+LATCH_US = 300     # WS2812B latches after the data line is held low this long
+VIEW_PIXELS = 8    # partial frames are sent in multiples of this many pixels
+
+PIO0_BASE = 0x50200000
+PIO1_BASE = 0x50300000
+PIO_TXF0 = 0x10
+DREQ_PIO1_TX0 = 8
+
+class StateMachines:
+    """
+    Hands out the RP2040's eight PIO state machines, four in each of its two
+    PIO blocks.  A program is loaded into a block's instruction memory when
+    the first state machine running it is allocated there, shared by every
+    state machine in the block that runs it, and removed when the last one
+    is freed.
+    """
+    COUNT = 8
+    PER_BLOCK = 4
+
+    def __init__(self):
+        self._owners = [None for _ in range(self.COUNT)]
+        self._programs = [None for _ in range(self.COUNT)]
+        self._machines = [None for _ in range(self.COUNT)]
+        # Programs loaded into each PIO block, with how many state machines use them.
+        self._loaded = [{}, {}]
+
+    def allocate(self, owner, program, sm_id=None, **kwargs):
+        """
+        Create a StateMachine for owner, running program, on a free state machine.
+        If sm_id is None, a block that already holds the program is preferred.
+        The keyword arguments are passed on to rp2.StateMachine.
+        Raises RuntimeError if no state machine is free.
+        """
+        if sm_id is None:
+            sm_id = self._find_free(program)
+        elif self._owners[sm_id] is not None:
+            raise RuntimeError("PIO state machine {} is in use".format(sm_id))
+        block = sm_id // self.PER_BLOCK
+        loaded = self._loaded[block]
+        if program not in loaded:
+            rp2.PIO(block).add_program(program)
+            loaded[program] = 0
+        loaded[program] += 1
+        sm = rp2.StateMachine(sm_id, program, **kwargs)
+        self._owners[sm_id] = owner
+        self._programs[sm_id] = program
+        self._machines[sm_id] = sm
+        return sm_id, sm
+
+    def _find_free(self, program):
+        for block in (0, 1):
+            if program in self._loaded[block]:
+                for sm_id in range(block * self.PER_BLOCK, (block + 1) * self.PER_BLOCK):
+                    if self._owners[sm_id] is None:
+                        return sm_id
+        for sm_id in range(self.COUNT):
+            if self._owners[sm_id] is None:
+                return sm_id
+        raise RuntimeError("no free PIO state machines")
+
+    def free(self, sm_id):
+        """
+        Stop a state machine and make it available again.
+        """
+        if self._owners[sm_id] is None:
+            return
+        self._machines[sm_id].active(0)
+        block = sm_id // self.PER_BLOCK
+        program = self._programs[sm_id]
+        loaded = self._loaded[block]
+        loaded[program] -= 1
+        if loaded[program] == 0:
+            del loaded[program]
+            rp2.PIO(block).remove_program(program)
+        self._owners[sm_id] = None
+        self._programs[sm_id] = None
+        self._machines[sm_id] = None
+
+    def owner(self, sm_id):
+        """
+        Returns the object using a state machine, or None if it is free.
+        """
+        return self._owners[sm_id]
+
+    def in_use(self):
+        """
+        Returns a list of the state machine numbers in use.
+        """
+        return [sm_id for sm_id in range(self.COUNT) if self._owners[sm_id] is not None]
+
+    def available(self):
+        """
+        Returns the number of free state machines.
+        """
+        return self.COUNT - len(self.in_use())
+
+    def __repr__(self):
+        lines = []
+        for sm_id in range(self.COUNT):
+            owner = self._owners[sm_id]
+            lines.append("sm{}: {}".format(sm_id, "free" if owner is None else owner))
+        return "\n".join(lines)
+
+state_machines = StateMachines()
+
+class Backend:
+    """
+    Base class for NeoPixel output backends.
+    A backend receives each frame as a bytearray of GRB bytes, three per pixel.
+    Asynchronous backends may still be reading the buffer after write() returns,
+    so NeoPixel alternates between two buffers when writing to them.
+    """
+    asynchronous = False
+
+    def write(self, buf):
+        pass
+
+    def busy(self):
+        """
+        Returns True while the previous frame is still being sent or latched.
+        """
+        return False
+
+    def wait(self):
+        """
+        Block until the previous frame has been sent and latched.
+        """
+        pass
+
+    def remaining_us(self):
+        """
+        Returns the microseconds left until the previous frame has been sent and latched.
+        """
+        return 0
+
+    def deinit(self):
+        pass
+
+class PioBackend(Backend):
+    """
+    Output backend that sends frames to a WS2812 strip through a PIO state machine.
+    """
+    def __init__(self, pin, sm_id=None):
+        self._pin = pin
+        self._sm_id, self._sm = self._allocate(pin, sm_id)
+        self._sm.active(1)
+        self._latch_at = utime.ticks_us()
+
+    def _allocate(self, pin, sm_id):
+        return state_machines.allocate(self, _pio_for_ws2812, sm_id, freq=8_000_000, sideset_base=pin)
+
+    def _send_us(self, nbytes):
+        """
+        Returns the microseconds it takes to shift out nbytes of buf.
+        """
+        return nbytes * BYTE_US
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, self._pin)
+
+    def _wait_for_latch(self):
+        """
+        Sleep until the previous frame has shifted out and latched.  Returns the current time.
+        """
+        now = utime.ticks_us()
+        wait = utime.ticks_diff(self._latch_at, now)
+        if wait > 0:
+            utime.sleep_us(wait)
+            now = self._latch_at
+        return now
+
+    def write(self, buf):
+        # Only wait if the previous frame is still shifting out or latching.
+        now = self._wait_for_latch()
+        self._sm.put(buf, 24)
+        self._latch_at = utime.ticks_add(now, self._send_us(len(buf)) + LATCH_US)
+
+    def busy(self):
+        return utime.ticks_diff(self._latch_at, utime.ticks_us()) > 0
+
+    def wait(self):
+        self._wait_for_latch()
+
+    def remaining_us(self):
+        return max(0, utime.ticks_diff(self._latch_at, utime.ticks_us()))
+
+    def deinit(self):
+        if self._sm is not None:
+            self.wait()
+            state_machines.free(self._sm_id)
+            self._sm = None
+
+class DmaBackend(PioBackend):
+    """
+    Output backend that streams frames into the PIO state machine by DMA.
+    write() starts the transfer and returns immediately, so the next frame can
+    be computed while this one shifts out.  Requires a MicroPython with rp2.DMA.
+    """
+    asynchronous = True
+
+    def __init__(self, pin, sm_id=None):
+        PioBackend.__init__(self, pin, sm_id)
+        self._dma = rp2.DMA()
+        pio_base = PIO0_BASE if self._sm_id < 4 else PIO1_BASE
+        self._txf = pio_base + PIO_TXF0 + 4 * (self._sm_id % 4)
+        dreq = self._sm_id if self._sm_id < 4 else DREQ_PIO1_TX0 + self._sm_id - 4
+        # Byte writes to the TX FIFO are replicated across all 32 bits, which
+        # puts each byte at the top of the word where the PIO program shifts from.
+        self._ctrl = self._dma.pack_ctrl(size=0, inc_write=False, treq_sel=dreq)
+
+    def write(self, buf):
+        now = self._wait_for_latch()
+        self._dma.config(read=buf, write=self._txf, count=len(buf), ctrl=self._ctrl, trigger=True)
+        self._latch_at = utime.ticks_add(now, self._send_us(len(buf)) + LATCH_US)
+
+    def deinit(self):
+        self.wait()
+        self._dma.close()
+        PioBackend.deinit(self)
+
+def _spread_table(top, bits):
+    """
+    Entry v holds bit top of v in bit 0, bit top - 1 in bit 8, and so on for the given number of bits.
+    """
+    table = array.array("I", [0 for _ in range(256)])
+    for v in range(256):
+        x = 0
+        for k in range(bits):
+            if v & (1 << (top - k)):
+                x |= 1 << (8 * k)
+        table[v] = x
+    return table
+
+_spread = None
+
+def transpose(bufs, out, nbytes):
+    """
+    Interleave the first nbytes of each buffer in bufs (up to 8 of them) into out,
+    eight bytes per input byte.  Output byte 8 * j + k holds bit 7 - k of byte j of
+    every buffer, with buffer s in bit s.
+    """
+    global _spread
+    if _spread is None:
+        _spread = (_spread_table(7, 3), _spread_table(4, 3), _spread_table(1, 2))
+    hi3, mid3, lo2 = _spread
+    count = len(bufs)
+    k = 0
+    for j in range(nbytes):
+        # Three bits of each buffer land in three lanes of a, three in b and
+        # two in c, so the sums stay well inside a small int.
+        a = 0
+        b = 0
+        c = 0
+        for s in range(count):
+            v = bufs[s][j]
+            a |= hi3[v] << s
+            b |= mid3[v] << s
+            c |= lo2[v] << s
+        out[k] = a & 0xFF
+        out[k + 1] = (a >> 8) & 0xFF
+        out[k + 2] = a >> 16
+        out[k + 3] = b & 0xFF
+        out[k + 4] = (b >> 8) & 0xFF
+        out[k + 5] = b >> 16
+        out[k + 6] = c & 0xFF
+        out[k + 7] = c >> 8
+        k += 8
+
+if sys.implementation.name == "micropython":
+    import micropython
+
+    @micropython.viper
+    def _transpose_viper(bufs, out, nbytes: int):
+        # Same result as transpose(), compiled to machine code on the Pico.
+        dst = ptr8(out)
+        for i in range(8 * nbytes):
+            dst[i] = 0
+        bit = 1
+        for buf in bufs:
+            src = ptr8(buf)
+            k = 0
+            for j in range(nbytes):
+                v = src[j]
+                m = 0x80
+                while m:
+                    if v & m:
+                        dst[k] = dst[k] | bit
+                    k += 1
+                    m >>= 1
+            bit <<= 1
+
+    _transpose = _transpose_viper
+else:
+    _transpose = transpose
+
+class ParallelOutput(PioBackend):
+    """
+    Drives up to 8 strips, on consecutive pins starting at first_pin, from one
+    PIO state machine.  Every strip's bits are clocked out at the same time, so
+    a frame for all of the strips takes as long as one strip of `pixels` pixels.
+    Give each strip a backend from channel(i), then call show() once all of
+    the strips have been drawn.
+    """
+    def __init__(self, first_pin, count, pixels, sm_id=None):
+        if count < 1 or count > 8:
+            raise ValueError("count must be from 1 to 8")
+        self._count = count
+        self._channels = [ParallelChannel(self, 3 * pixels) for _ in range(count)]
+        self._bufs = [ch._buf for ch in self._channels]
+        self._frame = bytearray(24 * pixels)
+        self._length = 0
+        # The last partial view of _frame, reused while the longest strip stays the same length
+        self._view = None
+        PioBackend.__init__(self, Pin(first_pin), sm_id)
+
+    def _allocate(self, pin, sm_id):
+        return state_machines.allocate(
+            self, _pio_for_ws2812_parallel(self._count), sm_id, freq=8_000_000, out_base=pin)
+
+    def _send_us(self, nbytes):
+        # Each byte of the interleaved frame is a single bit time.
+        return nbytes * BYTE_US // 8
+
+    def channel(self, index):
+        """
+        Returns the backend for the strip on pin first_pin + index.
+        """
+        return self._channels[index]
+
+    def show(self):
+        """
+        Send the pixels written by every channel's strip since the last show().
+        Does nothing if no strip has written anything.
+        """
+        n = self._length
+        if n == 0:
+            return
+        _transpose(self._bufs, self._frame, n)
+        if 8 * n == len(self._frame):
+            self.write(self._frame)
+        else:
+            view = self._view
+            if view is None or len(view) != 8 * n:
+                view = memoryview(self._frame)[:8 * n]
+                self._view = view
+            self.write(view)
+        self._length = 0
+
+class ParallelChannel(Backend):
+    """
+    Backend for one strip of a ParallelOutput.  write() only keeps the
+    strip's bytes; ParallelOutput.show() sends them with the other strips.
+    """
+    def __init__(self, output, size):
+        self._output = output
+        self._buf = bytearray(size)
+
+    def write(self, buf):
+        n = len(buf)
+        if n > len(self._buf):
+            raise ValueError("strip is longer than the ParallelOutput")
+        self._buf[:n] = buf
+        if n > self._output._length:
+            self._output._length = n
+
+    def busy(self):
+        return self._output.busy()
+
+    def wait(self):
+        self._output.wait()
+
+    def remaining_us(self):
+        return self._output.remaining_us()
+
+def _gammas(gamma):
+    """
+    Returns gamma as an (r, g, b) tuple of floats, or None for no gamma correction.
+    gamma may be one number, or a tuple or list of three.
+    """
+    if gamma is None:
+        return None
+    if type(gamma) is tuple or type(gamma) is list:
+        return (float(gamma[0]), float(gamma[1]), float(gamma[2]))
+    gamma = float(gamma)
+    return (gamma, gamma, gamma)
+
+def _output_table(brightness, gamma, dither):
+    """
+    Build the lookup table for one channel.  Without dithering it is a
+    bytearray of output levels; with dithering it holds 256 times each level,
+    so the fraction below one level is kept.
+    """
+    if dither:
+        table = array.array("H", [0 for _ in range(256)])
+        top = 255 * 256
+    else:
+        table = bytearray(256)
+        top = 255
+    for v in range(256):
+        if gamma == 1.0 and not dither:
+            table[v] = int(v * brightness)
+        else:
+            table[v] = int(top * brightness * (v / 255) ** gamma + 0.5)
+    return table
+
+def _is_rgb(color):
+    """
+    Returns True if color is one (r, g, b) or (r, g, b, w) tuple, rather than a
+    sequence of colors.  As in __setitem__ and fill(), w is ignored.
+    """
+    if type(color) is not tuple or not 3 <= len(color) <= 4:
+        return False
+    for v in color:
+        if type(v) is not int or not 0 <= v <= 255:
+            return False
+    return True
+
+def _views(buf):
+    """
+    Returns memoryviews of the first 0, VIEW_PIXELS, 2 * VIEW_PIXELS, ... pixels of buf.
+    """
+    step = 3 * VIEW_PIXELS
+    return [memoryview(buf)[:k] for k in range(0, len(buf), step)]
+
 
 class NeoPixel:
-    def __init__(self, pin_num, num_pixels, bpp=3, brightness=1.0, auto_write=True, pixel_order=None):
-        global __sm_num__
+    def __init__(self, pin_num, num_pixels, bpp=3, brightness=1.0, auto_write=True, pixel_order=None, backend=None, dma=False,
+                 gamma=None, dither=False):
         self.pin = Pin(pin_num)
         self._pin_num = pin_num
         self._num_pixels = num_pixels
         self._bpp = bpp
-        self._brightness = brightness
         self.auto_write = auto_write
         self._pixel_order = pixel_order
+        self.stats = None
+        self.pushed = 0
+        self.skipped = 0
         self._ar = array.array("I", [0 for _ in range(num_pixels)])
-        self._sm = rp2.StateMachine(__sm_num__, __pio_for_ws2812, freq=8_000_000, sideset_base=self.pin)
-        __sm_num__ = (__sm_num__ + 1) % 8 # don't use more than 8 state machines
-        self._sm.active(1)
+        # Pixels _dirty_lo up to (not including) _dirty_hi have changed since the last show().
+        self._dirty_lo = 0
+        self._dirty_hi = num_pixels
+        self._brightness = min(max(brightness, 0.0), 1.0)
+        self._gamma = _gammas(gamma)
+        # Fractions of a level left over from the last frame, in the same order as the output bytes.
+        self._residual = bytearray(3 * num_pixels) if dither else None
+        self._update_dimmer()
+        if backend is None:
+            backend = DmaBackend(self.pin) if dma else PioBackend(self.pin)
+        self._backend = backend
+        self._out = bytearray(3 * num_pixels)
+        # Asynchronous backends get a second buffer to fill while the first is sent.
+        self._out_next = bytearray(3 * num_pixels) if backend.asynchronous else self._out
+        # Partial views of each buffer, one per multiple of VIEW_PIXELS pixels,
+        # made once here so that show() never makes a memoryview.
+        self._views = _views(self._out)
+        self._views_next = _views(self._out_next) if backend.asynchronous else self._views
+        # Set by pipeline.Pipeline.add(), which hands frames to a second core.
+        self._pipeline = None
+        self._pending = False
     
     def deinit(self):
-        self.fill((0, 0, 0))
+        self.fill(0)
         self.show()
+        if self._pipeline is not None:
+            self._pipeline.remove(self)
+        self._backend.deinit()
 
     def __enter__(self):
         return self
@@ -45,37 +520,316 @@ class NeoPixel:
         self.deinit()
 
     def __repr__(self):
-        return "[" + ", ".join([str(x) for x in self]) + "]"
+        return "[" + ", ".join(["0x{:06x}".format(x) for x in self]) + "]"
 
     def _set_item(self, index, r, g, b): 
         if index >= 0 and index < self._num_pixels:
-            self._ar[index] = (g<<16) + (r<<8) + b
+            self._set_packed(index, (r<<16) + (g<<8) + b)
+
+    def _set_packed(self, index, c):
+        if self._ar[index] != c:
+            self._ar[index] = c
+            if index < self._dirty_lo:
+                self._dirty_lo = index
+            if index >= self._dirty_hi:
+                self._dirty_hi = index + 1
+
+    def _mark_dirty(self, lo, hi):
+        """
+        Record that pixels lo up to (not including) hi may have changed.
+        """
+        if lo < self._dirty_lo:
+            self._dirty_lo = lo
+        if hi > self._dirty_hi:
+            self._dirty_hi = hi
 
     def __setitem__(self, index, color):
-        self._set_item(index, color[0], color[1], color[2])
+        # Colors are packed ints 0xRRGGBB, or (r, g, b) tuples on the slower path.
+        if type(index) is slice:
+            self._set_slice(index, color)
+        elif type(color) is int:
+            if index >= 0 and index < self._num_pixels and self._ar[index] != color:
+                self._ar[index] = color
+                if index < self._dirty_lo:
+                    self._dirty_lo = index
+                if index >= self._dirty_hi:
+                    self._dirty_hi = index + 1
+        else:
+            self._set_item(index, color[0], color[1], color[2])
+        if self.auto_write:
+            self.show()
+
+    def _set_slice(self, index, color):
+        """
+        Assign either one color or a sequence of colors to a slice of pixels.
+        """
+        n = self._num_pixels
+        step = 1 if index.step is None else index.step
+        if step > 0:
+            start = 0 if index.start is None else index.start
+            stop = n if index.stop is None else index.stop
+        else:
+            start = n - 1 if index.start is None else index.start
+            stop = -n - 1 if index.stop is None else index.stop
+        if start < 0:
+            start += n
+        if stop < 0:
+            stop += n
+        if step > 0:
+            lo, hi = 0, n
+        else:
+            lo, hi = -1, n - 1
+        start = min(max(start, lo), hi)
+        stop = min(max(stop, lo), hi)
+        single = type(color) is int or _is_rgb(color)
+        if not single:
+            if step > 0:
+                count = (stop - start + step - 1) // step
+            else:
+                count = (start - stop - step - 1) // -step
+            if len(color) != max(count, 0):
+                raise ValueError("attempt to assign {} colors to a slice of {} pixels".format(
+                    len(color), max(count, 0)))
+        if step > 0 and start < stop:
+            self._mark_dirty(start, stop)
+        elif step < 0 and stop < start:
+            self._mark_dirty(stop + 1, start + 1)
+        ar = self._ar
+        if single:
+            c = color if type(color) is int else (color[0] << 16) | (color[1] << 8) | color[2]
+            for i in range(start, stop, step):
+                ar[i] = c
+        else:
+            j = 0
+            for i in range(start, stop, step):
+                c = color[j]
+                if type(c) is not int:
+                    c = (c[0] << 16) | (c[1] << 8) | c[2]
+                ar[i] = c
+                j += 1
+
+    def set_pixels(self, start, colors):
+        """
+        Set consecutive pixels from a sequence of colors, beginning at pixel start.
+        Colors that would land outside the strip are ignored.
+        """
+        ar = self._ar
+        stop = min(start + len(colors), self._num_pixels)
+        self._mark_dirty(max(start, 0), stop)
+        for i in range(max(start, 0), stop):
+            c = colors[i - start]
+            if type(c) is not int:
+                c = (c[0] << 16) | (c[1] << 8) | c[2]
+            ar[i] = c
+        if self.auto_write:
+            self.show()
+
+    def write_bytes(self, start, data, offset=0, nbytes=None):
+        """
+        Set consecutive pixels from packed RGB bytes (a bytes, bytearray or memoryview),
+        three bytes per pixel, beginning at pixel start.  To use only part of data
+        without slicing it, give the offset of the first byte and the number of bytes.
+        """
+        ar = self._ar
+        if nbytes is None:
+            nbytes = len(data) - offset
+        stop = min(start + nbytes // 3, self._num_pixels)
+        i = max(start, 0)
+        self._mark_dirty(i, stop)
+        j = offset + 3 * (i - start)
+        while i < stop:
+            ar[i] = (data[j] << 16) | (data[j + 1] << 8) | data[j + 2]
+            i += 1
+            j += 3
+        if self.auto_write:
+            self.show()
+
+    def write_indexed(self, start, indexes, palette, offset=0, count=None):
+        """
+        Set consecutive pixels to palette[i] for each i in indexes (such as a bytearray),
+        beginning at pixel start.  The palette holds packed colors.  To use only part of
+        indexes without slicing it, give the offset of the first index and the count.
+        """
+        ar = self._ar
+        if count is None:
+            count = len(indexes) - offset
+        stop = min(start + count, self._num_pixels)
+        i = max(start, 0)
+        self._mark_dirty(i, stop)
+        j = offset + (i - start)
+        while i < stop:
+            ar[i] = palette[indexes[j]]
+            i += 1
+            j += 1
         if self.auto_write:
             self.show()
 
     def __getitem__(self, index):
+        return self._ar[index]
+
+    def get_rgb(self, index):
+        """
+        Returns the color of one pixel as an (r, g, b) tuple.
+        """
         c = self._ar[index]
-        return ((c >> 8) & 0xFF), ((c>>16) & 0xFF), (c & 0xFF)
+        return ((c >> 16) & 0xFF), ((c >> 8) & 0xFF), (c & 0xFF)
     
     def __len__(self):
         return self._num_pixels
     
+    def _update_dimmer(self):
+        """
+        Rebuild the output lookup tables, mapping each channel value 0-255 to the
+        value sent to the LEDs after brightness and gamma.  Channels with the same
+        gamma share a table.
+        """
+        brightness = self._brightness
+        dither = self._residual is not None
+        gamma = self._gamma or (1.0, 1.0, 1.0)
+        tables = {}
+        for g in gamma:
+            if g not in tables:
+                tables[g] = _output_table(brightness, g, dither)
+        self._dim_r = tables[gamma[0]]
+        self._dim_g = tables[gamma[1]]
+        self._dim_b = tables[gamma[2]]
+
+    @property
+    def dirty(self):
+        """
+        True if any pixel or the brightness has changed since the last show().
+        """
+        return self._dirty_hi > self._dirty_lo
+
+    @property
+    def dirty_range(self):
+        """
+        The (start, stop) range of pixels changed since the last show(), or None.
+        """
+        if self._dirty_hi > self._dirty_lo:
+            return self._dirty_lo, self._dirty_hi
+        return None
+
     def show(self):
-        dimmer_ar = array.array("I", [0 for _ in range(self._num_pixels)])
-        for i,c in enumerate(self._ar):
-            r = int(((c >> 8) & 0xFF) * self._brightness)
-            g = int(((c >> 16) & 0xFF) * self._brightness)
-            b = int((c & 0xFF) * self._brightness)
-            dimmer_ar[i] = (g<<16) + (r<<8) + b
-        self._sm.put(dimmer_ar, 8)
-        utime.sleep_ms(10)
+        """
+        Send the pixels to the strip.  Does nothing if no pixel has changed.
+        Only the pixels up to the last changed one, rounded up to a multiple of
+        VIEW_PIXELS, are sent, since the LEDs past the end of the data keep the
+        colors they already show.
+        """
+        if self._residual is not None:
+            # Dithering changes the output every frame, so every frame is sent.
+            self._dirty_lo = 0
+            self._dirty_hi = self._num_pixels
+        hi = self._dirty_hi
+        if hi <= self._dirty_lo:
+            self.skipped += 1
+            stats = self.stats
+            if stats is not None:
+                stats.add_skip()
+            return
+        stats = self.stats
+        if stats is not None:
+            start = utime.ticks_us()
+        if self._pipeline is not None:
+            self._pipeline.submit(self, self._dirty_lo, hi)
+        else:
+            self._push(self._ar, self._dirty_lo, hi)
+        self._dirty_lo = self._num_pixels
+        self._dirty_hi = 0
+        self.pushed += 1
+        if stats is not None:
+            stats.add_show(utime.ticks_diff(utime.ticks_us(), start), hi)
+
+    def _push(self, ar, lo, hi):
+        """
+        Apply brightness to pixels lo up to hi of ar, and send pixels 0 up to hi to the backend.
+        """
+        out = self._out_next
+        dim_r = self._dim_r
+        dim_g = self._dim_g
+        dim_b = self._dim_b
+        res = self._residual
+        n = self._num_pixels
+        if hi < n:
+            # Send up to a multiple of VIEW_PIXELS, so there are few lengths of view.
+            hi = min((hi + VIEW_PIXELS - 1) // VIEW_PIXELS * VIEW_PIXELS, n)
+        # The other buffer of a double-buffered backend holds an older
+        # frame, so it is rebuilt from pixel 0 rather than from lo.
+        i = lo if out is self._out else 0
+        j = 3 * i
+        if res is None:
+            while i < hi:
+                c = ar[i]
+                out[j] = dim_g[(c >> 8) & 0xFF]
+                out[j + 1] = dim_r[(c >> 16) & 0xFF]
+                out[j + 2] = dim_b[c & 0xFF]
+                i += 1
+                j += 3
+        else:
+            # The tables hold 256 times each level.  Send the whole part, and
+            # carry the fraction over to the same pixel in the next frame.
+            while i < hi:
+                c = ar[i]
+                v = dim_g[(c >> 8) & 0xFF] + res[j]
+                out[j] = v >> 8
+                res[j] = v & 0xFF
+                v = dim_r[(c >> 16) & 0xFF] + res[j + 1]
+                out[j + 1] = v >> 8
+                res[j + 1] = v & 0xFF
+                v = dim_b[c & 0xFF] + res[j + 2]
+                out[j + 2] = v >> 8
+                res[j + 2] = v & 0xFF
+                i += 1
+                j += 3
+        if hi == n:
+            self._backend.write(out)
+        else:
+            self._backend.write(self._views_next[hi // VIEW_PIXELS])
+        self._out_next = self._out
+        self._out = out
+        self._views_next, self._views = self._views, self._views_next
+
+    def busy(self):
+        """
+        Returns True while the last frame is still being sent to the strip.
+        """
+        return self._pending or self._backend.busy()
+
+    def wait(self):
+        """
+        Block until the last frame has been sent to the strip.
+        """
+        if self._pipeline is not None:
+            self._pipeline.flush(self)
+        self._backend.wait()
     
-    def fill(self, color):
-        for index in range(self._num_pixels):
-            self._set_item(index, color[0], color[1], color[2])
+    def fill(self, color, start=0, stop=None, step=1):
+        """
+        Set every pixel to one color, or every step-th pixel from start up to stop.
+        Negative start and stop count back from the end, as in a slice, but step
+        must be positive.  Unlike assigning to a slice, this does not make a slice object.
+        """
+        if step <= 0:
+            raise ValueError("fill() step must be positive")
+        c = color if type(color) is int else (color[0] << 16) | (color[1] << 8) | color[2]
+        ar = self._ar
+        n = self._num_pixels
+        if stop is None:
+            stop = n
+        elif stop < 0:
+            stop = max(stop + n, 0)
+        elif stop > n:
+            stop = n
+        if start < 0:
+            start = max(start + n, 0)
+        # A while loop, since range() with a step that is not a constant makes an object.
+        index = start
+        while index < stop:
+            ar[index] = c
+            index += step
+        if start < stop:
+            self._mark_dirty(start, stop)
         if self.auto_write:
             self.show()
 
@@ -93,7 +847,43 @@ class NeoPixel:
 
     @brightness.setter
     def brightness(self, value):
+        if self._pipeline is not None:
+            # The second core reads the brightness table while it sends a frame.
+            self._pipeline.flush(self)
         self._brightness = min(max(value, 0.0), 1.0)
+        self._update_dimmer()
+        self._mark_dirty(0, self._num_pixels)
+        if self.auto_write:
+            self.show()
+
+    @property
+    def gamma(self):
+        return self._gamma
+
+    @gamma.setter
+    def gamma(self, value):
+        if self._pipeline is not None:
+            self._pipeline.flush(self)
+        self._gamma = _gammas(value)
+        self._update_dimmer()
+        self._mark_dirty(0, self._num_pixels)
+        if self.auto_write:
+            self.show()
+
+    @property
+    def dither(self):
+        return self._residual is not None
+
+    @dither.setter
+    def dither(self, value):
+        if self._pipeline is not None:
+            self._pipeline.flush(self)
+        if value and self._residual is None:
+            self._residual = bytearray(3 * self._num_pixels)
+        elif not value:
+            self._residual = None
+        self._update_dimmer()
+        self._mark_dirty(0, self._num_pixels)
         if self.auto_write:
             self.show()
 
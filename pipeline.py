@@ -0,0 +1,123 @@
+import array
+import _thread
+
+
+class Pipeline:
+    """
+    Sends frames for a group of strips from a second thread, which MicroPython
+    runs on the RP2040's second core.  While core 1 applies brightness and sends
+    frame N to the strips, core 0 is free to draw frame N+1.
+
+    show() copies the strip's pixels into a front buffer and sets a flag that
+    hands the copy to core 1; core 1 clears the flag when the frame is sent.
+    Each flag is only set by one core and only cleared by the other, so the
+    buffers need no lock.  Two locks are used only to wake a core that has
+    nothing to do.  Animations keep drawing into the strip's own pixels, so
+    they can still read back what they drew in the previous frame.
+    """
+
+    def __init__(self, strips=None):
+        self._strips = []
+        self._running = False
+        self._stopped = True
+        # Released by core 0 when a frame is waiting, acquired by core 1.
+        self._ready = _thread.allocate_lock()
+        self._ready.acquire()
+        # Released by core 1 when a frame has been sent, acquired by core 0.
+        self._sent = _thread.allocate_lock()
+        if strips is not None:
+            for strip in strips:
+                self.add(strip)
+
+    def add(self, strip):
+        """
+        Send this strip's frames from the second core.
+        """
+        if strip._pipeline is self:
+            return
+        strip._front = array.array("I", strip._ar)
+        strip._front_lo = 0
+        strip._front_hi = 0
+        strip._pipeline = self
+        self._strips.append(strip)
+
+    def remove(self, strip):
+        """
+        Send this strip's frames from the calling core again.
+        """
+        if strip._pipeline is self:
+            self.flush(strip)
+            strip._pipeline = None
+            self._strips.remove(strip)
+
+    def start(self):
+        """
+        Start the thread that sends the frames.
+        """
+        if not self._stopped:
+            return
+        self._running = True
+        self._stopped = False
+        _thread.start_new_thread(self._run, ())
+
+    def stop(self):
+        """
+        Send any waiting frames, then stop the thread.
+        """
+        for strip in self._strips:
+            self.flush(strip)
+        self._running = False
+        self._wake()
+        while not self._stopped:
+            self._sent.acquire()
+
+    @property
+    def running(self):
+        return self._running
+
+    def submit(self, strip, lo, hi):
+        """
+        Called by NeoPixel.show() to hand pixels lo up to hi to the second core.
+        Waits if the strip's previous frame has not been taken yet.
+        """
+        if not self._running:
+            strip._push(strip._ar, lo, hi)
+            return
+        self.flush(strip)
+        front = strip._front
+        ar = strip._ar
+        for i in range(lo, hi):
+            front[i] = ar[i]
+        strip._front_lo = lo
+        strip._front_hi = hi
+        strip._pending = True
+        self._wake()
+
+    def flush(self, strip):
+        """
+        Wait until the second core has sent the strip's last frame.
+        """
+        sent = self._sent
+        while strip._pending:
+            sent.acquire()
+
+    def _wake(self):
+        # Only core 0 releases _ready and only core 1 acquires it, so the
+        # check cannot race.  A wakeup that is already pending is enough.
+        if self._ready.locked():
+            self._ready.release()
+
+    def _run(self):
+        ready = self._ready
+        sent = self._sent
+        while self._running:
+            ready.acquire()
+            for strip in self._strips:
+                if strip._pending:
+                    strip._push(strip._front, strip._front_lo, strip._front_hi)
+                    strip._pending = False
+                    if sent.locked():
+                        sent.release()
+        self._stopped = True
+        if sent.locked():
+            sent.release()
@@ -1,5 +1,7 @@
+import array
 import utime
 import npxl as neopixel
+import aio
 
 
 def current_time():
@@ -18,6 +20,8 @@ MATRIX_COLUMN_MAJOR = 0x20  # Matrix is column major (vertical)
 MATRIX_PROGRESSIVE = 0x40   # Same pixel order across each line
 MATRIX_ZIGZAG = 0x80        # Pixel order reverses between lines
 
+_DELTA_TIMES = 16           # Most delta_time values kept by each strip
+
 
 class PixelStrip(neopixel.NeoPixel):
     """
@@ -25,17 +29,19 @@ class PixelStrip(neopixel.NeoPixel):
     """
 
     def __init__(
-            self, pin, n=8, width=None, height=None, brightness=1.0, options=None, auto_write=False
+            self, pin, n=8, width=None, height=None, brightness=1.0, options=None, auto_write=False,
+            backend=None, dma=False, fps=50, gamma=None, dither=False
     ):
         self._options = { MATRIX_PROGRESSIVE, MATRIX_ROW_MAJOR, MATRIX_TOP, MATRIX_LEFT }
-        self.width = n
-        self.height = 1
+        self._width = n
+        self._height = 1
         if width is not None and height is not None:
             n = width * height
-            self.width = width
-            self.height = height
+            self._width = width
+            self._height = height
         if options is not None:
             self._options = options
+        self._build_index_map()
         neopixel.NeoPixel.__init__(
             self,
             pin,
@@ -43,49 +49,243 @@ class PixelStrip(neopixel.NeoPixel):
             brightness=brightness,
             auto_write=auto_write,
             pixel_order=None,
+            backend=backend,
+            dma=dma,
+            gamma=gamma,
+            dither=dither,
         )
+        self._init_drawing(fps)
+
+    def _init_drawing(self, fps):
+        """
+        Set up the state for drawing animations, apart from the pixels themselves.
+        """
         self._timeout = None
         self._animation = None
-        self._prev_time = current_time()
+        self._palette = None
+        self._palette_size = 0
+        self._palette_offset = 0
+        self._indexes = None
+        self._prev_ms = utime.ticks_ms()
+        # delta_time floats by frame interval in milliseconds, so they are made once each.
+        self._delta_times = {}
         self.wrap = False
+        self.fps = fps
 
     def draw(self):
         """
         Draw one cycle of the strip animation.
         """
         if self._animation is not None:
-            delta_time = current_time() - self._prev_time
-            self._animation.draw(self, delta_time)
-            self._prev_time = current_time()
+            stats = self.stats
+            if stats is not None:
+                stats.begin_frame()
+            now = utime.ticks_ms()
+            delta_ms = utime.ticks_diff(now, self._prev_ms)
+            self._prev_ms = now
+            # The interval jitters by a millisecond or two around the frame
+            # period, so only a few floats are needed.  If intervals vary more
+            # than _DELTA_TIMES ways, the cache starts over, which allocates.
+            delta_times = self._delta_times
+            if delta_ms not in delta_times:
+                if len(delta_times) >= _DELTA_TIMES:
+                    delta_times.clear()
+                delta_times[delta_ms] = delta_ms / 1000.0
+            self._animation.draw(self, delta_times[delta_ms])
+            if stats is not None:
+                stats.end_frame()
 
     def reset(self):
         """
         Reset the strip animation.
         """
-        self._prev_time = current_time()
+        self._prev_ms = utime.ticks_ms()
         if self._animation is not None:
             self._animation.reset(self)
         else:
             self.clear()
 
+    async def run(self):
+        """
+        Draw the animation at the strip's fps, forever.  Start one of these as an
+        asyncio task for each strip.  Other tasks run while the strip waits for its
+        next frame and while each frame is sent.  Late frames are skipped.
+        """
+        due = utime.ticks_us()
+        while True:
+            await self.wait_async()
+            self.draw()
+            due = utime.ticks_add(due, 1_000_000 // self.fps)
+            wait = utime.ticks_diff(due, utime.ticks_us())
+            if wait < 0:
+                due = utime.ticks_us()
+                wait = 0
+            await aio.sleep_us(wait)
+
+    async def show_async(self):
+        """
+        Like show(), but lets other tasks run while the previous frame finishes sending.
+        """
+        await self.wait_async()
+        self.show()
+
+    async def wait_async(self):
+        """
+        Wait until the last frame has been sent to the strip, letting other tasks run meanwhile.
+        """
+        us = self._backend.remaining_us()
+        while us > 0:
+            await aio.sleep_us(us)
+            us = self._backend.remaining_us()
+
     def clear(self):
         """
-        Turn all pixels off.
+        Turn all pixels off.  This also leaves palette mode.
         """
-        self.fill((0, 0, 0))
+        self.palette = None
+        self.fill(0)
         self.show()
 
+    def deinit(self):
+        self.palette = None
+        neopixel.NeoPixel.deinit(self)
+
+    def show(self):
+        """
+        Send the pixels to the strip.  In palette mode, each pixel is first set
+        to the palette color for its index.
+        """
+        if self._palette is not None:
+            self._resolve()
+        neopixel.NeoPixel.show(self)
+
+    def _resolve(self):
+        """
+        Set each pixel to palette color indexes[i] + palette_offset, marking the ones that change.
+        """
+        indexes = self._indexes
+        # The palette is stored twice over, so index + offset needs no wrapping.
+        palette = self._palette
+        offset = self._palette_offset
+        ar = self._ar
+        n = self._num_pixels
+        lo = n
+        hi = 0
+        for i in range(n):
+            c = palette[indexes[i] + offset]
+            if ar[i] != c:
+                ar[i] = c
+                if i < lo:
+                    lo = i
+                hi = i + 1
+        if lo < hi:
+            self._mark_dirty(lo, hi)
+
+    def set_palette_color(self, index, color):
+        """
+        Change one color of the palette.
+        """
+        if type(color) is not int:
+            color = (color[0] << 16) | (color[1] << 8) | color[2]
+        self._palette[index] = color
+        self._palette[index + self._palette_size] = color
+
     def __setitem__(self, index, color):
         if type(index) is tuple:
-            nn = self._translate_pixel(index[0], index[1])
+            nn = self._pixel_index(index[0], index[1])
+        elif type(index) is slice:
+            neopixel.NeoPixel.__setitem__(self, index, color)
+            return
         else:
             nn = index
         if self.wrap:
+            n = self._num_pixels
             while nn < 0:
-                nn += len(self)
-            while nn >= len(self):
-                nn -= len(self)
-        super().__setitem__(nn, color)
+                nn += n
+            while nn >= n:
+                nn -= n
+        neopixel.NeoPixel.__setitem__(self, nn, color)
+
+    def __getitem__(self, index):
+        if type(index) is tuple:
+            index = self._pixel_index(index[0], index[1])
+        return neopixel.NeoPixel.__getitem__(self, index)
+
+    def blit_row(self, y, colors, x=0):
+        """
+        Set pixels along row y of a matrix from a sequence of colors, beginning at column x.
+        Colors that would land outside the matrix are ignored.
+        """
+        self._blit(x, y, len(colors), 1, colors)
+
+    def blit_column(self, x, colors, y=0):
+        """
+        Set pixels down column x of a matrix from a sequence of colors, beginning at row y.
+        Colors that would land outside the matrix are ignored.
+        """
+        self._blit(x, y, 1, len(colors), colors)
+
+    def blit_rect(self, x, y, w, h, colors):
+        """
+        Set a w by h rectangle of matrix pixels with its top left corner at (x, y).
+        The colors are given row by row, so there should be w * h of them.
+        Colors that would land outside the matrix are ignored.
+        """
+        self._blit(x, y, w, h, colors)
+
+    def _blit(self, x, y, w, h, colors):
+        width = self._width
+        n = self._num_pixels
+        x0 = max(x, 0)
+        x1 = min(x + w, width)
+        y1 = min(y + h, self._height)
+        index_map = self._index_map
+        ar = self._ar
+        lo = n
+        hi = 0
+        for yy in range(max(y, 0), y1):
+            row = yy * width
+            j = (yy - y) * w + (x0 - x)
+            for xx in range(x0, x1):
+                nn = index_map[row + xx]
+                if nn < n:
+                    c = colors[j]
+                    if type(c) is not int:
+                        c = (c[0] << 16) | (c[1] << 8) | c[2]
+                    ar[nn] = c
+                    if nn < lo:
+                        lo = nn
+                    if nn >= hi:
+                        hi = nn + 1
+                j += 1
+        self._mark_dirty(lo, hi)
+        if self.auto_write:
+            self.show()
+
+    def _build_index_map(self):
+        """
+        Precompute the pixel index for every (x, y) position of the matrix.
+        Positions whose index does not fit are marked with 0xFFFF.
+        """
+        w = self._width
+        h = self._height
+        index_map = array.array("H", [0xFFFF for _ in range(w * h)])
+        for y in range(h):
+            for x in range(w):
+                nn = self._translate_pixel(x, y)
+                if 0 <= nn < 0xFFFF:
+                    index_map[x + y * w] = nn
+        self._index_map = index_map
+
+    def _pixel_index(self, x, y):
+        """
+        Look up the pixel index of matrix position (x, y).
+        """
+        if 0 <= x < self._width and 0 <= y < self._height:
+            nn = self._index_map[x + y * self._width]
+            if nn != 0xFFFF:
+                return nn
+        return self._translate_pixel(x, y)
 
     def _translate_pixel(self, x, y):
         xx = x
@@ -112,6 +312,36 @@ class PixelStrip(neopixel.NeoPixel):
         else:
             return xx + yy * self.width
 
+    @property
+    def width(self):
+        return self._width
+
+    @width.setter
+    def width(self, w):
+        self._width = w
+        self._build_index_map()
+
+    @property
+    def height(self):
+        return self._height
+
+    @height.setter
+    def height(self, h):
+        self._height = h
+        self._build_index_map()
+
+    @property
+    def options(self):
+        return self._options
+
+    @options.setter
+    def options(self, options):
+        """
+        Set the MATRIX_* options describing how the matrix is wired.
+        """
+        self._options = options
+        self._build_index_map()
+
     @property
     def animation(self):
         return self._animation
@@ -119,14 +349,73 @@ class PixelStrip(neopixel.NeoPixel):
     @animation.setter
     def animation(self, anim):
         self._animation = anim
+        self.palette = None
         if self._animation is not None:
             self._animation.reset(self)
         else:
             self.clear()
 
+    @property
+    def palette(self):
+        if self._palette is None:
+            return None
+        return [self._palette[i] for i in range(self._palette_size)]
+
+    @palette.setter
+    def palette(self, colors):
+        """
+        Set a palette of up to 256 colors and switch to palette mode, where
+        show() colors each pixel from its index in indexes.  None leaves palette mode.
+        """
+        if colors is None:
+            self._palette = None
+            self._palette_size = 0
+            self._palette_offset = 0
+            self._indexes = None
+            return
+        size = len(colors)
+        if not 0 < size <= 256:
+            raise ValueError("a palette has 1 to 256 colors")
+        self._palette = array.array("I", [0 for _ in range(2 * size)])
+        self._palette_size = size
+        self._palette_offset %= size
+        for i in range(size):
+            self.set_palette_color(i, colors[i])
+        if self._indexes is None:
+            self._indexes = bytearray(self._num_pixels)
+
+    @property
+    def indexes(self):
+        return self._indexes
+
+    @indexes.setter
+    def indexes(self, indexes):
+        """
+        Use this bytearray, one palette index per pixel, for palette mode.
+        Each index must be less than the number of colors in the palette.
+        """
+        if len(indexes) != self._num_pixels:
+            raise ValueError("need one index for each of the {} pixels".format(self._num_pixels))
+        self._indexes = indexes
+
+    @property
+    def palette_offset(self):
+        return self._palette_offset
+
+    @palette_offset.setter
+    def palette_offset(self, offset):
+        """
+        Shift every pixel this many colors along the palette, wrapping at its end.
+        Changing it each frame cycles the colors without touching the indexes.
+        """
+        size = self._palette_size
+        if size:
+            offset %= size
+        self._palette_offset = offset
+
     @property
     def timeout(self):
-        return self._timeout
+        return None if self._timeout is None else self._timeout / 1000.0
 
     @timeout.setter
     def timeout(self, t):
@@ -134,10 +423,24 @@ class PixelStrip(neopixel.NeoPixel):
         Set or reset a timeout (in seconds) on this PixelStrip.
         Setting with None cancels the timeout.
         """
-        if t < 0 or t is None:
+        if t is None or t < 0:
             self._timeout = None
         else:
-            self._timeout = current_time() + t
+            self._timeout = utime.ticks_add(utime.ticks_ms(), int(t * 1000))
+
+    @property
+    def timeout_ms(self):
+        return self._timeout
+
+    @timeout_ms.setter
+    def timeout_ms(self, ms):
+        """
+        Like timeout, but in whole milliseconds, so no floats are made.
+        """
+        if ms is None or ms < 0:
+            self._timeout = None
+        else:
+            self._timeout = utime.ticks_add(utime.ticks_ms(), ms)
 
     def is_timed_out(self):
         """
@@ -146,7 +449,7 @@ class PixelStrip(neopixel.NeoPixel):
         if self._timeout is None:
             return False
         else:
-            return current_time() >= self._timeout
+            return utime.ticks_diff(utime.ticks_ms(), self._timeout) >= 0
 
 
 class Animation:
@@ -180,20 +483,42 @@ class Animation:
         """
         pass
 
+    def set_params(self, data, start, count):
+        """
+        Change this animation's settings from count bytes of data, beginning at data[start].
+        Called for SET_ANIMATION messages with params (see i2ccmd.py).  The
+        meaning of the bytes is up to each animation; by default they are ignored.
+        """
+        pass
+
     @property
     def timeout(self):
-        return self._timeout
+        return None if self._timeout is None else self._timeout / 1000.0
 
     @timeout.setter
     def timeout(self, t):
         """
-        Set or reset a timeout (in seconds) on this PixelStrip.
+        Set or reset a timeout (in seconds) on this Animation.
         Setting with None cancels the timeout.
         """
-        if t < 0 or t is None:
+        if t is None or t < 0:
+            self._timeout = None
+        else:
+            self._timeout = utime.ticks_add(utime.ticks_ms(), int(t * 1000))
+
+    @property
+    def timeout_ms(self):
+        return self._timeout
+
+    @timeout_ms.setter
+    def timeout_ms(self, ms):
+        """
+        Like timeout, but in whole milliseconds, so no floats are made.
+        """
+        if ms is None or ms < 0:
             self._timeout = None
         else:
-            self._timeout = current_time() + t
+            self._timeout = utime.ticks_add(utime.ticks_ms(), ms)
 
     def is_timed_out(self):
         """
@@ -202,4 +527,4 @@ class Animation:
         if self._timeout is None:
             return False
         else:
-            return current_time() >= self._timeout
+            return utime.ticks_diff(utime.ticks_ms(), self._timeout) >= 0
@@ -0,0 +1,131 @@
+import array
+import utime
+
+
+class FrameStats:
+    """
+    Frame timing counters for one PixelStrip.
+    Attach to a strip with strip.stats = FrameStats(target_fps=50).
+    Recording a frame only stores a few integers; the rolling minimum,
+    average and maximum over the last `window` frames are worked out
+    when they are read.
+    """
+
+    PACKED_SIZE = 32
+
+    def __init__(self, target_fps=None, window=32):
+        self.target_fps = target_fps
+        self.window = window
+        self._draw_us = array.array("I", [0 for _ in range(window)])
+        self._show_us = array.array("I", [0 for _ in range(window)])
+        self.reset()
+
+    def reset(self):
+        """
+        Clear all counters.
+        """
+        self.frames = 0
+        self.shows = 0
+        self.skipped = 0
+        self.pixels = 0
+        self.dropped = 0
+        self._pos = 0
+        self._frame_start = None
+        self._frame_show_us = 0
+        self._last_start = None
+        for i in range(self.window):
+            self._draw_us[i] = 0
+            self._show_us[i] = 0
+
+    def begin_frame(self):
+        """
+        Called by PixelStrip.draw() before the animation draws.
+        """
+        now = utime.ticks_us()
+        if self._last_start is not None and self.target_fps:
+            period = 1_000_000 // self.target_fps
+            late = utime.ticks_diff(now, self._last_start) // period - 1
+            if late > 0:
+                self.dropped += late
+        self._last_start = now
+        self._frame_start = now
+        self._frame_show_us = 0
+
+    def end_frame(self):
+        """
+        Called by PixelStrip.draw() after the animation draws.
+        Time spent in show() during the frame is counted as show time, not draw time.
+        """
+        if self._frame_start is None:
+            return
+        total = utime.ticks_diff(utime.ticks_us(), self._frame_start)
+        pos = self._pos
+        self._draw_us[pos] = max(0, total - self._frame_show_us)
+        self._show_us[pos] = self._frame_show_us
+        self._pos = (pos + 1) % self.window
+        self.frames += 1
+        self._frame_start = None
+
+    def add_show(self, us, pixels):
+        """
+        Called by NeoPixel.show() with the time taken and the number of pixels sent.
+        """
+        self._frame_show_us += us
+        self.shows += 1
+        self.pixels += pixels
+
+    def add_skip(self):
+        """
+        Called by NeoPixel.show() when nothing had changed, so nothing was sent.
+        """
+        self.skipped += 1
+
+    def _rolling(self, samples):
+        count = min(self.frames, self.window)
+        if count == 0:
+            return 0, 0, 0
+        lo = hi = samples[0]
+        total = 0
+        for i in range(count):
+            v = samples[i]
+            lo = min(lo, v)
+            hi = max(hi, v)
+            total += v
+        return lo, total // count, hi
+
+    def draw_us(self):
+        """
+        Returns (min, avg, max) microseconds spent drawing, over the rolling window.
+        """
+        return self._rolling(self._draw_us)
+
+    def show_us(self):
+        """
+        Returns (min, avg, max) microseconds spent in show(), over the rolling window.
+        """
+        return self._rolling(self._show_us)
+
+    def __str__(self):
+        d = self.draw_us()
+        s = self.show_us()
+        return "frames={} dropped={} shows={} skipped={} pixels={} draw_us={}/{}/{} show_us={}/{}/{}".format(
+            self.frames, self.dropped, self.shows, self.skipped, self.pixels, d[0], d[1], d[2], s[0], s[1], s[2])
+
+    def pack_into(self, buf, offset=0):
+        """
+        Write the counters into buf as PACKED_SIZE little-endian bytes, for
+        sending over I2C: frames, dropped, shows, skipped and pixels (32 bits
+        each, wrapping), then draw and show min/avg/max in microseconds (16
+        bits each, capped at 65535).  Returns the number of bytes written.
+        """
+        values = (self.frames, self.dropped, self.shows, self.skipped, self.pixels)
+        for v in values:
+            for k in range(4):
+                buf[offset] = (v >> (8 * k)) & 0xFF
+                offset += 1
+        for t in self.draw_us() + self.show_us():
+            t = min(t, 0xFFFF)
+            buf[offset] = t & 0xFF
+            buf[offset + 1] = t >> 8
+            offset += 2
+        return self.PACKED_SIZE
@@ -0,0 +1,99 @@
+import utime
+
+
+class Scheduler:
+    """
+    Draws the animations on several PixelStrips from a single loop.
+    Each strip is drawn at its own frame rate, given by strip.fps.  Between
+    frames the scheduler sleeps until the next strip is due, rather than
+    spinning.  A strip that falls more than a frame behind skips the frames
+    it missed instead of trying to catch up.
+    """
+
+    def __init__(self, strips=None):
+        self._strips = []
+        self._due = []
+        if strips is not None:
+            for strip in strips:
+                self.add(strip)
+
+    def add(self, strip, fps=None):
+        """
+        Add a strip to the schedule.  If fps is given, it replaces strip.fps.
+        """
+        if fps is not None:
+            strip.fps = fps
+        if strip not in self._strips:
+            self._strips.append(strip)
+            self._due.append(utime.ticks_us())
+
+    def remove(self, strip):
+        """
+        Remove a strip from the schedule.
+        """
+        if strip in self._strips:
+            i = self._strips.index(strip)
+            del self._strips[i]
+            del self._due[i]
+
+    @property
+    def strips(self):
+        return self._strips
+
+    def step(self):
+        """
+        Draw every strip that is due, then return the number of
+        microseconds until the next strip is due.
+        """
+        now = utime.ticks_us()
+        for i in range(len(self._strips)):
+            strip = self._strips[i]
+            period = 1_000_000 // strip.fps
+            due = self._due[i]
+            if utime.ticks_diff(due, now) <= 0:
+                strip.draw()
+                due = utime.ticks_add(due, period)
+                now = utime.ticks_us()
+                if utime.ticks_diff(due, now) <= 0:
+                    # More than a frame late: skip the missed frames.
+                    due = utime.ticks_add(now, period)
+                self._due[i] = due
+        # Measured after all the drawing, so time spent on later strips is not slept again.
+        return self.time_to_next()
+
+    def run(self, idle=None, seconds=None):
+        """
+        Draw the strips forever, or for the given number of seconds.
+        If idle is given, it is called once per pass of the loop before
+        sleeping, which is a good place to poll for messages.
+        """
+        start = utime.ticks_ms()
+        while seconds is None or utime.ticks_diff(utime.ticks_ms(), start) < seconds * 1000:
+            wait = self.step()
+            if idle is not None:
+                idle()
+                wait = self.time_to_next()
+            if wait > 0:
+                utime.sleep_us(wait)
+
+    def counts(self):
+        """
+        Returns (pushed, skipped) totals over all strips: how many calls to
+        show() sent a frame, and how many found nothing changed.
+        """
+        pushed = 0
+        skipped = 0
+        for strip in self._strips:
+            pushed += strip.pushed
+            skipped += strip.skipped
+        return pushed, skipped
+
+    def time_to_next(self):
+        """
+        Returns the number of microseconds until the next strip is due.
+        """
+        now = utime.ticks_us()
+        wait = 1_000_000
+        for due in self._due:
+            wait = min(wait, utime.ticks_diff(due, now))
+        return max(wait, 0)